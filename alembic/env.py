@@ -2,10 +2,10 @@ import os
 import sys
 from logging.config import fileConfig
 
-from sqlalchemy import create_engine
 from sqlalchemy import pool
 from alembic import context
-from app.db.database import Base
+from app.core.config import settings
+from app.db.database import Base, create_app_engine
 
 target_metadata = Base.metadata
 
@@ -24,11 +24,10 @@ try:
     print("DEBUG: Successfully imported app.db.database.Base")
 
     # Penting: Impor SEMUA model yang ingin Anda lacak dengan Alembic
-    from app.models.artwork import Artwork
-    from app.models.user import User
-    # from app.models.receipt import Receipt
-    # from app.models.your_other_model import YourOtherModel # Jika ada model lain
-    print("DEBUG: Successfully imported all models (Artwork, User, Receipt)")
+    from app.models import (  # noqa: F401
+        artwork, email_outbox, license, like, payment_inbox, payment_notification, purchase, receipt, user
+    )
+    print("DEBUG: Successfully imported all models")
 
     # Target MetaData untuk autogenerate support
     target_metadata = Base.metadata
@@ -58,8 +57,9 @@ if config.config_file_name is not None:
 
 # ... (sisa kode env.py tetap sama) ...
 
+# URL database diambil dari settings (DATABASE_URL), sama dengan aplikasi; sqlalchemy.url di alembic.ini tidak dipakai
 def run_migrations_offline() -> None:
-    url = config.get_main_option("sqlalchemy.url")
+    url = settings.DATABASE_URL
     context.configure(
         url=url,
         target_metadata=target_metadata,
@@ -70,10 +70,12 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 def run_migrations_online() -> None:
-    connectable = create_engine(
-        config.get_main_option("sqlalchemy.url"),
+    # Engine factory yang sama dengan aplikasi, tanpa pool dan tanpa statement_timeout
+    # (CREATE INDEX / backfill boleh lebih lama dari batas request)
+    connectable = create_app_engine(
+        application_name="stegano-alembic",
+        statement_timeout_ms=0,
         poolclass=pool.NullPool,
-        future=True, # Penting untuk SQLAlchemy 1.4+
     )
     with connectable.connect() as connection:
         context.configure(
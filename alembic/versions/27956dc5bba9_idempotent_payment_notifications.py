@@ -0,0 +1,37 @@
+"""Unique receipts.order_id and processed_notifications table
+
+Revision ID: 27956dc5bba9
+Revises: 42a022725d80
+Create Date: 2026-10-19 10:02:17.318405
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '27956dc5bba9'
+down_revision: Union[str, None] = '42a022725d80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_receipts_order_id'), 'receipts', ['order_id'], unique=True)
+
+    op.create_table('processed_notifications',
+    sa.Column('order_id', sa.String(), nullable=False),
+    sa.Column('transaction_status', sa.String(), nullable=False),
+    sa.Column('transaction_id', sa.String(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('order_id', 'transaction_status', 'transaction_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('processed_notifications')
+    op.drop_index(op.f('ix_receipts_order_id'), table_name='receipts')
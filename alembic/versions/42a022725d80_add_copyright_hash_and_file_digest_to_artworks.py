@@ -0,0 +1,41 @@
+"""Add copyright_hash and file_digest to artworks
+
+Revision ID: 42a022725d80
+Revises: 36b07c88590a
+Create Date: 2026-10-19 09:12:41.503127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '42a022725d80'
+down_revision: Union[str, None] = '36b07c88590a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('artworks', sa.Column('copyright_hash', sa.String(length=64), nullable=True))
+    op.add_column('artworks', sa.Column('file_digest', sa.String(length=64), nullable=True))
+
+    # copyright_hash = sha256(unique_key), sama seperti yang di-embed saat upload
+    op.execute(
+        sa.text("UPDATE artworks SET copyright_hash = encode(sha256(convert_to(unique_key, 'UTF8')), 'hex') WHERE copyright_hash IS NULL")
+    )
+    # file_digest untuk data lama dibiarkan NULL; verifikasi akan fallback ke ekstraksi LSB
+
+    op.create_index(op.f('ix_artworks_copyright_hash'), 'artworks', ['copyright_hash'], unique=False)
+    op.create_index(op.f('ix_artworks_file_digest'), 'artworks', ['file_digest'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_artworks_file_digest'), table_name='artworks')
+    op.drop_index(op.f('ix_artworks_copyright_hash'), table_name='artworks')
+    op.drop_column('artworks', 'file_digest')
+    op.drop_column('artworks', 'copyright_hash')
@@ -0,0 +1,40 @@
+"""Add payment_inbox table for queued Midtrans notifications
+
+Revision ID: 5b1e3f9a7c20
+Revises: 27956dc5bba9
+Create Date: 2026-10-19 11:26:40.512873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e3f9a7c20'
+down_revision: Union[str, None] = '27956dc5bba9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('payment_inbox',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('order_id', sa.String(), nullable=True),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('received_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_payment_inbox_pending', 'payment_inbox', ['id'], unique=False, postgresql_where=sa.text('processed_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payment_inbox_pending', table_name='payment_inbox', postgresql_where=sa.text('processed_at IS NULL'))
+    op.drop_table('payment_inbox')
@@ -0,0 +1,28 @@
+"""Add partial index on pending receipts for the reconciler
+
+Revision ID: 6c8d2e4f1a93
+Revises: 5b1e3f9a7c20
+Create Date: 2026-10-19 12:48:05.774120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c8d2e4f1a93'
+down_revision: Union[str, None] = '5b1e3f9a7c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_receipts_pending_purchase_date', 'receipts', ['purchase_date', 'id'], unique=False, postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_receipts_pending_purchase_date', table_name='receipts', postgresql_where=sa.text("status = 'pending'"))
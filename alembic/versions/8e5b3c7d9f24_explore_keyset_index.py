@@ -0,0 +1,31 @@
+"""Make artworks.created_at NOT NULL and index (created_at, id) for explore
+
+Revision ID: 8e5b3c7d9f24
+Revises: 7d4a9b2c5e16
+Create Date: 2026-10-19 15:21:09.640178
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e5b3c7d9f24'
+down_revision: Union[str, None] = '7d4a9b2c5e16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("UPDATE artworks SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column('artworks', 'created_at', existing_type=sa.DateTime(), nullable=False, existing_server_default=sa.text('now()'))
+    op.create_index('ix_artworks_created_at_id', 'artworks', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_artworks_created_at_id', table_name='artworks')
+    op.alter_column('artworks', 'created_at', existing_type=sa.DateTime(), nullable=True, existing_server_default=sa.text('now()'))
@@ -0,0 +1,45 @@
+"""Full-text search vector and trigram indexes for artworks and users
+
+Revision ID: 9f6c4d8e2a35
+Revises: 8e5b3c7d9f24
+Create Date: 2026-10-19 16:40:27.915503
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f6c4d8e2a35'
+down_revision: Union[str, None] = '8e5b3c7d9f24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('artworks', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+    op.create_index('ix_artworks_search_vector', 'artworks', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_artworks_title_trgm', 'artworks', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_users_username_trgm', 'users', ['username'], unique=False, postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_username_trgm', table_name='users', postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'})
+    op.drop_index('ix_artworks_title_trgm', table_name='artworks', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.drop_index('ix_artworks_search_vector', table_name='artworks', postgresql_using='gin')
+    op.drop_column('artworks', 'search_vector')
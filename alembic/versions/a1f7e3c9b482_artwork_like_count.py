@@ -0,0 +1,47 @@
+"""Add artworks.like_count and a unique (user_id, artwork_id) index on likes
+
+Revision ID: a1f7e3c9b482
+Revises: 9f6c4d8e2a35
+Create Date: 2026-10-19 17:02:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1f7e3c9b482'
+down_revision: Union[str, None] = '9f6c4d8e2a35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Like ganda dari toggle lama (check-then-insert tanpa constraint); simpan yang paling awal
+    op.execute("""
+        DELETE FROM likes WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY user_id, artwork_id ORDER BY created_at NULLS LAST, id
+                ) AS rn
+                FROM likes
+            ) ranked
+            WHERE rn > 1
+        )
+    """)
+    op.create_index('uq_likes_user_artwork', 'likes', ['user_id', 'artwork_id'], unique=True)
+    op.add_column('artworks', sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE artworks a SET like_count = l.n
+        FROM (SELECT artwork_id, count(*) AS n FROM likes GROUP BY artwork_id) l
+        WHERE a.id = l.artwork_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('artworks', 'like_count')
+    op.drop_index('uq_likes_user_artwork', table_name='likes')
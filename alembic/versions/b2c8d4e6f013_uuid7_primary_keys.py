@@ -0,0 +1,50 @@
+"""Time-ordered UUIDv7 defaults for users, artworks, receipts and likes
+
+Kolom id tetap bertipe uuid, jadi id uuid4 yang sudah ada (dan foreign key,
+URL, email struk yang merujuknya) tidak diubah; hanya baris baru yang memakai
+UUIDv7. Aplikasi membuat id lewat app.core.ids.uuid7, server_default ini untuk
+insert di luar ORM.
+
+Revision ID: b2c8d4e6f013
+Revises: a1f7e3c9b482
+Create Date: 2026-10-19 19:41:07.552931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2c8d4e6f013'
+down_revision: Union[str, None] = 'a1f7e3c9b482'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('users', 'artworks', 'receipts', 'likes')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sama dengan app.core.ids.UUID7_FUNCTION_SQL; disalin supaya migrasi tidak ikut berubah kalau kode app berubah
+    op.execute("""
+        CREATE OR REPLACE FUNCTION gen_uuid_v7() RETURNS uuid AS $$
+            SELECT encode(
+                set_bit(set_bit(
+                    overlay(uuid_send(gen_random_uuid())
+                            PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                            FROM 1 FOR 6),
+                    52, 1), 53, 1),
+                'hex')::uuid
+        $$ LANGUAGE sql VOLATILE
+    """)
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=sa.text('gen_uuid_v7()'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=None)
+    op.execute("DROP FUNCTION IF EXISTS gen_uuid_v7()")
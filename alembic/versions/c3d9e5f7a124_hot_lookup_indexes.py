@@ -0,0 +1,37 @@
+"""Indexes for hot lookups: receipts by buyer, artworks by owner and category
+
+receipts.order_id (ix_receipts_order_id, unique) dan likes (user_id,
+artwork_id) (uq_likes_user_artwork) sudah ter-index dari revisi sebelumnya.
+
+Revision ID: c3d9e5f7a124
+Revises: b2c8d4e6f013
+Create Date: 2026-10-19 20:26:53.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9e5f7a124'
+down_revision: Union[str, None] = 'b2c8d4e6f013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_receipts_buyer_id', 'receipts', ['buyer_id'], unique=False)
+    op.create_index('ix_receipts_buyer_artwork_active', 'receipts', ['buyer_id', 'artwork_id'], unique=False, postgresql_where=sa.text("status IN ('pending', 'paid')"))
+    op.create_index('ix_artworks_category_created_at_id', 'artworks', ['category', 'created_at', 'id'], unique=False)
+    op.create_index('ix_artworks_owner_id', 'artworks', ['owner_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_artworks_owner_id', table_name='artworks')
+    op.drop_index('ix_artworks_category_created_at_id', table_name='artworks')
+    op.drop_index('ix_receipts_buyer_artwork_active', table_name='receipts', postgresql_where=sa.text("status IN ('pending', 'paid')"))
+    op.drop_index('ix_receipts_buyer_id', table_name='receipts')
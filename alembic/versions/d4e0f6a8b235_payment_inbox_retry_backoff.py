@@ -0,0 +1,37 @@
+"""Payment inbox: retry backoff (next_attempt_at) and dead-lettering
+
+Baris yang sudah melewati PAYMENT_INBOX_MAX_ATTEMPTS sebelum revisi ini
+diklaim sekali lagi lalu di-dead-letter oleh worker.
+
+Revision ID: d4e0f6a8b235
+Revises: c3d9e5f7a124
+Create Date: 2026-10-19 22:14:05.530871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e0f6a8b235'
+down_revision: Union[str, None] = 'c3d9e5f7a124'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('payment_inbox', sa.Column('next_attempt_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False))
+    op.add_column('payment_inbox', sa.Column('dead_lettered_at', sa.DateTime(), nullable=True))
+    op.drop_index('ix_payment_inbox_pending', table_name='payment_inbox', postgresql_where=sa.text('processed_at IS NULL'))
+    op.create_index('ix_payment_inbox_pending', 'payment_inbox', ['id'], unique=False, postgresql_where=sa.text('processed_at IS NULL AND dead_lettered_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payment_inbox_pending', table_name='payment_inbox', postgresql_where=sa.text('processed_at IS NULL AND dead_lettered_at IS NULL'))
+    op.create_index('ix_payment_inbox_pending', 'payment_inbox', ['id'], unique=False, postgresql_where=sa.text('processed_at IS NULL'))
+    op.drop_column('payment_inbox', 'dead_lettered_at')
+    op.drop_column('payment_inbox', 'next_attempt_at')
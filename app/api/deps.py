@@ -1,14 +1,25 @@
-from typing import Generator
+from typing import Generator, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.database import SessionLocal 
-from fastapi import Depends, HTTPException, status  
+from app.db.database import SessionLocal, get_async_db
+from app.db.routing import request_user_id
+from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError 
+from jose import jwt, JWTError
 from app.core.config import settings
-from app.models.user import User 
-import uuid 
+from app.models.user import User
+from app.schemas.user_schema import CurrentUser
+from app.services.user_cache import get_cached_user, cache_user
+import uuid
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
+
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -17,42 +28,71 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    user_id: uuid.UUID = None
-
+def _decode_user_id(token: str) -> uuid.UUID:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
 
-        user_id_str: str = payload.get("sub") 
+        user_id_str: str = payload.get("sub")
 
         if user_id_str is None:
             raise credentials_exception
 
         try:
-            user_id = uuid.UUID(user_id_str)
+            return uuid.UUID(user_id_str)
         except ValueError:
             raise credentials_exception
 
     except JWTError:
         raise credentials_exception
 
-    if user_id is None: 
-        raise credentials_exception
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """User ORM dari AsyncSession request ini; route yang juga memakai
+    Depends(get_async_db) mendapat session yang sama."""
+    user_id = _decode_user_id(token)
 
- 
-    user = db.query(User).filter(User.id == user_id).first() 
+    user = await db.get(User, user_id)
 
-    if user is None:
+    if user is None or user.is_active is False:
         raise credentials_exception
 
-    return user
\ No newline at end of file
+    request_user_id.set(user.id)
+    cache_user(user)
+    return user
+
+async def get_current_user_cached(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
+    """Like get_current_user, but returns a read-only snapshot served from the
+    in-process user cache, so a cache hit costs no database query. Use it in
+    routes that only need the user's id or profile fields."""
+    user_id = _decode_user_id(token)
+
+    cached = get_cached_user(str(user_id))
+    if cached is None:
+        user = await db.get(User, user_id)
+
+        if user is None or user.is_active is False:
+            raise credentials_exception
+
+        cached = cache_user(user)
+
+    # Untuk read-your-writes (app.db.routing): tulisan user ini mengarahkan pembacaannya ke primary sebentar
+    request_user_id.set(user_id)
+    return cached
+
+async def get_optional_user_cached(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[CurrentUser]:
+    """For public routes that add per-user fields (e.g. liked_by_me) when a
+    valid token is sent. A missing or invalid token means anonymous, not 401."""
+    if not token:
+        return None
+    try:
+        return await get_current_user_cached(token, db)
+    except HTTPException:
+        return None
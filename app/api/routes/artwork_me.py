@@ -1,22 +1,29 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
-from app.api.deps import get_db, get_current_user
-from app.models.user import User
+from app.api.deps import get_current_user_cached
+from app.db.database import get_read_db
+from app.core.query_budget import query_budget
+from app.schemas.user_schema import CurrentUser
 from app.models.artwork import Artwork
+from app.crud.artwork_crud import ARTWORK_RESPONSE_COLUMNS, artwork_response_dict
+from app.core.serialization import dumps
 from app.schemas.artwork_schema import ArtworkListResponse
 
 router = APIRouter()
 
-@router.get("/users/me/artworks", response_model=ArtworkListResponse)
+@router.get("/users/me/artworks", response_model=ArtworkListResponse, dependencies=[query_budget(2)])
 def get_my_artworks(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user_cached)
 ):
-    artworks = db.query(Artwork).filter(Artwork.owner_id == current_user.id).all()
+    rows = db.query(*ARTWORK_RESPONSE_COLUMNS).filter(Artwork.owner_id == current_user.id).all()
 
-    return {
+    # Response langsung: response_model hanya untuk dokumentasi, tanpa validasi ulang per baris
+    return Response(content=dumps({
         "status": "success",
-        "message": "Your artworks retrieved successfully." if artworks else "No artworks found.",
-        "result": artworks,
-        "total": len(artworks),
-    }
+        "message": "Your artworks retrieved successfully." if rows else "No artworks found.",
+        "result": [artwork_response_dict(row) for row in rows],
+        "total": len(rows),
+        "total_is_estimate": False,
+        "next_cursor": None,
+    }), media_type="application/json")
@@ -1,23 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from uuid import UUID
-from app.db.database import get_db
+from typing import Optional
+from app.db.database import get_read_db
+from app.api.deps import get_optional_user_cached
+from app.core.query_budget import query_budget
+from app.crud.like_crud import liked_artworks
 from app.models.artwork import Artwork # Pastikan model Artwork memiliki price dan is_sold
+from app.schemas.user_schema import CurrentUser
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-@router.get("/{artwork_id}")
-def get_artwork_detail(artwork_id: UUID, db: Session = Depends(get_db)):
+@router.get("/{artwork_id}", dependencies=[query_budget(3)])
+def get_artwork_detail(
+    artwork_id: UUID,
+    db: Session = Depends(get_read_db),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user_cached)
+):
     logger.info(f"Backend received request for artwork ID: {artwork_id}")
-    artwork = db.query(Artwork).filter(Artwork.id == artwork_id).first()
+    artwork = db.query(Artwork).options(joinedload(Artwork.owner)).filter(Artwork.id == artwork_id).first()
 
     if not artwork:
         logger.warning(f"Backend: Artwork with ID {artwork_id} NOT FOUND in database.")
         raise HTTPException(status_code=404, detail="Artwork tidak ditemukan")
 
     logger.info(f"Backend: Artwork {artwork_id} found: {artwork.title}")
+    liked_by_me = current_user is not None and artwork.id in liked_artworks(db, current_user.id, [artwork.id])
     return {
         "id": str(artwork.id),
         "title": artwork.title,
@@ -27,5 +37,7 @@ def get_artwork_detail(artwork_id: UUID, db: Session = Depends(get_db)):
         "name": artwork.owner.name,
         "profile_picture": artwork.owner.profile_picture,
         "price": artwork.price,    
-        "is_sold": artwork.is_sold 
+        "is_sold": artwork.is_sold,
+        "like_count": artwork.like_count,
+        "liked_by_me": liked_by_me
     }
\ No newline at end of file
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.schemas.user_schema import UserCreate, UserLogin, UserResponse
 from app.models.user import User
-from app.services.hashing import hash_password, verify_password
+from app.services.hashing import hash_password, verify_password, needs_rehash
 from app.api.deps import get_db
 from jose import jwt
 from datetime import datetime, timedelta
@@ -51,6 +51,11 @@ def login(login_data: UserLogin, db: Session = Depends(get_db)):
             detail="Invalid credentials"
         )
 
+    # Cost factor berubah: hash ulang dengan password yang baru saja terverifikasi
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(login_data.password)
+        db.commit()
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {
         "sub": str(user.id),
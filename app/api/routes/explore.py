@@ -1,31 +1,147 @@
-from fastapi import APIRouter, Query, Depends
+from fastapi import APIRouter, Query, Depends, HTTPException, Request, Response
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
-from app.api.deps import get_db
+from app.api.deps import get_optional_user_cached
+from app.db.database import get_read_db
+from app.db.routing import use_primary
+from app.core.query_budget import query_budget
+from app.core.config import settings
 from app.models.artwork import Artwork
 from app.schemas.artwork_schema import ArtworkListResponse
-from typing import Optional, List
+from app.schemas.user_schema import CurrentUser
+from app.services.explore_cache import get_explore_total, get_explore_response, etag_matches, invalidated_within, make_etag
+from app.crud.artwork_crud import ARTWORK_RESPONSE_COLUMNS, artwork_response_dict, artwork_search_condition, artwork_search_rank
+from app.crud.like_crud import liked_artworks
+from app.core.serialization import dumps, loads
+from typing import Optional, List, Tuple
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+import base64
+import json
 
 router = APIRouter()
 
-@router.get("/explore", response_model=ArtworkListResponse)
+
+def encode_cursor(artwork, rank: Optional[Decimal] = None) -> str:
+    # artwork: baris halaman explore (punya created_at dan id)
+    values = [artwork.created_at.isoformat(), str(artwork.id)]
+    if rank is not None:
+        values.append(str(rank))
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ranked: bool):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != (3 if ranked else 2):
+            raise ValueError("cursor does not match this query")
+        key = (datetime.fromisoformat(values[0]), UUID(values[1]))
+        return (Decimal(values[2]),) + key if ranked else key
+    except (ValueError, TypeError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+
+
+# Budget dengan cache user dan cache explore dingin, tanpa filter: lookup user, estimasi
+# reltuples, COUNT(*), halaman, liked_by_me (tests/test_query_budget.py)
+@router.get("/explore", response_model=ArtworkListResponse, dependencies=[query_budget(5)])
 def explore_items(
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=0),
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user_cached),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.EXPLORE_DEFAULT_LIMIT, ge=1, le=settings.EXPLORE_MAX_LIMIT),
+    skip: int = Query(0, ge=0, deprecated=True),
     category: Optional[str] = None,
-    query: Optional[str] = None
+    query: Optional[str] = None,
+    include_total: bool = True
 ):
-    artworks_query = db.query(Artwork)
+    category = category or None
+    # Spasi berlebih tidak mengubah hasil pencarian, dan pencarian tidak peka huruf besar/kecil
+    query = " ".join(query.split()) if query and query.strip() else None
+    key = (category, query.lower() if query else None, cursor, limit, 0 if cursor else skip, include_total)
+
+    # Build tepat setelah artwork berubah bisa membaca replica yang belum menyusul
+    # lalu menyimpan halaman lama itu di cache selama TTL; baca dari primary dulu
+    if invalidated_within(settings.READ_YOUR_WRITES_SECONDS):
+        use_primary(db)
+    etag, body, artwork_ids = get_explore_response(
+        key, lambda: build_explore_page(db, cursor, limit, skip, category, query, include_total)
+    )
+    # Halaman yang di-cache sama untuk semua orang; liked_by_me ditambahkan per user
+    # dengan satu query untuk seluruh halaman. Tanpa like di halaman ini body cache dipakai apa adanya.
+    # Like tidak meng-invalidate cache, jadi like_count artwork yang di-like user ditimpa
+    # dengan nilai terkini supaya tidak terlihat "liked" dengan hitungan lama.
+    if current_user is not None:
+        liked = liked_artworks(db, current_user.id, artwork_ids)
+        if liked:
+            page = loads(body)
+            for item in page["result"]:
+                like_count = liked.get(UUID(item["id"]))
+                if like_count is not None:
+                    item["liked_by_me"], item["like_count"] = True, like_count
+            body = dumps(page)
+            etag = make_etag(body)
+    # no-cache: browser boleh menyimpan, tapi wajib revalidasi; polling cukup dijawab 304 tanpa body
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Authorization"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def build_explore_page(
+    db: Session,
+    cursor: Optional[str],
+    limit: int,
+    skip: int,
+    category: Optional[str],
+    query: Optional[str],
+    include_total: bool
+) -> Tuple[bytes, List[UUID]]:
+    # Proyeksi kolom ArtworkResponse (+ created_at untuk cursor), bukan entity Artwork penuh:
+    # tanpa identity map/objek ORM dan tanpa validasi pydantic per baris
+    artworks_query = db.query(*ARTWORK_RESPONSE_COLUMNS, Artwork.created_at)
     if category:
         artworks_query = artworks_query.filter(Artwork.category == category)
     if query:
-        artworks_query = artworks_query.filter(Artwork.title.ilike(f"%{query}%"))
+        artworks_query = artworks_query.filter(artwork_search_condition(query))
+
+    total, total_is_estimate = None, False
+    if include_total:
+        total, total_is_estimate = get_explore_total(db, (category, query), artworks_query)
+
+    # Tanpa query: terbaru dulu. Dengan query: paling relevan dulu.
+    # id sebagai tie-breaker supaya urutan deterministik dan cursor stabil.
+    if query:
+        rank = artwork_search_rank(query)
+        page_query = artworks_query.add_columns(rank).order_by(rank.desc(), Artwork.created_at.desc(), Artwork.id.desc())
+        sort_key = tuple_(rank, Artwork.created_at, Artwork.id)
+    else:
+        page_query = artworks_query.order_by(Artwork.created_at.desc(), Artwork.id.desc())
+        sort_key = tuple_(Artwork.created_at, Artwork.id)
+
+    if cursor:
+        page_query = page_query.filter(sort_key < tuple_(*decode_cursor(cursor, ranked=bool(query))))
+    elif skip:
+        page_query = page_query.offset(skip)
 
-    artworks = artworks_query.offset(skip).limit(limit).all()
+    # Ambil satu baris ekstra untuk tahu apakah masih ada halaman berikutnya
+    rows = page_query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last, last[-1] if query else None)
+    rows = rows[:limit]
 
-    return {
+    # Bentuk dan format sama dengan ArtworkListResponse.model_dump_json(), lihat app.core.serialization
+    body = dumps({
         "status": "success",
-        "message": "Artworks found." if artworks else "Artworks not found.",
-        "result": artworks,
-        "total": len(artworks)
-    }
\ No newline at end of file
+        "message": "Artworks found." if rows else "Artworks not found.",
+        "result": [artwork_response_dict(row) for row in rows],
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "next_cursor": next_cursor
+    })
+    return body, [row.id for row in rows]
@@ -1,11 +1,27 @@
 import logging # Tambahkan ini
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from app.steganography import extract_message_lsb, xor_encrypt_decrypt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from uuid import UUID
+from app.api.deps import get_db
+from app.db.database import get_async_db
+from app.core.config import settings
+from app.models.artwork import Artwork
+from app.models.user import User
+from app.steganography import extract_message_lsb, analyze_lsb, probe_copyright_header
+from app.services.watermark import parse_watermark, extract_watermark_job, get_extract_executor
+import asyncio
+import hashlib
+import io
+import json
 import os
 import time
 import requests
-from tempfile import NamedTemporaryFile
+from PIL import Image
 
 router = APIRouter()
 
@@ -15,58 +31,73 @@ class ExtractWatermarkRequest(BaseModel):
     image_url: str
     buyer_secret_code: str
 
+
+def _extract_from_source(image_source, buyer_secret_code: str) -> dict:
+    # image_source bisa berupa path lokal atau file-like object (BytesIO / UploadFile.file)
+    start = time.time()
+    extracted = extract_message_lsb(image_source)
+    elapsed = time.time() - start
+    logger.info(f"EXTRACT: Raw extracted message: '{extracted}' (took {elapsed:.4f}s)")
+
+    parsed = parse_watermark(extracted, buyer_secret_code)
+    if parsed is None:
+        logger.warning(f"EXTRACT: Watermark not found or invalid format. Extracted: '{extracted[:50]}...'")
+        raise HTTPException(status_code=400, detail="Watermark not found")
+
+    copyright_hash, creator_message = parsed
+    logger.info(f"EXTRACT: Decrypted creator message: '{creator_message}'")
+    return {
+        "extracted_in": f"{elapsed:.4f} seconds",
+        "copyright_hash": copyright_hash,
+        "creator_message": creator_message or "-"
+    }
+
+
 @router.post("/extract-watermark")
 def extract_watermark(data: ExtractWatermarkRequest):
-    temp_path = None 
-    is_url = False
     try:
         image_path = data.image_url.strip()
         is_url = image_path.startswith("http://") or image_path.startswith("https://")
-        
+
         logger.info(f"EXTRACT: Received request for image_url: {image_path}")
-        logger.info(f"EXTRACT: Received buyer_secret_code for decryption: '{data.buyer_secret_code}'") 
+        logger.info(f"EXTRACT: Received buyer_secret_code for decryption: '{data.buyer_secret_code}'")
 
         if is_url:
             response = requests.get(image_path)
             if response.status_code != 200:
                 logger.error(f"EXTRACT: Failed to download image from URL: {image_path}, Status: {response.status_code}")
                 raise HTTPException(status_code=404, detail="Unable to download image from URL")
-            
-            with NamedTemporaryFile(delete=False, suffix=".png") as tmp:
-                tmp.write(response.content)
-                temp_path = tmp.name
-            logger.info(f"EXTRACT: Image downloaded to temporary path: {temp_path}")
+
+            image_source = io.BytesIO(response.content)
+            logger.info(f"EXTRACT: Image downloaded into memory ({len(response.content)} bytes)")
         else:
-            temp_path = image_path.lstrip("/")
-            if not os.path.exists(temp_path):
-                logger.error(f"EXTRACT: Image not found on server at path: {temp_path}")
+            image_source = image_path.lstrip("/")
+            if not os.path.exists(image_source):
+                logger.error(f"EXTRACT: Image not found on server at path: {image_source}")
                 raise HTTPException(status_code=404, detail="Image not found on server")
-            logger.info(f"EXTRACT: Using local image path: {temp_path}")
+            logger.info(f"EXTRACT: Using local image path: {image_source}")
+
+        return _extract_from_source(image_source, data.buyer_secret_code)
+
+    except HTTPException as e:
+        logger.error(f"EXTRACT: HTTP Exception: {e.detail} (Status: {e.status_code})")
+        raise e
+    except Exception as e:
+        logger.error(f"EXTRACT: Unexpected error during extraction: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Extraction failed: {str(e)}")
 
-        start = time.time()
-        extracted = extract_message_lsb(temp_path)
-        elapsed = time.time() - start
-        logger.info(f"EXTRACT: Raw extracted message: '{extracted}' (took {elapsed:.4f}s)") 
-
-        if not extracted.startswith("COPYRIGHT:"):
-            logger.warning(f"EXTRACT: Watermark not found or invalid format. Extracted: '{extracted[:50]}...'")
-            raise HTTPException(status_code=400, detail="Watermark not found")
-
-        parts = extracted.split("<USER_MESSAGE>")
-        copyright_hash = parts[0].replace("COPYRIGHT:", "").strip()
-        creator_message = None
-
-        if len(parts) > 1:
-            encrypted_creator_message = parts[1]
-            logger.info(f"EXTRACT: Encrypted creator message part: '{encrypted_creator_message}'")
-            logger.info(f"EXTRACT: Attempting to decrypt with buyer_secret_code: '{data.buyer_secret_code}'")
-            creator_message = xor_encrypt_decrypt(encrypted_creator_message, data.buyer_secret_code)
-            logger.info(f"EXTRACT: Decrypted creator message: '{creator_message}'") 
-        return {
-            "extracted_in": f"{elapsed:.4f} seconds",
-            "copyright_hash": copyright_hash,
-            "creator_message": creator_message or "-"
-        }
+
+@router.post("/extract-watermark/upload")
+def extract_watermark_upload(
+    image: UploadFile = File(...),
+    buyer_secret_code: str = Form(...)
+):
+    try:
+        logger.info(f"EXTRACT: Received uploaded image: {image.filename} ({image.content_type})")
+        logger.info(f"EXTRACT: Received buyer_secret_code for decryption: '{buyer_secret_code}'")
+
+        # PIL membaca langsung dari spooled file milik UploadFile, tanpa file sementara
+        return _extract_from_source(image.file, buyer_secret_code)
 
     except HTTPException as e:
         logger.error(f"EXTRACT: HTTP Exception: {e.detail} (Status: {e.status_code})")
@@ -75,10 +106,129 @@ def extract_watermark(data: ExtractWatermarkRequest):
         logger.error(f"EXTRACT: Unexpected error during extraction: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Extraction failed: {str(e)}")
 
-    finally:
-        if is_url and temp_path and os.path.exists(temp_path):
+
+@router.post("/steganalysis")
+def steganalysis(image: UploadFile = File(...)):
+    try:
+        img = Image.open(image.file)
+        start = time.time()
+        result = analyze_lsb(img)
+        copyright_hash = probe_copyright_header(img)
+        elapsed = time.time() - start
+    except Exception as e:
+        logger.error(f"STEGANALYSIS: Unable to analyse {image.filename}: {e}")
+        raise HTTPException(status_code=400, detail="Invalid image")
+
+    logger.info(f"STEGANALYSIS: {image.filename} -> {result} ({elapsed:.4f}s)")
+    return {
+        "analyzed_in": f"{elapsed:.4f} seconds",
+        **result,
+        "copyright_hash": copyright_hash
+    }
+
+
+@router.post("/verify")
+def verify_artwork(
+    image: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    start = time.time()
+    content = image.file.read()
+    digest = hashlib.sha256(content).hexdigest()
+    match = "digest"
+
+    # File yang disajikan tanpa modifikasi cukup di-resolve lewat digest, tanpa decoding LSB
+    row = db.query(Artwork, User.username).join(User, Artwork.owner_id == User.id).filter(
+        Artwork.file_digest == digest
+    ).first()
+
+    if row is None:
+        match = "watermark"
+        try:
+            parsed = parse_watermark(extract_message_lsb(io.BytesIO(content)))
+        except Exception as e:
+            logger.error(f"VERIFY: Unable to decode uploaded image {image.filename}: {e}")
+            raise HTTPException(status_code=400, detail="Invalid image")
+        if parsed is None:
+            raise HTTPException(status_code=404, detail="Watermark not found")
+
+        copyright_hash, _ = parsed
+        row = db.query(Artwork, User.username).join(User, Artwork.owner_id == User.id).filter(
+            Artwork.copyright_hash == copyright_hash
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Artwork not found for this watermark")
+
+    artwork, owner_username = row
+    elapsed = time.time() - start
+    logger.info(f"VERIFY: {image.filename} resolved to artwork {artwork.id} via {match} ({elapsed:.4f}s)")
+
+    return {
+        "match": match,
+        "verified_in": f"{elapsed:.4f} seconds",
+        "artwork_id": str(artwork.id),
+        "title": artwork.title,
+        "copyright_hash": artwork.copyright_hash,
+        "owner_id": str(artwork.owner_id),
+        "owner_username": owner_username
+    }
+
+
+@router.post("/extract-watermark/batch")
+async def extract_watermark_batch(
+    image_urls: List[str] = Form([]),
+    artwork_ids: List[UUID] = Form([]),
+    images: List[UploadFile] = File([]),
+    buyer_secret_code: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    items = []
+    for url in image_urls:
+        items.append(({"source": "url", "ref": url}, "url", url.strip()))
+
+    if artwork_ids:
+        rows = (await db.execute(select(Artwork.id, Artwork.image_url).where(Artwork.id.in_(artwork_ids)))).all()
+        paths = {row.id: row.image_url.lstrip("/") for row in rows}
+        for artwork_id in artwork_ids:
+            items.append(({"source": "artwork_id", "ref": str(artwork_id)}, "path", paths.get(artwork_id)))
+
+    for upload in images:
+        # Dibaca sekarang karena UploadFile sudah ditutup saat stream berjalan
+        items.append(({"source": "upload", "ref": upload.filename}, "bytes", await upload.read()))
+
+    if not items:
+        raise HTTPException(status_code=400, detail="No images given")
+    if len(items) > settings.EXTRACT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch too large (max {settings.EXTRACT_BATCH_MAX_ITEMS} items)")
+
+    logger.info(f"EXTRACT: Batch request with {len(items)} items")
+
+    loop = asyncio.get_running_loop()
+    executor = get_extract_executor(settings.EXTRACT_BATCH_WORKERS)
+    semaphore = asyncio.Semaphore(settings.EXTRACT_BATCH_CONCURRENCY)
+
+    async def run_item(index, meta, kind, value):
+        result = {"index": index, **meta}
+        if value is None:
+            result.update({"status": "error", "detail": "Image not found"})
+            return result
+        async with semaphore:
             try:
-                os.remove(temp_path)
-                logger.info(f"EXTRACT: Cleaned up temporary file: {temp_path}")
+                result.update(await loop.run_in_executor(
+                    executor, extract_watermark_job, kind, value, buyer_secret_code
+                ))
             except Exception as e:
-                logger.error(f"EXTRACT: Failed to remove temporary file {temp_path}: {e}")
\ No newline at end of file
+                logger.error(f"EXTRACT: Batch item {index} failed: {e}")
+                result.update({"status": "error", "detail": str(e)})
+        return result
+
+    async def stream_results():
+        tasks = [asyncio.ensure_future(run_item(i, *item)) for i, item in enumerate(items)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
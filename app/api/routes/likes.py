@@ -1,41 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.models.user import User
+from app.db.database import get_db, get_read_db
 from app.models.like import Like
-from app.models.artwork import Artwork
-from app.api.deps import get_current_user
+from app.crud.like_crud import toggle_like as toggle_artwork_like
+from app.api.deps import get_current_user_cached
+from app.core.query_budget import query_budget
+from app.schemas.user_schema import CurrentUser
 from app.schemas.like_schema import LikeResponse
 from uuid import UUID
 
 router = APIRouter()
 
-@router.post("/{artwork_id}", status_code=200)
+@router.post("/{artwork_id}", status_code=200, dependencies=[query_budget(2)])
 def toggle_like(
     artwork_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user_cached)
 ):
-    artwork = db.query(Artwork).filter(Artwork.id == artwork_id).first()
-    if not artwork:
+    result = toggle_artwork_like(db, current_user.id, artwork_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Artwork not found")
+    db.commit()
 
-    existing_like = db.query(Like).filter_by(user_id=current_user.id, artwork_id=artwork_id).first()
+    liked, like_count = result
+    return {
+        "message": "Liked the artwork" if liked else "Unliked the artwork",
+        "liked": liked,
+        "like_count": like_count
+    }
 
-    if existing_like:
-        db.delete(existing_like)
-        db.commit()
-        return {"message": "Unliked the artwork"}
-    else:
-        new_like = Like(user_id=current_user.id, artwork_id=artwork_id)
-        db.add(new_like)
-        db.commit()
-        return {"message": "Liked the artwork"}
-
-@router.get("/me", response_model=list[LikeResponse])
+@router.get("/me", response_model=list[LikeResponse], dependencies=[query_budget(2)])
 def get_my_likes(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user_cached)
 ):
     likes = db.query(Like).filter_by(user_id=current_user.id).all()
     return likes
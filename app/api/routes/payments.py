@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Path
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from pydantic import BaseModel
-from app.db.database import get_db
+from app.db.database import get_async_db, get_async_read_db
 from app.models.user import User
 from app.models.artwork import Artwork
 from app.models.receipt import Receipt, ReceiptStatusEnum
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user_cached
+from app.core.query_budget import query_budget
+from app.schemas.user_schema import CurrentUser
 from app.schemas.receipt_schema import ReceiptDetailResponse
-from app.utils.send_email import send_purchase_email
-import requests
+from app.services.midtrans import get_midtrans_client, MidtransError, MidtransUnavailable
+from app.services.payment_inbox import enqueue_notification_async
+from app.core.ids import uuid7
 import os
-import base64
 import hashlib
 import json
 import uuid
@@ -20,7 +24,6 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 MIDTRANS_SERVER_KEY = os.getenv("MIDTRANS_SERVER_KEY")
-MIDTRANS_URL = "https://app.sandbox.midtrans.com/snap/v1/transactions"
 BACKEND_API_BASE_URL = os.getenv("BACKEND_API_BASE_URL", "http://localhost:8000")
 FRONTEND_BASE_URL = os.getenv("FRONTEND_BASE_URL", "http://localhost:3000")
 
@@ -33,21 +36,21 @@ class PurchaseRequest(BaseModel):
 @router.post("/initiate-payment")
 async def initiate_payment(
     purchase_request: PurchaseRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_cached)
 ):
-    artwork = db.query(Artwork).filter(Artwork.id == purchase_request.artwork_id).first()
+    artwork = await db.scalar(select(Artwork).where(Artwork.id == purchase_request.artwork_id))
     if not artwork:
         raise HTTPException(status_code=404, detail="Karya seni tidak ditemukan")
     
     if artwork.price <= 0:
         raise HTTPException(status_code=400, detail="Karya ini gratis, tidak memerlukan pembayaran.")
 
-    existing_receipt = db.query(Receipt).filter(
+    existing_receipt = await db.scalar(select(Receipt.id).where(
         Receipt.buyer_id == current_user.id,
         Receipt.artwork_id == artwork.id,
         Receipt.status.in_([ReceiptStatusEnum.pending, ReceiptStatusEnum.paid])
-    ).first()
+    ).limit(1))
     if existing_receipt:
         raise HTTPException(status_code=400, detail="Karya ini sudah dibeli atau sedang dalam proses pembayaran.")
 
@@ -57,13 +60,6 @@ async def initiate_payment(
     if not MIDTRANS_SERVER_KEY:
         raise HTTPException(status_code=500, detail="Kunci server Midtrans tidak diatur.")
 
-    auth_header = base64.b64encode(f"{MIDTRANS_SERVER_KEY}:".encode()).decode()
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-        "Authorization": f"Basic {auth_header}"
-    }
-
     artwork_detail_url_base = purchase_request.success_redirect_url.split('?')[0]
     midtrans_notification_url = os.getenv("MIDTRANS_NOTIFICATION_URL_BASE")
     if not midtrans_notification_url:
@@ -96,12 +92,10 @@ async def initiate_payment(
     }
 
     try:
-        response = requests.post(MIDTRANS_URL, headers=headers, json=payload)
-        response.raise_for_status()
-        data = response.json()
+        data = await get_midtrans_client().create_transaction(payload)
 
         temp_receipt = Receipt(
-            id=uuid.uuid4(),
+            id=uuid7(),
             buyer_id=current_user.id,
             artwork_id=artwork.id,
             amount=artwork.price,
@@ -110,8 +104,7 @@ async def initiate_payment(
             status=ReceiptStatusEnum.pending
         )
         db.add(temp_receipt)
-        db.commit()
-        db.refresh(temp_receipt)
+        await db.commit()
 
         return {
             "message": "Pembayaran berhasil diinisiasi",
@@ -120,19 +113,23 @@ async def initiate_payment(
             "receipt_id": str(temp_receipt.id)
         }
 
-    except requests.exceptions.RequestException:
-        db.rollback()
+    except MidtransUnavailable:
+        await db.rollback()
+        raise HTTPException(status_code=503, detail="Layanan pembayaran sedang tidak tersedia, coba lagi nanti.")
+    except MidtransError as e:
+        await db.rollback()
+        logger.error(f"Midtrans create transaction failed for {order_id}: {e}")
         raise HTTPException(status_code=503, detail="Gagal terhubung ke layanan pembayaran.")
     except HTTPException as e:
-        db.rollback()
+        await db.rollback()
         raise e
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Terjadi kesalahan internal: {e}")
 
 
 @router.post("/payment-callback")
-async def payment_callback(request: Request, db: Session = Depends(get_db)):
+async def payment_callback(request: Request, db: AsyncSession = Depends(get_async_db)):
     payload_bytes = await request.body()
     try:
         callback_data = json.loads(payload_bytes)
@@ -147,7 +144,7 @@ async def payment_callback(request: Request, db: Session = Depends(get_db)):
 
     server_key = os.getenv("MIDTRANS_SERVER_KEY")
     if not server_key:
-        return {"message": "Server key not configured. Processing halted."}, 200
+        return {"message": "Server key not configured. Processing halted."}
 
     input_string = f"{order_id}{status_code}{gross_amount}{server_key}"
     expected_signature = hashlib.sha512(input_string.encode()).hexdigest()
@@ -155,72 +152,25 @@ async def payment_callback(request: Request, db: Session = Depends(get_db)):
     if received_signature != expected_signature:
         raise HTTPException(status_code=403, detail="Signature tidak valid")
 
-    receipt = db.query(Receipt).filter_by(order_id=order_id).first()
-    if not receipt:
-        return {"message": f"Receipt for order_id {order_id} not found. Processing halted."}, 200
-
-    receipt.transaction_id = callback_data.get("transaction_id")
-    receipt.payment_type = callback_data.get("payment_type")
-    email_should_be_sent = False
-    artwork_to_update = None
-
-    if transaction_status == "settlement":
-        if receipt.status != ReceiptStatusEnum.paid:
-            receipt.status = ReceiptStatusEnum.paid
-            email_should_be_sent = True
-            artwork = db.query(Artwork).filter_by(id=receipt.artwork_id).first()
-            if artwork and not artwork.is_sold:
-                artwork.is_sold = True
-                artwork_to_update = artwork
-    elif transaction_status == "pending":
-        if receipt.status not in [ReceiptStatusEnum.paid, ReceiptStatusEnum.pending]:
-            receipt.status = ReceiptStatusEnum.pending
-    elif transaction_status in ["expire", "cancel", "deny"]:
-        if receipt.status != ReceiptStatusEnum.paid:
-            receipt.status = (
-                ReceiptStatusEnum.expired if transaction_status == "expire"
-                else ReceiptStatusEnum.failed
-            )
-
+    # Cukup simpan ke inbox dan langsung balas 200; transisi status dan email dikerjakan worker
     try:
-        db.commit()
-        db.refresh(receipt)
-        if artwork_to_update:
-            db.refresh(artwork_to_update)
-
-        if receipt.status == ReceiptStatusEnum.paid and email_should_be_sent:
-            artwork = artwork_to_update or db.query(Artwork).filter_by(id=receipt.artwork_id).first()
-            buyer = db.query(User).filter_by(id=receipt.buyer_id).first()
-            if artwork and buyer:
-                try:
-                    await send_purchase_email(
-                        to_email=buyer.email,
-                        context={
-                            "artwork_title": artwork.title,
-                            "purchase_date": receipt.purchase_date.strftime("%d %B %Y"),
-                            "price": float(receipt.amount),
-                            "buyer_secret_code": receipt.buyer_secret_code,
-                            "download_url": f"{FRONTEND_BASE_URL}{artwork.image_url}",
-                            "watermark_api": f"{BACKEND_API_BASE_URL}/api/extract/extract-watermark",
-                            "image_url": artwork.image_url,
-                            "receipt_id": str(receipt.id)
-                        }
-                    )
-                except Exception:
-                    pass
+        await enqueue_notification_async(db, callback_data)
     except Exception as e:
-        db.rollback()
-        return {"message": "Callback Midtrans diterima, tetapi ada masalah internal saat menyimpan data.", "error": str(e)}, 200
+        await db.rollback()
+        logger.error(f"Failed to store Midtrans notification for {order_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Gagal menyimpan notifikasi")
 
-    return {"message": "Callback Midtrans diterima dan diproses"}, 200
+    return {"message": "Callback Midtrans diterima"}
 
 
-@router.get("/my-purchases")
+@router.get("/my-purchases", dependencies=[query_budget(2)])
 async def get_my_purchases(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user_cached)
 ):
-    receipts = db.query(Receipt).filter_by(buyer_id=current_user.id).all()
+    receipts = (await db.scalars(
+        select(Receipt).options(joinedload(Receipt.artwork)).where(Receipt.buyer_id == current_user.id)
+    )).all()
     return [
         {
             "receipt_id": str(r.id),
@@ -236,19 +186,19 @@ async def get_my_purchases(
     ]
 
 
-@router.get("/receipt/{id}", response_model=ReceiptDetailResponse)
+@router.get("/receipt/{id}", response_model=ReceiptDetailResponse, dependencies=[query_budget(2)])
 async def get_receipt_detail(
     id: str = Path(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user_cached)
 ):
-    receipt = db.query(Receipt).filter(Receipt.id == id).first()
+    receipt = await db.scalar(select(Receipt).options(joinedload(Receipt.artwork)).where(Receipt.id == id))
     if not receipt:
         raise HTTPException(status_code=404, detail="Struk tidak ditemukan")
     if receipt.buyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Kamu tidak memiliki akses ke struk ini")
 
-    artwork = db.query(Artwork).filter_by(id=receipt.artwork_id).first()
+    artwork = receipt.artwork
     if not artwork:
         raise HTTPException(status_code=404, detail="Artwork terkait tidak ditemukan.")
 
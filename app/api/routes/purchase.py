@@ -4,10 +4,10 @@ from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.db.database import get_db
-from app.models.user import User
 from app.models.artwork import Artwork
-from app.models.purchase import Purchase
-from app.api.deps import get_current_user
+from app.crud.artwork_crud import claim_artwork
+from app.api.deps import get_current_user_cached
+from app.schemas.user_schema import CurrentUser
 
 router = APIRouter()
 
@@ -15,41 +15,36 @@ router = APIRouter()
 def purchase_artwork(
     artwork_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user_cached)
 ):
-    artwork = db.query(Artwork).filter(Artwork.id == artwork_id).first()
-    if not artwork:
+    claimed = claim_artwork(db, artwork_id, current_user.id)
+
+    if claimed is None:
+        # Klaim gagal; baru di sini cari tahu alasannya
+        db.rollback()
+        artwork = db.query(Artwork.owner_id).filter(Artwork.id == artwork_id).first()
+        if not artwork:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Artwork tidak ditemukan"
+            )
+        if artwork.owner_id == current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Kamu tidak bisa membeli karya milikmu sendiri"
+            )
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Artwork tidak ditemukan"
-        )
-
-    if artwork.owner_id == current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Kamu tidak bisa membeli karya milikmu sendiri"
-        )
-
-    if artwork.is_sold:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=status.HTTP_409_CONFLICT,
             detail="Artwork sudah terjual"
         )
 
-    existing_purchase = db.query(Purchase).filter_by(
-        user_id=current_user.id,
-        artwork_id=artwork_id
-    ).first()
-    if existing_purchase:
+    if not claimed.purchased:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Kamu sudah membeli karya ini"
         )
 
-    new_purchase = Purchase(user_id=current_user.id, artwork_id=artwork_id)
-    db.add(new_purchase)
-
-    artwork.is_sold = True
     db.commit()
 
     return JSONResponse(
@@ -57,10 +52,10 @@ def purchase_artwork(
         content={
             "message": "Pembelian berhasil",
             "artwork": {
-                "id": str(artwork.id),
-                "title": artwork.title,
-                "price": artwork.price,
-                "is_sold": artwork.is_sold
+                "id": str(claimed.id),
+                "title": claimed.title,
+                "price": float(claimed.price),
+                "is_sold": True
             }
         }
     )
@@ -1,17 +1,22 @@
 from fastapi import APIRouter, File, UploadFile, Form, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
 from app.models.user import User
 from app.models.artwork import Artwork, generate_unique_key # Asumsi generate_unique_key ada di artwork.py
 from app.api.deps import get_current_user
-from app.steganography import embed_message_lsb, xor_encrypt_decrypt
+from app.steganography import embed_message_lsb, xor_encrypt_decrypt, probe_copyright_header
 from app.utils.image_similarity import compute_all_hashes, is_similar_image
 import os, uuid, hashlib, io
 from PIL import Image
-from app.utils.send_email import send_certificate_email
+from app.services.email_service import queue_email, notify_email_worker
+from app.services.watermark import compute_copyright_hash, compute_file_digest
+from app.core.ids import uuid7
 import os
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = "static/uploads"
 WATERMARKED_DIR = "static/watermarked"
@@ -27,14 +32,14 @@ async def upload_artwork(
     price: float = Form(0.00),
     image: UploadFile = File(...),
     watermark_creator_message: str = Form(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     temp_file_path = None
     watermarked_image_path = None
 
     try:
-        merged_user = db.merge(current_user)
+        merged_user = await db.merge(current_user)
         user_id_str = str(merged_user.id)
         unique_key = generate_unique_key(user_id_str, title, image.filename)
         _, file_extension = os.path.splitext(image.filename)
@@ -54,9 +59,25 @@ async def upload_artwork(
 
         content = await image.read()
         pil_image = Image.open(io.BytesIO(content)).convert("RGB")
+
+        # Cek cepat: file hasil watermark kita sendiri cukup dikenali dari header LSB
+        probed_hash = probe_copyright_header(pil_image)
+        if probed_hash:
+            source_artwork = (await db.execute(
+                select(Artwork.id, Artwork.title).where(Artwork.copyright_hash == probed_hash)
+            )).first()
+            if source_artwork:
+                logger.warning(f"UPLOAD: Re-upload of watermarked artwork {source_artwork.id} by user {user_id_str}")
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Gambar ini sudah memiliki watermark dari karya '{source_artwork.title}' (ID: {source_artwork.id})."
+                )
+            logger.warning(f"UPLOAD: Watermark {probed_hash} found but no matching artwork, rejecting upload")
+            raise HTTPException(status_code=409, detail="Gambar ini sudah memiliki watermark hak cipta.")
+
         uploaded_hashes = compute_all_hashes(pil_image)
 
-        existing_artworks = db.query(Artwork).all()
+        existing_artworks = (await db.scalars(select(Artwork))).all()
         for artwork_item in existing_artworks: 
             if is_similar_image(uploaded_hashes, pil_image, artwork_item):
                 raise HTTPException(status_code=400, detail="Gambar Ditemukan mirip atau sudah pernah diunggap (terdeteksi duplikat).")
@@ -64,7 +85,7 @@ async def upload_artwork(
         with open(temp_file_path, "wb") as f:
             f.write(content)
 
-        watermark_hak_cipta = hashlib.sha256(unique_key.encode()).hexdigest()
+        watermark_hak_cipta = compute_copyright_hash(unique_key)
         
         artwork_secret_code_for_watermark = None
         pesan_gabungan = f"COPYRIGHT:{watermark_hak_cipta}"
@@ -84,6 +105,7 @@ async def upload_artwork(
         final_image_name = f"{filename_without_ext}.{file_extension}"
         final_image_path = os.path.join(WATERMARKED_DIR, final_image_name)
         os.rename(watermarked_image_path, final_image_path)
+        file_digest = compute_file_digest(final_image_path)
 
         BASE_URL = "http://localhost:8000"
         image_url_db = f"/static/watermarked/{final_image_name}"
@@ -91,7 +113,7 @@ async def upload_artwork(
 
 
         artwork = Artwork(
-            id=uuid.uuid4(),
+            id=uuid7(),
             owner_id=merged_user.id,
             title=title,
             description=description,
@@ -104,15 +126,16 @@ async def upload_artwork(
             hash_phash=uploaded_hashes["phash"],
             hash_dhash=uploaded_hashes["dhash"],
             hash_whash=uploaded_hashes["whash"],
+            copyright_hash=watermark_hak_cipta,
+            file_digest=file_digest,
             artwork_secret_code=artwork_secret_code_for_watermark
         )
         db.add(artwork)
-        db.commit()
-        db.refresh(artwork)
-
-        await send_certificate_email(
-            to_email=merged_user.email,
-            context={
+        queue_email(
+            db,
+            merged_user.email,
+            "certificate",
+            {
                 "title": title,
                 "category": category or "-",
                 "description": description or "-",
@@ -121,6 +144,8 @@ async def upload_artwork(
                 "image_url": image_url_full
             }
         )
+        await db.commit()
+        notify_email_worker()
 
         return {
             "message": "Artwork uploaded successfully with steganography",
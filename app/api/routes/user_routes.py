@@ -1,7 +1,7 @@
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from app.api.deps import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
 from app.models.user import User
 from uuid import UUID
 import shutil
@@ -13,9 +13,9 @@ router = APIRouter()
 async def upload_profile_picture(
     user_id: UUID,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -28,7 +28,7 @@ async def upload_profile_picture(
         shutil.copyfileobj(file.file, buffer)
 
     user.profile_picture = f"/api/media/{relative_path}"
-    db.commit()
+    await db.commit()
 
     return {
         "message": "Profile picture uploaded successfully",
@@ -1,12 +1,20 @@
 from fastapi import (
-    APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
+    APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Response
 )
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.responses import StreamingResponse
-from app.schemas.user_schema import UserResponse, UserLogin, UserUpdate
+from app.schemas.user_schema import UserResponse, UserLogin, UserUpdate, CurrentUser
 from app.models.user import User
-from app.api.deps import get_db, get_current_user
-from passlib.hash import bcrypt
+from app.models.artwork import Artwork
+from app.models.like import Like
+from app.api.deps import get_db, get_current_user_cached
+from app.db.database import get_async_db
+from app.services.user_cache import invalidate_user
+from app.services.hashing import hash_password_async, hash_password, verify_password, needs_rehash
+from app.core.ids import uuid7
+from app.core.serialization import dumps
 import uuid
 import os
 import shutil
@@ -16,6 +24,9 @@ router = APIRouter()
 UPLOAD_DIR = "static/profile_pictures"
 BASE_URL = "/static/profile_pictures"   
 
+# Kolom yang dibutuhkan UserResponse untuk listing (get_all_users)
+USER_RESPONSE_COLUMNS = tuple(getattr(User, name) for name in UserResponse.model_fields)
+
 
 @router.post("/register", response_model=UserResponse)
 async def register_user(
@@ -25,12 +36,12 @@ async def register_user(
     name: str = Form(...),
     password: str = Form(...),
     file: UploadFile = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if db.query(User).filter(User.email == email).first():
+    if await db.scalar(select(User.id).where(User.email == email)):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user_id = uuid.uuid4()
+    user_id = uuid7()
     profile_picture_url = None
 
     if file:
@@ -48,12 +59,12 @@ async def register_user(
         username=username,
         email=email,
         name=name,
-        password_hash=bcrypt.hash(password),
+        password_hash=await hash_password_async(password),
         profile_picture=profile_picture_url
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return UserResponse.model_validate(new_user)
 
@@ -65,13 +76,18 @@ def login_user(user: UserLogin, db: Session = Depends(get_db)):
     if not db_user:
         raise HTTPException(status_code=404, detail="Email tidak ditemukan")
 
-    if not bcrypt.verify(user.password, db_user.password_hash):
+    if not verify_password(user.password, db_user.password_hash):
         raise HTTPException(status_code=401, detail="Password salah")
 
+    if needs_rehash(db_user.password_hash):
+        db_user.password_hash = hash_password(user.password)
+        db.commit()
+        db.refresh(db_user)
+
     return UserResponse.model_validate(db_user)
 
 @router.get("/me", response_model=UserResponse)
-def read_current_user(current_user: User = Depends(get_current_user)):
+def read_current_user(current_user: CurrentUser = Depends(get_current_user_cached)):
     return UserResponse.model_validate(current_user)
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -95,12 +111,13 @@ def update_user(user_id: uuid.UUID, update: UserUpdate, db: Session = Depends(ge
     
     db.commit()
     db.refresh(db_user)
+    invalidate_user(db_user.id)
 
     return UserResponse.model_validate(db_user) # Pastikan mengembalikan model yang divalidasi
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: uuid.UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def delete_user(user_id: uuid.UUID, db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_current_user_cached)):
     db_user = db.query(User).filter(User.id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -114,12 +131,20 @@ def delete_user(user_id: uuid.UUID, db: Session = Depends(get_db), current_user:
         if os.path.exists(file_path):
             os.remove(file_path)
 
+    # Like milik user ikut terhapus lewat cascade ORM; kurangi like_count artwork yang pernah di-like
+    db.execute(
+        update(Artwork)
+        .where(Artwork.id.in_(select(Like.artwork_id).where(Like.user_id == db_user.id)))
+        .values(like_count=Artwork.like_count - 1)
+    )
     db.delete(db_user)
     db.commit()
+    invalidate_user(user_id)
     return {"message": "User deleted successfully"}
 
 
 @router.get("/", response_model=list[UserResponse])
 def get_all_users(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
-    users = db.query(User).offset(skip).limit(limit).all()
-    return [UserResponse.model_validate(user) for user in users]
\ No newline at end of file
+    # Hanya kolom UserResponse, langsung ke orjson (tanpa objek ORM dan model_validate per user)
+    rows = db.query(*USER_RESPONSE_COLUMNS).offset(skip).limit(limit).all()
+    return Response(content=dumps([row._asdict() for row in rows]), media_type="application/json")
\ No newline at end of file
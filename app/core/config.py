@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,6 +9,18 @@ class Settings(BaseSettings):
     PROJECT_VERSION: str = "1.0.0"
 
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
+    DB_POOL_SIZE: int = Field(3, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(10, env="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: float = Field(30.0, env="DB_POOL_TIMEOUT")
+    DB_POOL_RECYCLE: int = Field(1800, env="DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING: bool = Field(True, env="DB_POOL_PRE_PING")
+    DB_STATEMENT_TIMEOUT_MS: int = Field(30000, env="DB_STATEMENT_TIMEOUT_MS")
+    DB_APPLICATION_NAME: str = Field("stegano-api", env="DB_APPLICATION_NAME")
+    # Route read-only (explore, detail artwork, my-purchases, ...) membaca dari replica ini jika diisi
+    DATABASE_REPLICA_URL: Optional[str] = Field(None, env="DATABASE_REPLICA_URL")
+    # Setelah user menulis, pembacaannya tetap ke primary selama ini (harus > replication lag).
+    # Lintas worker/instance jendela ini dibawa cookie "ryw"; klien tanpa cookie hanya dijamin di proses yang sama
+    READ_YOUR_WRITES_SECONDS: float = Field(5.0, env="READ_YOUR_WRITES_SECONDS")
     SECRET_KEY: str = Field(..., env="SECRET_KEY")
     ALGORITHM: str = Field("HS256", env="ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(60 * 24 * 7, env="ACCESS_TOKEN_EXPIRE_MINUTES")
@@ -21,4 +34,64 @@ class Settings(BaseSettings):
     MAIL_STARTTLS: bool = Field(True, env="MAIL_STARTTLS")
     MAIL_SSL_TLS: bool = Field(False, env="MAIL_SSL_TLS")
 
+    EXTRACT_BATCH_WORKERS: int = Field(2, env="EXTRACT_BATCH_WORKERS")
+    EXTRACT_BATCH_CONCURRENCY: int = Field(8, env="EXTRACT_BATCH_CONCURRENCY")
+    EXTRACT_BATCH_MAX_ITEMS: int = Field(500, env="EXTRACT_BATCH_MAX_ITEMS")
+
+    USER_CACHE_TTL_SECONDS: int = Field(30, env="USER_CACHE_TTL_SECONDS")
+    USER_CACHE_MAX_SIZE: int = Field(10000, env="USER_CACHE_MAX_SIZE")
+
+    QUERY_BUDGET_STRICT: bool = Field(False, env="QUERY_BUDGET_STRICT")
+
+    BCRYPT_ROUNDS: int = Field(12, env="BCRYPT_ROUNDS")
+    PASSWORD_HASH_WORKERS: int = Field(2, env="PASSWORD_HASH_WORKERS")
+    PASSWORD_HASH_MAX_QUEUE: int = Field(64, env="PASSWORD_HASH_MAX_QUEUE")
+
+    MIDTRANS_SERVER_KEY: Optional[str] = Field(None, env="MIDTRANS_SERVER_KEY")
+    MIDTRANS_SNAP_URL: str = Field("https://app.sandbox.midtrans.com/snap/v1/transactions", env="MIDTRANS_SNAP_URL")
+    MIDTRANS_API_BASE_URL: str = Field("https://api.sandbox.midtrans.com", env="MIDTRANS_API_BASE_URL")
+    MIDTRANS_CONNECT_TIMEOUT: float = Field(3.0, env="MIDTRANS_CONNECT_TIMEOUT")
+    MIDTRANS_READ_TIMEOUT: float = Field(10.0, env="MIDTRANS_READ_TIMEOUT")
+    MIDTRANS_MAX_CONNECTIONS: int = Field(20, env="MIDTRANS_MAX_CONNECTIONS")
+    MIDTRANS_MAX_RETRIES: int = Field(2, env="MIDTRANS_MAX_RETRIES")
+    MIDTRANS_RETRY_BASE_BACKOFF: float = Field(0.2, env="MIDTRANS_RETRY_BASE_BACKOFF")
+    MIDTRANS_RETRY_MAX_BACKOFF: float = Field(2.0, env="MIDTRANS_RETRY_MAX_BACKOFF")
+    MIDTRANS_BREAKER_THRESHOLD: int = Field(5, env="MIDTRANS_BREAKER_THRESHOLD")
+    MIDTRANS_BREAKER_RESET_SECONDS: float = Field(30.0, env="MIDTRANS_BREAKER_RESET_SECONDS")
+
+    PAYMENT_INBOX_WORKER_ENABLED: bool = Field(True, env="PAYMENT_INBOX_WORKER_ENABLED")
+    PAYMENT_INBOX_BATCH_SIZE: int = Field(100, env="PAYMENT_INBOX_BATCH_SIZE")
+    PAYMENT_INBOX_POLL_INTERVAL: float = Field(1.0, env="PAYMENT_INBOX_POLL_INTERVAL")
+    PAYMENT_INBOX_BATCH_WINDOW: float = Field(0.2, env="PAYMENT_INBOX_BATCH_WINDOW")
+    # Percobaan gagal (atau receipt belum ada) diulang dengan backoff eksponensial; setelah
+    # MAX_ATTEMPTS baris di-dead-letter (dead_lettered_at), tidak hilang diam-diam
+    PAYMENT_INBOX_MAX_ATTEMPTS: int = Field(8, env="PAYMENT_INBOX_MAX_ATTEMPTS")
+    PAYMENT_INBOX_RETRY_BASE_SECONDS: float = Field(5.0, env="PAYMENT_INBOX_RETRY_BASE_SECONDS")
+    PAYMENT_INBOX_RETRY_MAX_SECONDS: float = Field(600.0, env="PAYMENT_INBOX_RETRY_MAX_SECONDS")
+
+    EMAIL_WORKER_ENABLED: bool = Field(True, env="EMAIL_WORKER_ENABLED")
+    EMAIL_BATCH_SIZE: int = Field(50, env="EMAIL_BATCH_SIZE")
+    EMAIL_POLL_INTERVAL: float = Field(2.0, env="EMAIL_POLL_INTERVAL")
+    EMAIL_MAX_ATTEMPTS: int = Field(8, env="EMAIL_MAX_ATTEMPTS")
+    EMAIL_RETRY_BASE_SECONDS: float = Field(30.0, env="EMAIL_RETRY_BASE_SECONDS")
+    EMAIL_RETRY_MAX_SECONDS: float = Field(3600.0, env="EMAIL_RETRY_MAX_SECONDS")
+    EMAIL_LEASE_SECONDS: int = Field(300, env="EMAIL_LEASE_SECONDS")
+    EMAIL_SMTP_POOL_SIZE: int = Field(2, env="EMAIL_SMTP_POOL_SIZE")
+    EMAIL_SMTP_TIMEOUT: float = Field(30.0, env="EMAIL_SMTP_TIMEOUT")
+
+    EXPLORE_DEFAULT_LIMIT: int = Field(24, env="EXPLORE_DEFAULT_LIMIT")
+    EXPLORE_MAX_LIMIT: int = Field(100, env="EXPLORE_MAX_LIMIT")
+    EXPLORE_COUNT_TTL_SECONDS: int = Field(60, env="EXPLORE_COUNT_TTL_SECONDS")
+    EXPLORE_COUNT_CACHE_SIZE: int = Field(1024, env="EXPLORE_COUNT_CACHE_SIZE")
+    EXPLORE_COUNT_ESTIMATE_THRESHOLD: int = Field(100000, env="EXPLORE_COUNT_ESTIMATE_THRESHOLD")
+    EXPLORE_CACHE_TTL_SECONDS: int = Field(30, env="EXPLORE_CACHE_TTL_SECONDS")
+    EXPLORE_CACHE_SIZE: int = Field(512, env="EXPLORE_CACHE_SIZE")
+
+    RECONCILE_ENABLED: bool = Field(True, env="RECONCILE_ENABLED")
+    RECONCILE_INTERVAL_SECONDS: float = Field(300.0, env="RECONCILE_INTERVAL_SECONDS")
+    RECONCILE_STALE_AFTER_MINUTES: int = Field(15, env="RECONCILE_STALE_AFTER_MINUTES")
+    RECONCILE_EXPIRE_AFTER_HOURS: int = Field(24, env="RECONCILE_EXPIRE_AFTER_HOURS")
+    RECONCILE_PAGE_SIZE: int = Field(200, env="RECONCILE_PAGE_SIZE")
+    RECONCILE_CONCURRENCY: int = Field(10, env="RECONCILE_CONCURRENCY")
+
 settings = Settings() 
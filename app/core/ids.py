@@ -0,0 +1,53 @@
+"""UUIDv7 (RFC 9562) untuk primary key.
+
+48 bit pertama adalah Unix time dalam milidetik, jadi id baru selalu masuk
+di ujung kanan index B-tree (tidak menyebar seperti uuid4) dan urutan id
+mengikuti urutan insert. 12 bit rand_a dipakai sebagai counter supaya id
+yang dibuat di milidetik yang sama tetap monoton dalam satu proses.
+"""
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+_COUNTER_MAX = 0xFFF
+
+
+def uuid7() -> uuid.UUID:
+    global _last_ms, _counter
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Mulai dari nilai acak di separuh bawah supaya masih ada ruang untuk increment
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        elif _counter < _COUNTER_MAX:
+            _counter += 1
+        else:
+            # Counter habis (atau jam mundur): pinjam milidetik berikutnya, urutan tetap terjaga
+            _last_ms += 1
+            _counter = 0
+        ms, counter = _last_ms, _counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    return uuid.UUID(int=(ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b)
+
+
+# Padanan di sisi database untuk insert di luar ORM (SQL mentah, migrasi, psql).
+# PostgreSQL < 18 belum punya uuidv7(): ambil gen_random_uuid(), timpa 6 byte
+# pertama dengan epoch milidetik lalu ubah nibble versi 4 -> 7 (bit 52 dan 53).
+UUID7_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION gen_uuid_v7() RETURNS uuid AS $$
+    SELECT encode(
+        set_bit(set_bit(
+            overlay(uuid_send(gen_random_uuid())
+                    PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                    FROM 1 FOR 6),
+            52, 1), 53, 1),
+        'hex')::uuid
+$$ LANGUAGE sql VOLATILE
+"""
@@ -0,0 +1,77 @@
+import threading
+
+# Registry metrik in-process sederhana, dirender dalam format teks Prometheus di GET /metrics
+_lock = threading.Lock()
+_metrics = {}
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help = name, help_text
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        with _lock:
+            self.value += amount
+
+    def samples(self):
+        return [(self.name, self.value)]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float):
+        with _lock:
+            self.value = value
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+
+class Summary:
+    kind = "summary"
+
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help = name, help_text
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        with _lock:
+            self.count += 1
+            self.total += value
+
+    def samples(self):
+        return [(f"{self.name}_count", self.count), (f"{self.name}_sum", self.total)]
+
+
+def _register(metric):
+    with _lock:
+        return _metrics.setdefault(metric.name, metric)
+
+
+def counter(name: str, help_text: str) -> Counter:
+    return _register(Counter(name, help_text))
+
+
+def gauge(name: str, help_text: str) -> Gauge:
+    return _register(Gauge(name, help_text))
+
+
+def summary(name: str, help_text: str) -> Summary:
+    return _register(Summary(name, help_text))
+
+
+def render_prometheus() -> str:
+    lines = []
+    with _lock:
+        metrics = list(_metrics.values())
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for sample_name, value in metric.samples():
+            lines.append(f"{sample_name} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,89 @@
+import logging
+from contextvars import ContextVar
+from typing import Optional
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+budget_exceeded = metrics.counter("query_budget_exceeded_total", "Requests that ran more SQL statements than their route's budget")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class QueryStats:
+    __slots__ = ("count", "budget", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.budget: Optional[int] = None
+        self.statements = []
+
+
+# Diset per request oleh QueryCounterMiddleware. Objeknya mutable, jadi hitungan dari
+# threadpool (route/dependency sync mendapat salinan context) tetap terlihat di middleware.
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.count += 1
+    if len(stats.statements) < 20:
+        stats.statements.append(statement)
+    if settings.QUERY_BUDGET_STRICT and stats.budget is not None and stats.count > stats.budget:
+        # Gagal tepat di statement yang melewati budget, supaya traceback menunjuk ke lazy load-nya
+        raise QueryBudgetExceeded(
+            f"Query budget of {stats.budget} exceeded; statements so far:\n" + "\n---\n".join(stats.statements)
+        )
+
+
+def query_budget(limit: int):
+    """Batas jumlah statement SQL untuk satu request, termasuk dependency (mis. lookup user).
+
+        @router.get("/x", dependencies=[query_budget(2)])
+
+    Dengan QUERY_BUDGET_STRICT (dipakai saat test) statement ke-(limit+1) melempar
+    QueryBudgetExceeded; di produksi hanya dicatat sebagai warning dan metrik.
+    """
+    def declare_budget():
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = limit
+    return Depends(declare_budget)
+
+
+class QueryCounterMiddleware:
+    """Hitung statement SQL per request dan kirim jumlahnya di header X-Query-Count."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-query-count", str(stats.count).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            _current.reset(token)
+            if stats.budget is not None and stats.count > stats.budget:
+                budget_exceeded.inc()
+                logger.warning(f"QUERY BUDGET: {scope['method']} {scope['path']} ran {stats.count} statements (budget {stats.budget})")
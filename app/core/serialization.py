@@ -0,0 +1,30 @@
+"""JSON cepat (orjson) untuk response API.
+
+Format output sama dengan pydantic v2 (`model_dump_json`): UUID dan datetime
+sebagai string ISO, Decimal sebagai string, tanpa spasi. Jadi body yang
+dulu dibuat lewat pydantic dan sekarang lewat dumps() byte-nya identik
+(ETag explore tidak berubah).
+"""
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+loads = orjson.loads
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """default_response_class app: encode dengan orjson, bukan json.dumps stdlib."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,18 +1,96 @@
+from uuid import UUID
+from sqlalchemy import select, update, literal, func, or_, cast, Numeric
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID as pgUUID
 from sqlalchemy.orm import Session
 from app.models.artwork import Artwork
+from app.models.purchase import Purchase
 from app.models.user import User
+from app.schemas.artwork_schema import ArtworkResponse
+from app.services.explore_cache import mark_explore_dirty
+
+# Listing hanya butuh kolom ArtworkResponse: tanpa search_vector, hash_* dan objek ORM.
+# Diturunkan dari schema supaya query dan response tidak bisa berbeda; liked_by_me dihitung per user.
+ARTWORK_RESPONSE_FIELDS = tuple(name for name in ArtworkResponse.model_fields if name != "liked_by_me")
+ARTWORK_RESPONSE_COLUMNS = tuple(getattr(Artwork, name) for name in ARTWORK_RESPONSE_FIELDS)
+
+
+def artwork_response_dict(row) -> dict:
+    """Row dari query yang diawali ARTWORK_RESPONSE_COLUMNS -> dict berbentuk ArtworkResponse."""
+    item = dict(zip(ARTWORK_RESPONSE_FIELDS, row))
+    item["liked_by_me"] = False
+    return item
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def artwork_search_condition(query: str):
+    """Cocok jika query ada di dokumen full-text (GIN ix_artworks_search_vector)
+    atau sebagai substring judul (GIN trigram ix_artworks_title_trgm)."""
+    tsquery = func.websearch_to_tsquery("simple", query)
+    return or_(
+        Artwork.search_vector.op("@@")(tsquery),
+        Artwork.title.ilike(f"%{_escape_like(query)}%", escape="\\")
+    )
+
+
+def artwork_search_rank(query: str):
+    """Relevansi: ts_rank_cd full-text + kemiripan trigram judul. Dibulatkan ke
+    numeric supaya nilainya stabil saat dipakai ulang di cursor."""
+    tsquery = func.websearch_to_tsquery("simple", query)
+    score = func.ts_rank_cd(Artwork.search_vector, tsquery) + func.similarity(Artwork.title, query)
+    return func.round(cast(score, Numeric), 6)
+
 
 def fet_all_artworks(
         db: Session,
         username: str = None,
         category: str = None,
-        license_type: str = None
+        license_type: str = None,
+        query: str = None
 ):
-    query = db.query(Artwork)
+    artworks = db.query(Artwork)
+    ranks = []
     if username:
-        query = query.join(User).filter(User.username.ilike(f"%{username}%"))
+        artworks = artworks.join(User).filter(User.username.ilike(f"%{_escape_like(username)}%", escape="\\"))
+        ranks.append(func.similarity(User.username, username).desc())
+    if query:
+        artworks = artworks.filter(artwork_search_condition(query))
+        ranks.append(artwork_search_rank(query).desc())
     if category:
-        query = query.filter(Artwork.category.ilike(f"%{category}%"))
+        artworks = artworks.filter(Artwork.category.ilike(f"%{category}%"))
     if license_type:
-        query = query.filter(Artwork.license_type.ilike(f"%{license_type}%"))
-    return query.all()
\ No newline at end of file
+        artworks = artworks.filter(Artwork.license_type.ilike(f"%{license_type}%"))
+    return artworks.order_by(*ranks, Artwork.created_at.desc(), Artwork.id.desc()).all()
+
+def claim_artwork(db: Session, artwork_id: UUID, user_id: UUID):
+    """Tandai artwork terjual dan catat Purchase dalam satu statement.
+
+    UPDATE ... WHERE NOT is_sold RETURNING dan INSERT purchases berjalan
+    sebagai CTE dalam satu round trip, jadi hanya satu pembeli yang bisa
+    menang. Mengembalikan (id, title, price, purchased) atau None jika
+    artwork tidak ada, sudah terjual, atau milik pembeli sendiri. Jika
+    purchased False (purchase sudah ada) caller harus rollback.
+    """
+    claimed = (
+        update(Artwork)
+        .where(Artwork.id == artwork_id, Artwork.is_sold.is_(False), Artwork.owner_id != user_id)
+        .values(is_sold=True)
+        .returning(Artwork.id, Artwork.title, Artwork.price)
+        .cte("claimed")
+    )
+    inserted = (
+        pg_insert(Purchase)
+        .from_select(["user_id", "artwork_id"], select(literal(user_id, pgUUID(as_uuid=True)), claimed.c.id))
+        .on_conflict_do_nothing()
+        .returning(Purchase.artwork_id)
+        .cte("inserted")
+    )
+    row = db.execute(
+        select(claimed.c.id, claimed.c.title, claimed.c.price, inserted.c.artwork_id.isnot(None).label("purchased"))
+        .select_from(claimed.outerjoin(inserted, inserted.c.artwork_id == claimed.c.id))
+    ).first()
+    if row is not None:
+        mark_explore_dirty(db)
+    return row
@@ -0,0 +1,64 @@
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, update, delete, exists, literal, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID as pgUUID
+from sqlalchemy.orm import Session
+from app.models.artwork import Artwork
+from app.models.like import Like
+from app.core.ids import uuid7
+
+
+def toggle_like(db: Session, user_id: UUID, artwork_id: UUID) -> Optional[Tuple[bool, int]]:
+    """Like/unlike dan perbarui artworks.like_count dalam satu statement.
+
+    DELETE ... RETURNING menghapus like yang ada; kalau tidak ada yang
+    terhapus, INSERT ... ON CONFLICT DO NOTHING menambahkannya (unique
+    uq_likes_user_artwork menahan double-like dari request paralel).
+    UPDATE artworks menerapkan selisihnya. Mengembalikan (liked, like_count)
+    atau None jika artwork tidak ada.
+    """
+    uid = literal(user_id, pgUUID(as_uuid=True))
+    aid = literal(artwork_id, pgUUID(as_uuid=True))
+    removed = (
+        delete(Like)
+        .where(Like.user_id == user_id, Like.artwork_id == artwork_id)
+        .returning(Like.artwork_id)
+        .cte("removed")
+    )
+    added = (
+        pg_insert(Like)
+        .from_select(
+            ["id", "user_id", "artwork_id"],
+            select(literal(uuid7(), pgUUID(as_uuid=True)), uid, aid).where(
+                ~exists(select(removed.c.artwork_id)),
+                exists(select(Artwork.id).where(Artwork.id == artwork_id))
+            )
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "artwork_id"])
+        .returning(Like.artwork_id)
+        .cte("added")
+    )
+    added_count = select(func.count()).select_from(added).scalar_subquery()
+    removed_count = select(func.count()).select_from(removed).scalar_subquery()
+    row = db.execute(
+        update(Artwork)
+        .where(Artwork.id == artwork_id)
+        .values(like_count=Artwork.like_count + added_count - removed_count)
+        .returning(Artwork.like_count, (added_count > 0).label("liked"), removed_count.label("removed"))
+    ).first()
+    if row is None:
+        return None
+    # Insert kalah race dengan request like paralel dari user yang sama: like sudah ada
+    return bool(row.liked or not row.removed), row.like_count
+
+
+def liked_artworks(db: Session, user_id: UUID, artwork_ids: Iterable[UUID]) -> Dict[UUID, int]:
+    """Artwork dari daftar ini yang sudah di-like user -> like_count terkini, dengan satu query."""
+    artwork_ids = list(artwork_ids)
+    if not artwork_ids:
+        return {}
+    return dict(db.execute(
+        select(Artwork.id, Artwork.like_count)
+        .join(Like, Like.artwork_id == Artwork.id)
+        .where(Like.user_id == user_id, Like.artwork_id.in_(artwork_ids))
+    ).all())
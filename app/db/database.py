@@ -1,8 +1,17 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, DDL
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core import metrics
+from app.core.ids import UUID7_FUNCTION_SQL
+from app.db.routing import RoutingSession
 from app.core.config import settings # Mengimpor objek settings
 from sqlalchemy.orm import Session
+from typing import AsyncGenerator, Optional
+import time
 import os
 
 from dotenv import load_dotenv
@@ -10,15 +19,190 @@ load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
+pool_checked_out = metrics.gauge("db_pool_checked_out", "Connections currently checked out of the app pool")
+pool_capacity = metrics.gauge("db_pool_capacity", "pool_size + max_overflow of the app pools (sync + async)")
+pool_checkouts = metrics.counter("db_pool_checkouts_total", "Connections handed out by the app pool")
+pool_timeouts = metrics.counter("db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT")
+pool_wait = metrics.summary("db_pool_wait_seconds", "Time spent waiting for a connection from the app pool")
+
+
+class _PoolWaitMixin:
+    """Catat berapa lama request menunggu koneksi dari pool."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait.observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_PoolWaitMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_PoolWaitMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_options(poolclass) -> dict:
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _without_queue_options(options: dict) -> dict:
+    if not issubclass(options["poolclass"], QueuePool):
+        for key in ("pool_size", "max_overflow", "pool_timeout"):
+            options.pop(key)
+    return options
+
+
+def create_app_engine(
+    url: Optional[str] = None,
+    application_name: Optional[str] = None,
+    statement_timeout_ms: Optional[int] = None,
+    **engine_kwargs
+) -> Engine:
+    """Engine dengan pool dan opsi koneksi dari settings; dipakai app, worker, dan Alembic.
+
+    statement_timeout_ms=0 mematikan statement_timeout (mis. untuk migrasi).
+    engine_kwargs menimpa opsi create_engine, mis. poolclass=NullPool.
+    """
+    url = url or settings.DATABASE_URL
+    statement_timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS if statement_timeout_ms is None else statement_timeout_ms
+
+    connect_args = {
+        "application_name": application_name or settings.DB_APPLICATION_NAME,
+        "options": f"-c statement_timeout={statement_timeout_ms}",
+    }
+    # RDS menerima koneksi tanpa TLS kalau tidak diminta; paksa kecuali URL sudah menentukan sslmode
+    if "amazonaws.com" in url and "sslmode" not in url:
+        connect_args["sslmode"] = "require"
+
+    options = _pool_options(InstrumentedQueuePool)
+    options["connect_args"] = connect_args
+    options.update(engine_kwargs)
+    return create_engine(url, **_without_queue_options(options))
+
+
+def create_async_app_engine(
+    url: Optional[str] = None,
+    application_name: Optional[str] = None,
+    statement_timeout_ms: Optional[int] = None,
+    **engine_kwargs
+) -> AsyncEngine:
+    """Versi asyncpg dari create_app_engine, untuk AsyncSession di route async."""
+    url = make_url(url or settings.DATABASE_URL).set(drivername="postgresql+asyncpg")
+    statement_timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS if statement_timeout_ms is None else statement_timeout_ms
+
+    connect_args = {
+        "server_settings": {
+            "application_name": application_name or settings.DB_APPLICATION_NAME,
+            "statement_timeout": str(statement_timeout_ms),
+        }
+    }
+    # asyncpg tidak mengenal parameter libpq sslmode; teruskan sebagai argumen ssl
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        url = url.difference_update_query(["sslmode"])
+        connect_args["ssl"] = sslmode
+    elif url.host and "amazonaws.com" in url.host:
+        connect_args["ssl"] = "require"
+
+    options = _pool_options(InstrumentedAsyncQueuePool)
+    options["connect_args"] = connect_args
+    options.update(engine_kwargs)
+    return create_async_engine(url, **_without_queue_options(options))
+
+
+def _instrument_pool(sync_engine: Engine):
+    pool_capacity.inc(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_checkouts.inc()
+        pool_checked_out.inc()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        pool_checked_out.dec()
+
+
 # Menggunakan URL database yang sudah benar untuk membuat engine
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_app_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Route async memakai AsyncSession (asyncpg) supaya query tidak memblokir event loop.
+# expire_on_commit=False: atribut tetap bisa dibaca setelah commit tanpa lazy load (tidak ada IO implisit di async)
+async_engine = create_async_app_engine(SQLALCHEMY_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+_instrument_pool(engine)
+_instrument_pool(async_engine.sync_engine)
+
+# Dependency read-only (get_read_db / get_async_read_db) membaca dari replica; tulis dan
+# read-your-writes tetap ke primary (lihat app.db.routing). Tanpa replica keduanya = SessionLocal biasa.
+replica_engine = None
+async_replica_engine = None
+if settings.DATABASE_REPLICA_URL:
+    replica_name = f"{settings.DB_APPLICATION_NAME}-replica"
+    replica_engine = create_app_engine(settings.DATABASE_REPLICA_URL, application_name=replica_name)
+    async_replica_engine = create_async_app_engine(settings.DATABASE_REPLICA_URL, application_name=replica_name)
+    _instrument_pool(replica_engine)
+    _instrument_pool(async_replica_engine.sync_engine)
+
+    ReadSessionLocal = sessionmaker(
+        class_=RoutingSession, primary=engine, replica=replica_engine, autocommit=False, autoflush=False
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        sync_session_class=RoutingSession,
+        primary=async_engine.sync_engine,
+        replica=async_replica_engine.sync_engine,
+        expire_on_commit=False,
+        autoflush=False
+    )
+else:
+    ReadSessionLocal = SessionLocal
+    AsyncReadSessionLocal = AsyncSessionLocal
+
+
 Base = declarative_base()
 
+# Index trigram (gin_trgm_ops) butuh extension pg_trgm sebelum create_all membuat tabel
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+# server_default primary key (gen_uuid_v7) harus ada sebelum tabelnya dibuat
+event.listen(Base.metadata, "before_create", DDL(UUID7_FUNCTION_SQL))
+
 def get_db():
     db: Session = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db():
+    db: Session = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncReadSessionLocal() as db:
+        yield db
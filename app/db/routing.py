@@ -0,0 +1,198 @@
+"""Read replica routing dengan read-your-writes.
+
+RoutingSession dipakai oleh dependency read-only (get_read_db,
+get_async_read_db): SELECT biasa dikirim ke replica, semua yang lain
+(INSERT/UPDATE/DELETE, flush, SELECT ... FOR UPDATE, text() tanpa
+.columns()) ke primary.
+
+Replica bisa tertinggal beberapa detik, jadi pembacaan pindah ke primary kalau:
+- session yang sama sudah menulis (tetap di primary sampai session ditutup), atau
+- user request ini menulis dalam READ_YOUR_WRITES_SECONDS terakhir (mis. like
+  lalu buka /likes/me).
+
+Jendela per user itu dibawa klien dalam cookie READ_YOUR_WRITES_COOKIE (diset
+ReadYourWritesMiddleware setelah request yang menulis, ditandatangani dengan
+SECRET_KEY), jadi tetap berlaku kalau request berikutnya masuk ke worker atau
+instance lain. Klien yang tidak mengirim cookie (fetch tanpa credentials) dan
+tulisan untuk user lain (mark_user_wrote, mis. worker menandai struk paid)
+hanya tercatat di proses yang menulis.
+"""
+import hashlib
+import hmac
+import math
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+from uuid import UUID
+from sqlalchemy import Select, TextualSelect, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.requests import HTTPConnection
+from app.core import metrics
+from app.core.config import settings
+
+replica_reads = metrics.counter("db_replica_reads_total", "Read-session statements served by the replica")
+primary_fallbacks = metrics.counter("db_replica_fallbacks_total", "Read sessions switched to the primary (write or read-your-writes window)")
+
+# User yang sedang dilayani request ini; diset dependency auth di app.api.deps
+request_user_id: ContextVar[Optional[UUID]] = ContextVar("request_user_id", default=None)
+
+# user_id -> batas (monotonic) jendela read-your-writes
+_recent_writers: Dict[UUID, float] = {}
+_lock = threading.Lock()
+
+_PRUNE_AT = 10_000
+
+READ_YOUR_WRITES_COOKIE = "ryw"
+
+
+class ReadYourWritesState:
+    __slots__ = ("cookie", "wrote_until")
+
+    def __init__(self, cookie: Optional[str]):
+        self.cookie = cookie
+        # (user_id, batas epoch) kalau request ini menulis; middleware mengubahnya jadi Set-Cookie
+        self.wrote_until: Optional[tuple] = None
+
+
+# Diset per request oleh ReadYourWritesMiddleware; mutable seperti QueryStats di app.core.query_budget
+_request_state: ContextVar[Optional[ReadYourWritesState]] = ContextVar("read_your_writes", default=None)
+
+
+def _signature(user_id: UUID, deadline: int) -> str:
+    message = f"{user_id}:{deadline}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()[:32]
+
+
+def make_write_cookie(user_id: UUID, deadline: int) -> str:
+    return f"{deadline}.{_signature(user_id, deadline)}"
+
+
+def cookie_says_wrote(cookie: Optional[str], user_id: UUID) -> bool:
+    """True kalau cookie menandai tulisan user ini yang jendelanya belum habis."""
+    if not cookie:
+        return False
+    deadline, _, signature = cookie.partition(".")
+    if not deadline.isdigit() or int(deadline) <= time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(user_id, int(deadline)))
+
+
+def note_user_write(user_id: UUID):
+    now = time.monotonic()
+    with _lock:
+        _recent_writers[user_id] = now + settings.READ_YOUR_WRITES_SECONDS
+        if len(_recent_writers) > _PRUNE_AT:
+            for uid, deadline in list(_recent_writers.items()):
+                if deadline <= now:
+                    del _recent_writers[uid]
+
+
+def wrote_recently(user_id: Optional[UUID]) -> bool:
+    if user_id is None:
+        return False
+    deadline = _recent_writers.get(user_id)
+    if deadline is not None and deadline > time.monotonic():
+        return True
+    state = _request_state.get()
+    return state is not None and cookie_says_wrote(state.cookie, user_id)
+
+
+def use_primary(db: Session):
+    """Paksa sisa session ini membaca dari primary."""
+    # AsyncSession.info adalah info milik sync_session-nya, jadi ini juga berlaku untuk AsyncSession
+    db.info["use_primary"] = True
+
+
+def mark_user_wrote(db: Session, user_id: UUID):
+    """Buka jendela read-your-writes untuk user lain yang datanya diubah session ini
+    (mis. pembeli saat worker menandai struk paid), berlaku setelah commit."""
+    db.info.setdefault("wrote_for", set()).add(user_id)
+
+
+class RoutingSession(Session):
+    """Session read-only: SELECT ke replica, sisanya (dan semua setelah menulis) ke primary."""
+
+    def __init__(self, primary: Engine, replica: Engine, bind=None, binds=None, **kw):
+        # AsyncSession selalu meneruskan bind/binds (None); tujuan ditentukan get_bind
+        super().__init__(bind=primary, **kw)
+        self.primary = primary
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("use_primary"):
+            return self.primary
+        # text() tanpa .columns() bisa saja menulis, jadi dianggap write
+        is_plain_select = isinstance(clause, TextualSelect) or (isinstance(clause, Select) and clause._for_update_arg is None)
+        if self._flushing or not is_plain_select or wrote_recently(request_user_id.get()):
+            use_primary(self)
+            primary_fallbacks.inc()
+            return self.primary
+        replica_reads.inc()
+        return self.replica
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_orm_write(orm_execute_state):
+    # Core-style update()/insert()/delete() lewat session tidak memicu after_flush
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _open_read_your_writes_window(session):
+    wrote_for = session.info.pop("wrote_for", set())
+    if session.info.pop("wrote", False):
+        user_id = request_user_id.get()
+        if user_id is not None:
+            wrote_for.add(user_id)
+            state = _request_state.get()
+            if state is not None:
+                state.wrote_until = (user_id, math.ceil(time.time() + settings.READ_YOUR_WRITES_SECONDS))
+    for user_id in wrote_for:
+        note_user_write(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_writes(session):
+    session.info.pop("wrote", None)
+    session.info.pop("wrote_for", None)
+
+
+class ReadYourWritesMiddleware:
+    """Baca cookie read-your-writes dari request dan set cookie baru setelah request yang menulis."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = ReadYourWritesState(HTTPConnection(scope).cookies.get(READ_YOUR_WRITES_COOKIE))
+        token = _request_state.set(state)
+
+        async def send_with_cookie(message):
+            # Commit route terjadi sebelum response dikirim; background task sesudahnya tidak ikut
+            if message["type"] == "http.response.start" and state.wrote_until is not None:
+                user_id, deadline = state.wrote_until
+                # Frontend di domain lain hanya mengirim cookie SameSite=None, dan itu wajib Secure
+                attributes = "SameSite=None; Secure" if scope.get("scheme") == "https" else "SameSite=Lax"
+                cookie = (
+                    f"{READ_YOUR_WRITES_COOKIE}={make_write_cookie(user_id, deadline)}; "
+                    f"Max-Age={math.ceil(settings.READ_YOUR_WRITES_SECONDS)}; Path=/; HttpOnly; {attributes}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _request_state.reset(token)
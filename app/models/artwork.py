@@ -1,10 +1,11 @@
 from sqlalchemy import (
-    Column, UUID, String, Numeric, DateTime, func, ForeignKey, Text, CheckConstraint
+    Column, UUID, String, Numeric, DateTime, func, ForeignKey, Text, CheckConstraint, Index, Computed, Integer, text
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy import Boolean
-from sqlalchemy.dialects.postgresql import UUID as pgUUID
+from sqlalchemy.dialects.postgresql import UUID as pgUUID, TSVECTOR
 from app.db.database import Base 
+from app.core.ids import uuid7
 import uuid
 import os
 import re
@@ -25,13 +26,13 @@ def generate_unique_key(title, username, filename):
 class Artwork(Base):
     __tablename__ = "artworks"
 
-    id = Column(pgUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(pgUUID(as_uuid=True), primary_key=True, default=uuid7, server_default=text("gen_uuid_v7()"))
     title = Column(Text, index=True, nullable=False)
     description = Column(Text)
     price = Column(Numeric(10, 2), nullable=False, default=0.00)
 
     owner_id = Column(pgUUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     artwork_secret_code = Column(String(8), unique=False, nullable=True, index=True)
 
@@ -42,9 +43,26 @@ class Artwork(Base):
         nullable=True
     )
     is_sold = Column(Boolean, nullable=False, default=False, server_default='false')
+    # Jumlah like, dipelihara oleh like_crud.toggle_like (bukan COUNT(*) per request)
+    like_count = Column(Integer, nullable=False, default=0, server_default='0')
     image_url = Column(Text, nullable=False)
     unique_key = Column(String(255), unique=True, nullable=False)
 
+    # sha256(unique_key) yang di-embed sebagai COPYRIGHT, dan sha256 file watermarked yang disajikan
+    copyright_hash = Column(String(64), nullable=True, index=True)
+    file_digest = Column(String(64), nullable=True, index=True)
+
+    # Dokumen full-text (judul bobot A, deskripsi bobot B), dihitung Postgres sendiri.
+    # Config 'simple' karena konten campuran Indonesia/Inggris dan tanpa stemmer Indonesia.
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+            persisted=True
+        )
+    )
+
     hash = Column(Text, nullable=False)
     hash_phash = Column(String, nullable=True)
     hash_dhash = Column(String, nullable=True)
@@ -54,3 +72,14 @@ class Artwork(Base):
     receipts = relationship("Receipt", back_populates="artwork")
     likes = relationship("Like", back_populates="artwork", cascade="all, delete")
     purchases = relationship("Purchase", back_populates="artwork")
+
+    __table_args__ = (
+        # Urutan feed explore + keyset cursor (created_at, id)
+        Index("ix_artworks_created_at_id", "created_at", "id"),
+        # Feed explore per kategori: filter + urutan + cursor dari satu index
+        Index("ix_artworks_category_created_at_id", "category", "created_at", "id"),
+        # /users/me/artworks
+        Index("ix_artworks_owner_id", "owner_id"),
+        Index("ix_artworks_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_artworks_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from app.db.database import Base
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    # Email ditulis di transaksi yang sama dengan artwork/receipt, lalu dikirim worker
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    to_email = Column(String, nullable=False)
+    kind = Column(String(32), nullable=False)
+    context = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    next_attempt_at = Column(DateTime, server_default=func.now(), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_due", "next_attempt_at", postgresql_where=text("sent_at IS NULL")),
+    )
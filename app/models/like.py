@@ -1,16 +1,21 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, String, ForeignKey, DateTime, func, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.database import Base
-import uuid
+from app.core.ids import uuid7
 
 class Like(Base):
     __tablename__ = "likes"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, server_default=text("gen_uuid_v7()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     artwork_id = Column(UUID(as_uuid=True), ForeignKey("artworks.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="likes")
     artwork = relationship("Artwork", back_populates="likes")
+
+    __table_args__ = (
+        # Satu like per user per artwork; target ON CONFLICT di toggle_like
+        Index("uq_likes_user_artwork", "user_id", "artwork_id", unique=True),
+    )
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from app.db.database import Base
+
+class PaymentInbox(Base):
+    __tablename__ = "payment_inbox"
+
+    # Notifikasi Midtrans mentah yang sudah lolos verifikasi signature; diproses worker di background
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    order_id = Column(String, nullable=True)
+    payload = Column(JSONB, nullable=False)
+    received_at = Column(DateTime, server_default=func.now(), nullable=False)
+    processed_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime, server_default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+    # Diset setelah PAYMENT_INBOX_MAX_ATTEMPTS gagal; tidak diklaim lagi, perlu dicek manual
+    dead_lettered_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_payment_inbox_pending", "id", postgresql_where=text("processed_at IS NULL AND dead_lettered_at IS NULL")),
+    )
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime, func
+from app.db.database import Base
+
+class ProcessedNotification(Base):
+    __tablename__ = "processed_notifications"
+
+    # Satu baris per notifikasi Midtrans yang sudah diproses; duplikat cukup satu probe ke PK ini
+    order_id = Column(String, primary_key=True)
+    transaction_status = Column(String, primary_key=True)
+    transaction_id = Column(String, primary_key=True, default="")
+    processed_at = Column(DateTime, server_default=func.now())
@@ -1,9 +1,9 @@
-from sqlalchemy import Column, UUID, ForeignKey, Numeric, DateTime, func, String
+from sqlalchemy import Column, UUID, ForeignKey, Numeric, DateTime, func, String, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy import Enum as SQLAEnum
 import enum
 from app.db.database import Base
-import uuid
+from app.core.ids import uuid7
 
 class ReceiptStatusEnum(enum.Enum):
     pending = "pending"
@@ -15,14 +15,14 @@ class ReceiptStatusEnum(enum.Enum):
 class Receipt(Base):
     __tablename__ = "receipts"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, server_default=text("gen_uuid_v7()"))
     buyer_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     artwork_id = Column(UUID(as_uuid=True), ForeignKey("artworks.id", ondelete="CASCADE"), nullable=False)
     purchase_date = Column(DateTime, server_default=func.now())
     amount = Column(Numeric(10, 2), nullable=False)
     buyer_secret_code = Column(String, nullable=True)
 
-    order_id = Column(String, nullable=True)
+    order_id = Column(String, nullable=True, unique=True, index=True)
     transaction_id = Column(String, nullable=True)
     payment_type = Column(String, nullable=True)
 
@@ -33,5 +33,17 @@ class Receipt(Base):
     buyer = relationship("User", back_populates="receipts")
     artwork = relationship("Artwork", back_populates="receipts")
 
+    __table_args__ = (
+        # Hanya receipt pending yang di-scan reconciler; index parsial tetap kecil walau tabel besar
+        Index("ix_receipts_pending_purchase_date", "purchase_date", "id", postgresql_where=text("status = 'pending'")),
+        # /my-purchases (semua status milik pembeli)
+        Index("ix_receipts_buyer_id", "buyer_id"),
+        # Cek "sudah dibeli / sedang dibayar" di initiate-payment; receipt failed/expired tidak pernah dicari
+        Index(
+            "ix_receipts_buyer_artwork_active", "buyer_id", "artwork_id",
+            postgresql_where=text("status IN ('pending', 'paid')")
+        ),
+    )
+
     def __repr__(self):
         return f"<Receipt {self.id} (Order: {self.order_id}, Status: {self.status.value})>" 
\ No newline at end of file
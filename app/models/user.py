@@ -1,12 +1,12 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey, Integer
+from sqlalchemy import Column, String, Boolean, ForeignKey, Integer, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.database import Base
-import uuid
+from app.core.ids import uuid7
 
 class User(Base):
     __tablename__ = "users"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, server_default=text("gen_uuid_v7()"))
     profile_picture = Column(String, nullable=True)
     username = Column(String, unique=True, index=True, nullable=False)
     name = Column(String, nullable=False)
@@ -16,4 +16,8 @@ class User(Base):
     artworks = relationship("Artwork", back_populates="owner") 
     receipts = relationship("Receipt", back_populates="buyer")
     likes = relationship("Like", back_populates="user", cascade="all, delete")
-    purchases = relationship("Purchase", back_populates="user")
\ No newline at end of file
+    purchases = relationship("Purchase", back_populates="user")
+
+    __table_args__ = (
+        Index("ix_users_username_trgm", "username", postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"}),
+    )
\ No newline at end of file
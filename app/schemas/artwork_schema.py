@@ -34,6 +34,8 @@ class ArtworkResponse(BaseModel):
     unique_key: str
     hash: str
     is_sold: Optional[bool] = False
+    like_count: int = 0
+    liked_by_me: bool = False
 
     model_config = {
         "from_attributes": True
@@ -59,4 +61,6 @@ class ArtworkListResponse(BaseModel):
     status: str
     message: str
     result: List[ArtworkResponse]
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
@@ -38,6 +38,20 @@ class UserResponse(BaseModel):
     }
 
 
+class CurrentUser(BaseModel):
+    id: UUID
+    username: str
+    email: str
+    name: str
+    profile_picture: Optional[str] = None
+    is_active: bool = True
+
+    model_config = {
+        "from_attributes": True,
+        "frozen": True
+    }
+
+
 class UserPublic(BaseModel):
     id: UUID
     username: str
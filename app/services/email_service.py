@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.email_outbox import EmailOutbox
+from app.utils.send_email import get_smtp_pool, render_email, EMAIL_TEMPLATES
+
+logger = logging.getLogger(__name__)
+
+emails_sent = metrics.counter("email_sent_total", "Emails delivered from the outbox")
+emails_failed = metrics.counter("email_failed_total", "Outbox delivery attempts that failed")
+email_send_latency = metrics.summary("email_send_seconds", "Time spent delivering one outbox batch")
+
+_wake: Optional[asyncio.Event] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def queue_email(db: Session, to_email: str, kind: str, context: dict):
+    """Tambahkan email ke outbox di transaksi milik caller; terkirim setelah caller commit.
+
+    Panggil notify_email_worker() setelah commit supaya tidak menunggu poll berikutnya.
+    """
+    if kind not in EMAIL_TEMPLATES:
+        raise ValueError(f"Unknown email kind: {kind}")
+    db.add(EmailOutbox(to_email=to_email, kind=kind, context=context))
+
+
+def notify_email_worker():
+    # Bisa dipanggil dari thread lain (asyncio.to_thread), jadi set event lewat loop milik worker
+    if _wake is not None:
+        _loop.call_soon_threadsafe(_wake.set)
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff dengan jitter, attempts = jumlah percobaan yang sudah gagal."""
+    backoff = min(settings.EMAIL_RETRY_MAX_SECONDS, settings.EMAIL_RETRY_BASE_SECONDS * (2 ** (attempts - 1)))
+    return random.uniform(backoff / 2, backoff)
+
+
+def claim_batch(db: Session, batch_size: int) -> List[Tuple]:
+    """Ambil email yang jatuh tempo dan pasang lease, supaya instance lain tidak
+    mengirim ulang selama batch ini sedang dikirim."""
+    due = (
+        select(EmailOutbox.id)
+        .where(
+            EmailOutbox.sent_at.is_(None),
+            EmailOutbox.next_attempt_at <= func.localtimestamp(),
+            EmailOutbox.attempts < settings.EMAIL_MAX_ATTEMPTS
+        )
+        .order_by(EmailOutbox.next_attempt_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(due.scalar_subquery()))
+        .values(next_attempt_at=func.localtimestamp() + timedelta(seconds=settings.EMAIL_LEASE_SECONDS))
+        .returning(EmailOutbox.id, EmailOutbox.to_email, EmailOutbox.kind, EmailOutbox.context, EmailOutbox.attempts)
+    ).all()
+    db.commit()
+    return rows
+
+
+def record_results(db: Session, sent: List[int], failed: List[Tuple[int, int, str]]):
+    if sent:
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(sent))
+            .values(sent_at=func.localtimestamp(), attempts=EmailOutbox.attempts + 1, last_error=None)
+        )
+    for outbox_id, attempts, error in failed:
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == outbox_id)
+            .values(
+                attempts=attempts + 1,
+                last_error=error,
+                next_attempt_at=func.localtimestamp() + timedelta(seconds=retry_delay(attempts + 1))
+            )
+        )
+    db.commit()
+
+
+async def _deliver(row) -> Optional[str]:
+    try:
+        await get_smtp_pool().send(render_email(row.kind, row.to_email, row.context))
+        return None
+    except Exception as e:
+        return str(e) or e.__class__.__name__
+
+
+async def deliver_batch(db: Session) -> int:
+    """Kirim satu batch lewat pool SMTP; mengembalikan jumlah email yang diklaim."""
+    rows = await asyncio.to_thread(claim_batch, db, settings.EMAIL_BATCH_SIZE)
+    if not rows:
+        return 0
+
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(_deliver(row) for row in rows))
+    email_send_latency.observe(time.perf_counter() - start)
+
+    sent, failed = [], []
+    for row, error in zip(rows, errors):
+        if error is None:
+            sent.append(row.id)
+        else:
+            failed.append((row.id, row.attempts, error))
+            level = logging.ERROR if row.attempts + 1 >= settings.EMAIL_MAX_ATTEMPTS else logging.WARNING
+            logger.log(level, f"EMAIL: {row.kind} email {row.id} to {row.to_email} failed (attempt {row.attempts + 1}): {error}")
+
+    await asyncio.to_thread(record_results, db, sent, failed)
+    emails_sent.inc(len(sent))
+    emails_failed.inc(len(failed))
+    return len(rows)
+
+
+async def run_email_worker():
+    global _wake, _loop
+    _loop = asyncio.get_running_loop()
+    _wake = asyncio.Event()
+    logger.info("EMAIL: outbox worker started")
+
+    db = SessionLocal()
+    try:
+        while True:
+            _wake.clear()
+            try:
+                handled = await deliver_batch(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                handled = 0
+                db.rollback()
+                logger.error(f"EMAIL: outbox batch failed: {e}", exc_info=True)
+
+            if handled < settings.EMAIL_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(_wake.wait(), timeout=settings.EMAIL_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        db.close()
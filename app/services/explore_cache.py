@@ -0,0 +1,165 @@
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+from sqlalchemy import BigInteger, event, text
+from sqlalchemy.orm import Query, Session
+from app.core import metrics
+from app.core.config import settings
+from app.models.artwork import Artwork
+from app.models.user import User
+import hashlib
+import threading
+import time
+
+explore_cache_hits = metrics.counter("explore_cache_hits_total", "Explore responses served from the in-process cache")
+explore_cache_misses = metrics.counter("explore_cache_misses_total", "Explore responses built from the database")
+explore_cache_waits = metrics.counter("explore_cache_waits_total", "Explore requests that waited for an identical in-flight build")
+
+# Total artwork untuk explore, key = filter yang sudah dinormalisasi; COUNT(*) cukup sekali per TTL
+_counts: "OrderedDict[tuple, tuple]" = OrderedDict()
+# Response explore yang sudah diserialisasi, key = (category, query, cursor, limit, ...) -> (expires_at, etag, body, artwork_ids)
+_responses: "OrderedDict[tuple, tuple]" = OrderedDict()
+# Build yang sedang berjalan per key, supaya miss yang identik hanya menjalankan query sekali
+_inflight: "dict[tuple, threading.Event]" = {}
+# Naik setiap invalidasi; build yang dimulai sebelum invalidasi tidak boleh mengisi cache
+_generation = 0
+_invalidated_at = float("-inf")
+_lock = threading.Lock()
+
+
+def _estimated_artwork_count(db: Session) -> int:
+    # Statistik planner (diperbarui autovacuum/ANALYZE), -1 jika tabel belum pernah di-analyze
+    # .columns() menandai SQL ini sebagai SELECT, jadi session read-only boleh menjalankannya di replica
+    estimate = text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'artworks'::regclass").columns(reltuples=BigInteger)
+    return db.execute(estimate).scalar() or -1
+
+
+def get_explore_total(db: Session, key: tuple, filtered_query: Query) -> Tuple[int, bool]:
+    """Return (total, is_estimate) for an explore filter.
+
+    Unfiltered requests on a large table use the planner's row estimate.
+    Everything else runs an exact COUNT(*) at most once per
+    EXPLORE_COUNT_TTL_SECONDS per filter.
+    """
+    now = time.monotonic()
+    with _lock:
+        entry = _counts.get(key)
+        if entry is not None and entry[0] > now:
+            _counts.move_to_end(key)
+            return entry[1], entry[2]
+
+    total, is_estimate = None, False
+    if not any(key):
+        estimate = _estimated_artwork_count(db)
+        if estimate >= settings.EXPLORE_COUNT_ESTIMATE_THRESHOLD:
+            total, is_estimate = estimate, True
+    if total is None:
+        total = filtered_query.order_by(None).count()
+
+    with _lock:
+        _counts[key] = (now + settings.EXPLORE_COUNT_TTL_SECONDS, total, is_estimate)
+        _counts.move_to_end(key)
+        while len(_counts) > settings.EXPLORE_COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return total, is_estimate
+
+
+def make_etag(body: bytes) -> str:
+    # Strong ETag: hash dari byte response, jadi sama persis <=> body sama persis
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match memakai weak comparison (RFC 9110 13.1.2)
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def get_explore_response(key: tuple, build: Callable[[], Tuple[bytes, list]]) -> Tuple[str, bytes, list]:
+    """Return (etag, body, artwork_ids) for an explore page, building it at most once at a time per key.
+
+    Concurrent misses for the same key wait for the first request's build
+    instead of running the same query in parallel. Entries live for
+    EXPLORE_CACHE_TTL_SECONDS or until invalidate_explore_cache().
+    """
+    while True:
+        now = time.monotonic()
+        with _lock:
+            entry = _responses.get(key)
+            if entry is not None and entry[0] > now:
+                _responses.move_to_end(key)
+                explore_cache_hits.inc()
+                return entry[1:]
+            waiter = _inflight.get(key)
+            if waiter is None:
+                waiter = _inflight[key] = threading.Event()
+                generation = _generation
+                break
+        # Request lain sedang membangun key yang sama; tunggu lalu cek cache lagi.
+        # Kalau build-nya gagal atau di-invalidate di tengah jalan, salah satu waiter membangun ulang.
+        explore_cache_waits.inc()
+        waiter.wait()
+
+    explore_cache_misses.inc()
+    try:
+        body, artwork_ids = build()
+        etag = make_etag(body)
+        if settings.EXPLORE_CACHE_TTL_SECONDS > 0:
+            with _lock:
+                if generation == _generation:
+                    _responses[key] = (time.monotonic() + settings.EXPLORE_CACHE_TTL_SECONDS, etag, body, artwork_ids)
+                    _responses.move_to_end(key)
+                    while len(_responses) > settings.EXPLORE_CACHE_SIZE:
+                        _responses.popitem(last=False)
+        return etag, body, artwork_ids
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+        waiter.set()
+
+
+def invalidate_explore_cache() -> None:
+    """Buang semua response dan total explore; dipanggil setelah artwork berubah."""
+    global _generation, _invalidated_at
+    with _lock:
+        _generation += 1
+        _invalidated_at = time.monotonic()
+        _responses.clear()
+        _counts.clear()
+
+
+def invalidated_within(seconds: float) -> bool:
+    """True jika cache di-invalidate dalam `seconds` terakhir (replica mungkin belum menyusul)."""
+    return time.monotonic() - _invalidated_at < seconds
+
+
+def mark_explore_dirty(db: Session) -> None:
+    """Untuk perubahan artwork lewat Core UPDATE/DELETE yang tidak terlihat oleh ORM flush.
+
+    Cache di-invalidate setelah transaksi session ini commit.
+    """
+    db.info["explore_dirty"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_dirty_on_flush(session, flush_context):
+    changed = list(session.new) + list(session.dirty)
+    if any(isinstance(obj, Artwork) for obj in changed) or any(
+        isinstance(obj, (Artwork, User)) for obj in session.deleted
+    ):
+        session.info["explore_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    # Setelah commit, bukan saat flush: kalau tidak, request lain bisa mengisi ulang cache
+    # dengan data lama sebelum transaksi ini terlihat
+    if session.info.pop("explore_dirty", False):
+        invalidate_explore_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("explore_dirty", None)
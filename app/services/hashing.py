@@ -1,12 +1,81 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
+from app.core.config import settings
+from app.core import metrics
 
-def hash_password(password: str) -> str:
-    hashed_bytes = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+# Semua operasi bcrypt lewat executor kecil ini, jadi lonjakan login tidak memakan semua core
+_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_pending = 0
+_pending_lock = threading.Lock()
+
+hash_latency = metrics.summary("password_hash_seconds", "Time spent in bcrypt hash/verify, including queue wait")
+hash_queue_depth = metrics.gauge("password_hash_queue_depth", "bcrypt operations queued or running")
+hash_rejected = metrics.counter("password_hash_rejected_total", "bcrypt operations rejected because the queue was full")
+
+
+class PasswordHashingBusy(RuntimeError):
+    pass
+
+
+def _hash(password: str) -> str:
+    hashed_bytes = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS))
     return hashed_bytes.decode('utf-8')
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+
+def _submit(fn, *args):
+    global _pending
+    with _pending_lock:
+        if _pending >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE:
+            hash_rejected.inc()
+            raise PasswordHashingBusy("Password hashing queue is full")
+        _pending += 1
+        hash_queue_depth.set(_pending)
+
+    start = time.perf_counter()
+    future = _executor.submit(fn, *args)
+
+    def _done(_):
+        global _pending
+        hash_latency.observe(time.perf_counter() - start)
+        with _pending_lock:
+            _pending -= 1
+            hash_queue_depth.set(_pending)
+
+    future.add_done_callback(_done)
+    return future
+
+
+def hash_password(password: str) -> str:
+    return _submit(_hash, password).result()
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _submit(_verify, plain_password, hashed_password).result()
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit(_hash, password))
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(_submit(_verify, plain_password, hashed_password))
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    # Format bcrypt: $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
 if __name__ == "__main__":
     plain = "mysecretpassword"
     hashed = hash_password(plain)
@@ -15,4 +84,5 @@ if __name__ == "__main__":
     is_correct = verify_password(plain, hashed)
     print(f"Verifikasi (benar): {is_correct}")
     is_incorrect = verify_password("wrongpassword", hashed)
-    print(f"Verifikasi (salah): {is_incorrect}")
\ No newline at end of file
+    print(f"Verifikasi (salah): {is_incorrect}")
+    print(f"Perlu rehash: {needs_rehash(hashed)}")
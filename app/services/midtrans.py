@@ -0,0 +1,137 @@
+import asyncio
+import base64
+import logging
+import random
+import time
+from typing import Optional
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class MidtransError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class MidtransUnavailable(MidtransError):
+    """Circuit breaker terbuka: gateway dianggap down, request tidak dikirim."""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_timeout:
+            return False
+        # Half-open: satu percobaan per reset_timeout. opened_at dimajukan supaya request
+        # lain tetap ditolak sampai percobaan ini memanggil record_success/record_failure
+        self.opened_at = now
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.error(f"MIDTRANS: circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+
+class MidtransClient:
+    """Shared async client for the Midtrans Snap and Core APIs.
+
+    One pooled httpx.AsyncClient (keep-alive) with connect/read timeouts.
+    Idempotent calls are retried with exponential backoff and full jitter;
+    transaction creation is only retried when the connection was never
+    established. A circuit breaker fails fast while the gateway is down.
+    """
+
+    def __init__(self, server_key: str):
+        auth_header = base64.b64encode(f"{server_key}:".encode()).decode()
+        self.http = httpx.AsyncClient(
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                "Authorization": f"Basic {auth_header}"
+            },
+            timeout=httpx.Timeout(settings.MIDTRANS_READ_TIMEOUT, connect=settings.MIDTRANS_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.MIDTRANS_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.MIDTRANS_MAX_CONNECTIONS
+            )
+        )
+        self.breaker = CircuitBreaker(settings.MIDTRANS_BREAKER_THRESHOLD, settings.MIDTRANS_BREAKER_RESET_SECONDS)
+
+    async def _request(self, method: str, url: str, idempotent: bool, **kwargs) -> dict:
+        if not self.breaker.allow():
+            raise MidtransUnavailable("Midtrans circuit breaker is open")
+
+        attempts = settings.MIDTRANS_MAX_RETRIES + 1
+        for attempt in range(attempts):
+            try:
+                response = await self.http.request(method, url, **kwargs)
+                if response.status_code in RETRYABLE_STATUS:
+                    raise MidtransError(f"Midtrans returned {response.status_code}")
+                response.raise_for_status()
+                self.breaker.record_success()
+                return response.json()
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # Request belum terkirim, aman diulang walaupun tidak idempoten
+                error, retryable = e, True
+            except (httpx.TimeoutException, httpx.TransportError, MidtransError) as e:
+                error, retryable = e, idempotent
+            except httpx.HTTPStatusError as e:
+                # 4xx selain 429: kesalahan request, bukan gateway down
+                raise MidtransError(f"Midtrans rejected the request: {e.response.status_code} {e.response.text}", e.response.status_code)
+
+            self.breaker.record_failure()
+            if not retryable or attempt == attempts - 1 or not self.breaker.allow():
+                raise MidtransError(str(error)) from error
+
+            backoff = min(settings.MIDTRANS_RETRY_MAX_BACKOFF, settings.MIDTRANS_RETRY_BASE_BACKOFF * (2 ** attempt))
+            delay = random.uniform(0, backoff)
+            logger.warning(f"MIDTRANS: {method} {url} failed ({error}), retry {attempt + 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def create_transaction(self, payload: dict) -> dict:
+        return await self._request("POST", settings.MIDTRANS_SNAP_URL, idempotent=False, json=payload)
+
+    async def get_transaction_status(self, order_id: str) -> dict:
+        return await self._request("GET", f"{settings.MIDTRANS_API_BASE_URL}/v2/{order_id}/status", idempotent=True)
+
+    async def aclose(self):
+        await self.http.aclose()
+
+
+_client: Optional[MidtransClient] = None
+
+
+def get_midtrans_client() -> MidtransClient:
+    global _client
+    if _client is None:
+        if not settings.MIDTRANS_SERVER_KEY:
+            raise MidtransError("MIDTRANS_SERVER_KEY is not configured")
+        _client = MidtransClient(settings.MIDTRANS_SERVER_KEY)
+    return _client
+
+
+async def close_midtrans_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
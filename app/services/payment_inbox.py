@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import timedelta
+from typing import List, Optional
+from sqlalchemy import insert, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.payment_inbox import PaymentInbox
+from app.models.receipt import ReceiptStatusEnum
+from app.models.user import User
+from app.models.artwork import Artwork
+from app.services.payment_service import apply_payment_notification, purchase_email_context
+from app.services.email_service import queue_email, notify_email_worker
+
+logger = logging.getLogger(__name__)
+
+inbox_processed = metrics.counter("payment_inbox_processed_total", "Midtrans notifications applied from the inbox")
+inbox_failed = metrics.counter("payment_inbox_failed_total", "Inbox rows whose processing raised an error")
+inbox_dead_lettered = metrics.counter("payment_inbox_dead_lettered_total", "Inbox rows given up after PAYMENT_INBOX_MAX_ATTEMPTS")
+inbox_lag = metrics.summary("payment_inbox_lag_seconds", "Time between receiving a notification and applying it")
+
+_wake: Optional[asyncio.Event] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def enqueue_notifications(db: Session, notifications: List[dict]):
+    if not notifications:
+        return
+    db.execute(insert(PaymentInbox), [{"order_id": n.get("order_id"), "payload": n} for n in notifications])
+    db.commit()
+    notify_inbox_worker()
+
+
+async def enqueue_notification_async(db: AsyncSession, notification: dict):
+    """Simpan notifikasi mentah ke inbox (satu INSERT) lalu bangunkan worker; untuk route async."""
+    await db.execute(insert(PaymentInbox), [{"order_id": notification.get("order_id"), "payload": notification}])
+    await db.commit()
+    notify_inbox_worker()
+
+
+def notify_inbox_worker():
+    # Bisa dipanggil dari thread lain (asyncio.to_thread), jadi set event lewat loop milik worker
+    if _wake is not None:
+        _loop.call_soon_threadsafe(_wake.set)
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff dengan jitter, attempts = jumlah percobaan yang sudah gagal."""
+    backoff = min(settings.PAYMENT_INBOX_RETRY_MAX_SECONDS, settings.PAYMENT_INBOX_RETRY_BASE_SECONDS * (2 ** (attempts - 1)))
+    return random.uniform(backoff / 2, backoff)
+
+
+def _retry_later(row: PaymentInbox, now, error: str):
+    row.attempts += 1
+    row.last_error = error
+    if row.attempts >= settings.PAYMENT_INBOX_MAX_ATTEMPTS:
+        row.dead_lettered_at = now
+        inbox_dead_lettered.inc()
+        logger.error(f"PAYMENT INBOX: notification {row.id} ({row.order_id}) dead-lettered after {row.attempts} attempts: {error}")
+        return
+    row.next_attempt_at = now + timedelta(seconds=retry_delay(row.attempts))
+
+
+def process_inbox_batch(db: Session, batch_size: int) -> int:
+    """Apply up to batch_size due notifications in one transaction.
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED, so several app instances
+    can drain the same inbox. Each row runs in its own savepoint: a failing
+    notification is recorded on the row and retried later without undoing
+    the rest of the batch. Purchase emails go to the email outbox in the
+    same transaction. A notification whose receipt does not exist yet (it
+    can arrive before initiate_payment commits) is retried the same way.
+    Retries back off exponentially via next_attempt_at; after
+    PAYMENT_INBOX_MAX_ATTEMPTS the row is dead-lettered (dead_lettered_at,
+    error log, payment_inbox_dead_lettered_total). Returns the number of
+    rows handled.
+    """
+    rows = db.execute(
+        select(PaymentInbox)
+        .where(
+            PaymentInbox.processed_at.is_(None),
+            PaymentInbox.dead_lettered_at.is_(None),
+            PaymentInbox.next_attempt_at <= func.localtimestamp()
+        )
+        .order_by(PaymentInbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+    # Jam database, sama dengan sumber received_at
+    now = db.scalar(select(func.localtimestamp()))
+    for row in rows:
+        try:
+            with db.begin_nested():
+                outcome, receipt = apply_payment_notification(db, row.payload)
+                if outcome == "updated" and receipt.status == ReceiptStatusEnum.paid:
+                    artwork = db.get(Artwork, receipt.artwork_id)
+                    buyer = db.get(User, receipt.buyer_id)
+                    if artwork and buyer:
+                        queue_email(db, buyer.email, "purchase", purchase_email_context(receipt, artwork))
+        except Exception as e:
+            inbox_failed.inc()
+            logger.error(f"PAYMENT INBOX: notification {row.id} ({row.order_id}) failed: {e}", exc_info=True)
+            _retry_later(row, now, str(e))
+            continue
+
+        if outcome == "not_found":
+            logger.warning(f"PAYMENT INBOX: notification {row.id} ({row.order_id}) has no receipt yet, attempt {row.attempts + 1}")
+            _retry_later(row, now, "receipt not found")
+            continue
+
+        row.attempts += 1
+        row.processed_at = now
+        inbox_processed.inc()
+        inbox_lag.observe((now - row.received_at).total_seconds())
+
+    db.commit()
+    if rows:
+        notify_email_worker()
+    return len(rows)
+
+
+def _drain_once() -> int:
+    db = SessionLocal()
+    try:
+        return process_inbox_batch(db, settings.PAYMENT_INBOX_BATCH_SIZE)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def run_inbox_worker():
+    """Loop background: kuras inbox per batch, tidur sampai ada notifikasi baru atau poll interval habis."""
+    global _wake, _loop
+    _loop = asyncio.get_running_loop()
+    _wake = asyncio.Event()
+    logger.info("PAYMENT INBOX: worker started")
+
+    while True:
+        _wake.clear()
+        try:
+            start = time.perf_counter()
+            handled = await asyncio.to_thread(_drain_once)
+            if handled:
+                logger.info(f"PAYMENT INBOX: processed {handled} notifications in {time.perf_counter() - start:.3f}s")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            handled = 0
+            logger.error(f"PAYMENT INBOX: batch failed: {e}", exc_info=True)
+
+        if handled < settings.PAYMENT_INBOX_BATCH_SIZE:
+            try:
+                await asyncio.wait_for(_wake.wait(), timeout=settings.PAYMENT_INBOX_POLL_INTERVAL)
+                # Tunggu sebentar agar notifikasi yang datang beruntun terkumpul dalam satu batch
+                await asyncio.sleep(settings.PAYMENT_INBOX_BATCH_WINDOW)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,94 @@
+import os
+from typing import Optional, Tuple
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.artwork import Artwork
+from app.models.payment_notification import ProcessedNotification
+from app.models.receipt import Receipt, ReceiptStatusEnum
+from app.services.explore_cache import mark_explore_dirty
+from app.db.routing import mark_user_wrote
+
+BACKEND_API_BASE_URL = os.getenv("BACKEND_API_BASE_URL", "http://localhost:8000")
+FRONTEND_BASE_URL = os.getenv("FRONTEND_BASE_URL", "http://localhost:3000")
+
+
+def next_receipt_status(current: ReceiptStatusEnum, transaction_status: str) -> Optional[ReceiptStatusEnum]:
+    """Status baru untuk receipt, atau None jika notifikasi tidak mengubah apa pun."""
+    if transaction_status == "settlement":
+        if current != ReceiptStatusEnum.paid:
+            return ReceiptStatusEnum.paid
+    elif transaction_status == "pending":
+        if current not in [ReceiptStatusEnum.paid, ReceiptStatusEnum.pending]:
+            return ReceiptStatusEnum.pending
+    elif transaction_status in ["expire", "cancel", "deny"]:
+        if current != ReceiptStatusEnum.paid:
+            new_status = ReceiptStatusEnum.expired if transaction_status == "expire" else ReceiptStatusEnum.failed
+            if new_status != current:
+                return new_status
+    return None
+
+
+def apply_payment_notification(db: Session, notification: dict) -> Tuple[str, Optional[Receipt]]:
+    """Apply one verified Midtrans notification inside the caller's transaction.
+
+    Returns (outcome, receipt) where outcome is "duplicate", "not_found",
+    "unchanged" or "updated". The caller commits; rolling back also forgets
+    the processed marker, so a failed attempt can be retried. "not_found"
+    removes its marker again: the notification may have beaten the commit
+    of the receipt in initiate_payment and must still apply once it exists.
+    """
+    order_id = notification.get("order_id")
+    transaction_status = notification.get("transaction_status")
+    transaction_id = notification.get("transaction_id") or ""
+
+    # Duplikat cukup satu probe ke PK processed_notifications, tanpa menyentuh receipts
+    marker = pg_insert(ProcessedNotification).values(
+        order_id=order_id,
+        transaction_status=transaction_status,
+        transaction_id=transaction_id
+    ).on_conflict_do_nothing().returning(ProcessedNotification.order_id)
+    if db.execute(marker).first() is None:
+        return "duplicate", None
+
+    receipt = db.query(Receipt).filter(Receipt.order_id == order_id).with_for_update().first()
+    if receipt is None:
+        db.execute(delete(ProcessedNotification).where(
+            ProcessedNotification.order_id == order_id,
+            ProcessedNotification.transaction_status == transaction_status,
+            ProcessedNotification.transaction_id == transaction_id
+        ))
+        return "not_found", None
+
+    new_status = next_receipt_status(receipt.status, transaction_status)
+    if new_status is None:
+        return "unchanged", receipt
+
+    receipt.status = new_status
+    # Pembeli biasanya langsung membuka my-purchases setelah redirect; jangan baca dari replica yang tertinggal
+    mark_user_wrote(db, receipt.buyer_id)
+    receipt.transaction_id = notification.get("transaction_id")
+    receipt.payment_type = notification.get("payment_type")
+
+    if new_status == ReceiptStatusEnum.paid:
+        db.execute(
+            update(Artwork)
+            .where(Artwork.id == receipt.artwork_id, Artwork.is_sold.is_(False))
+            .values(is_sold=True)
+        )
+        mark_explore_dirty(db)
+
+    return "updated", receipt
+
+
+def purchase_email_context(receipt: Receipt, artwork: Artwork) -> dict:
+    return {
+        "artwork_title": artwork.title,
+        "purchase_date": receipt.purchase_date.strftime("%d %B %Y"),
+        "price": float(receipt.amount),
+        "buyer_secret_code": receipt.buyer_secret_code,
+        "download_url": f"{FRONTEND_BASE_URL}{artwork.image_url}",
+        "watermark_api": f"{BACKEND_API_BASE_URL}/api/extract/extract-watermark",
+        "image_url": artwork.image_url,
+        "receipt_id": str(receipt.id)
+    }
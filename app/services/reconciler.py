@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.orm import Session
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.receipt import Receipt, ReceiptStatusEnum
+from app.services.midtrans import get_midtrans_client, MidtransError, MidtransUnavailable
+from app.services.payment_inbox import enqueue_notifications
+from app.services.payment_service import next_receipt_status
+
+logger = logging.getLogger(__name__)
+
+reconcile_checked = metrics.counter("reconcile_receipts_checked_total", "Stale pending receipts checked against Midtrans")
+reconcile_resolved = metrics.counter("reconcile_receipts_resolved_total", "Stale receipts whose gateway status was queued or expired")
+reconcile_errors = metrics.counter("reconcile_errors_total", "Midtrans status lookups that failed during reconciliation")
+reconcile_skipped = metrics.counter("reconcile_passes_skipped_total", "Passes skipped because another instance held the reconcile lock")
+
+# Kunci advisory Postgres untuk satu putaran reconciler; hanya satu instance (atau cron) yang menjalankannya
+RECONCILE_LOCK_KEY = 0x52454331  # "REC1"
+
+
+def fetch_stale_pending(db: Session, after: Optional[Tuple], limit: int) -> List[Tuple]:
+    """Satu halaman receipt pending yang lebih tua dari RECONCILE_STALE_AFTER_MINUTES.
+
+    Keyset paging pada (purchase_date, id) dari baris terakhir halaman
+    sebelumnya, supaya memakai index parsial ix_receipts_pending_purchase_date
+    dan tidak melambat di halaman akhir.
+    """
+    cutoff = func.localtimestamp() - timedelta(minutes=settings.RECONCILE_STALE_AFTER_MINUTES)
+    query = (
+        select(Receipt.id, Receipt.order_id, Receipt.purchase_date)
+        .where(Receipt.status == ReceiptStatusEnum.pending, Receipt.purchase_date < cutoff)
+        .order_by(Receipt.purchase_date, Receipt.id)
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(tuple_(Receipt.purchase_date, Receipt.id) > tuple_(*after))
+    return db.execute(query).all()
+
+
+async def _lookup_statuses(order_ids: List[str]) -> List[Optional[dict]]:
+    client = get_midtrans_client()
+    semaphore = asyncio.Semaphore(settings.RECONCILE_CONCURRENCY)
+
+    async def lookup(order_id: str) -> Optional[dict]:
+        async with semaphore:
+            try:
+                return await client.get_transaction_status(order_id)
+            except MidtransUnavailable:
+                raise
+            except MidtransError as e:
+                if e.status_code == 404:
+                    return {"order_id": order_id, "status_code": "404"}
+                reconcile_errors.inc()
+                logger.warning(f"RECONCILE: status lookup for {order_id} failed: {e}")
+                return None
+
+    return await asyncio.gather(*(lookup(order_id) for order_id in order_ids))
+
+
+def _apply_page(db: Session, rows: List[Tuple], statuses: List[Optional[dict]]) -> int:
+    """Antrekan status gateway ke payment_inbox dengan satu INSERT, dan expire
+    receipt yang tidak pernah sampai ke Midtrans dengan satu UPDATE."""
+    expire_before = db.scalar(select(func.localtimestamp() - timedelta(hours=settings.RECONCILE_EXPIRE_AFTER_HOURS)))
+    notifications, missing = [], []
+
+    for (receipt_id, order_id, purchase_date), status in zip(rows, statuses):
+        if status is None:
+            continue
+        if status.get("status_code") == "404":
+            if purchase_date < expire_before:
+                missing.append(receipt_id)
+            continue
+        transaction_status = status.get("transaction_status")
+        # Receipt di halaman ini masih pending; status yang tidak mengubahnya (pending, capture,
+        # authorize, ...) tidak diantrekan supaya tidak masuk inbox lagi di setiap putaran
+        if transaction_status and next_receipt_status(ReceiptStatusEnum.pending, transaction_status) is not None:
+            notifications.append({
+                "order_id": order_id,
+                "transaction_status": transaction_status,
+                "transaction_id": status.get("transaction_id"),
+                "payment_type": status.get("payment_type"),
+                "source": "reconciler"
+            })
+
+    if missing:
+        db.execute(
+            update(Receipt)
+            .where(Receipt.id.in_(missing), Receipt.status == ReceiptStatusEnum.pending)
+            .values(status=ReceiptStatusEnum.expired)
+        )
+    # enqueue_notifications melakukan commit untuk keduanya
+    if notifications:
+        enqueue_notifications(db, notifications)
+    else:
+        db.commit()
+
+    return len(notifications) + len(missing)
+
+
+def _try_lock(lock_db: Session) -> bool:
+    return bool(lock_db.scalar(select(func.pg_try_advisory_xact_lock(RECONCILE_LOCK_KEY))))
+
+
+async def reconcile_stale_receipts() -> dict:
+    """Satu putaran penuh: scan semua receipt pending yang basi, per halaman.
+
+    Putaran berjalan di bawah pg_try_advisory_xact_lock pada koneksi tersendiri
+    yang transaksinya terbuka sampai putaran selesai; kalau instance lain
+    memegang kunci, putaran ini dilewati ({"skipped": True}). Kunci lepas
+    sendiri saat transaksi itu berakhir atau koneksinya putus.
+    """
+    stats = {"checked": 0, "resolved": 0}
+    lock_db = SessionLocal()
+    try:
+        if not await asyncio.to_thread(_try_lock, lock_db):
+            reconcile_skipped.inc()
+            logger.info("RECONCILE: another instance holds the reconcile lock, pass skipped")
+            stats["skipped"] = True
+            return stats
+        return await _reconcile_pass(stats)
+    finally:
+        # Rollback mengakhiri transaksi pemegang kunci, sekaligus melepasnya
+        await asyncio.to_thread(lock_db.close)
+
+
+async def _reconcile_pass(stats: dict) -> dict:
+    start = time.perf_counter()
+    after = None
+    db = SessionLocal()
+    try:
+        while True:
+            rows = await asyncio.to_thread(fetch_stale_pending, db, after, settings.RECONCILE_PAGE_SIZE)
+            db.commit()
+            if not rows:
+                break
+            after = (rows[-1].purchase_date, rows[-1].id)
+
+            pending = [row for row in rows if row.order_id]
+            statuses = await _lookup_statuses([row.order_id for row in pending])
+            resolved = await asyncio.to_thread(_apply_page, db, pending, statuses)
+
+            stats["checked"] += len(pending)
+            stats["resolved"] += resolved
+            reconcile_checked.inc(len(pending))
+            reconcile_resolved.inc(resolved)
+
+            if len(rows) < settings.RECONCILE_PAGE_SIZE:
+                break
+    except MidtransUnavailable:
+        logger.warning("RECONCILE: Midtrans circuit breaker open, pass stopped early")
+    finally:
+        db.close()
+
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    if stats["checked"]:
+        logger.info(f"RECONCILE: checked {stats['checked']} stale receipts, resolved {stats['resolved']} in {stats['seconds']}s")
+    return stats
+
+
+async def run_reconciler():
+    """Loop background, jalan tiap RECONCILE_INTERVAL_SECONDS (main.py hanya menyalakannya kalau MIDTRANS_SERVER_KEY diset)."""
+    logger.info("RECONCILE: scheduler started")
+    while True:
+        try:
+            await reconcile_stale_receipts()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"RECONCILE: pass failed: {e}", exc_info=True)
+        await asyncio.sleep(settings.RECONCILE_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    # Satu putaran manual, mis. dari cron:  python -m app.services.reconciler
+    # Hasilnya masuk payment_inbox dan diproses worker inbox di instance API yang berjalan.
+    from app.models import artwork, like, purchase, receipt, user  # noqa: F401
+    from app.services.midtrans import close_midtrans_client
+
+    async def main():
+        try:
+            print(await reconcile_stale_receipts())
+        finally:
+            await close_midtrans_client()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,196 @@
+"""StaticFiles dengan strong ETag, Range, dan Cache-Control immutable.
+
+File di static/watermarked tidak pernah berubah setelah ditulis (nama file =
+unique_key), jadi browser/CDN boleh menyimpannya setahun tanpa revalidasi.
+ETag = sha256 isi file (sama dengan artworks.file_digest), dihitung sekali per
+file per proses. Range satu rentang (bytes=a-b, a-, -n) dijawab 206; body
+dibaca per chunk di thread anyio. Zero-copy (sendfile) hanya terjadi kalau
+server ASGI mengiklankan ekstensi http.response.zerocopysend; uvicorn 0.24
+(requirements.txt) tidak pernah mengiklankannya, jadi di deployment ini
+jalurnya selalu chunk.
+"""
+import mimetypes
+import os
+import re
+import stat
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+from typing import Optional, Sequence, Tuple
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Receive, Scope, Send
+from app.core import metrics
+from app.services.explore_cache import etag_matches
+from app.services.watermark import compute_file_digest
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+static_not_modified = metrics.counter("static_not_modified_total", "Static file requests answered 304 from If-None-Match")
+static_partial = metrics.counter("static_partial_total", "Static file requests answered 206 for a Range")
+
+# full_path -> (st_size, st_mtime_ns, etag); kunci stat supaya file yang diganti dihitung ulang
+_etags: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+_etags_lock = threading.Lock()
+_ETAG_CACHE_SIZE = 4096
+
+
+def _file_etag(full_path: str, stat_result: os.stat_result) -> str:
+    key = (stat_result.st_size, stat_result.st_mtime_ns)
+    with _etags_lock:
+        entry = _etags.get(full_path)
+        if entry is not None and entry[:2] == key:
+            _etags.move_to_end(full_path)
+            return entry[2]
+
+    etag = f'"{compute_file_digest(full_path)}"'
+    with _etags_lock:
+        _etags[full_path] = (*key, etag)
+        _etags.move_to_end(full_path)
+        while len(_etags) > _ETAG_CACHE_SIZE:
+            _etags.popitem(last=False)
+    return etag
+
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)", re.ASCII)
+
+
+def parse_range(header: Optional[str], size: int):
+    """Return (start, end) inklusif, None untuk kirim file utuh, atau "unsatisfiable" (416).
+
+    Multi-range dan header yang tidak valid (mis. "bytes=--5", "bytes=+1-2")
+    diabaikan (RFC 9110 14.2: server boleh mengirim 200 penuh).
+    """
+    match = _RANGE.fullmatch(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if first == "":
+        if last == "":
+            return None
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            return "unsatisfiable"
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        return "unsatisfiable"
+    return start, min(end, size - 1)
+
+
+class StaticFileResponse(Response):
+    """Kirim file (atau satu rentang) dengan ETag isi file; keputusan 200/206/304/416 dibuat
+    saat dipanggil supaya hashing pertama kali berjalan di thread, bukan di event loop."""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, full_path: str, stat_result: os.stat_result, cache_control: Optional[str]):
+        self.full_path = full_path
+        self.stat_result = stat_result
+        self.cache_control = cache_control
+        self.background = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        size = self.stat_result.st_size
+        etag = await anyio.to_thread.run_sync(_file_etag, self.full_path, self.stat_result)
+
+        headers = {
+            "etag": etag,
+            "last-modified": formatdate(self.stat_result.st_mtime, usegmt=True),
+            "accept-ranges": "bytes",
+        }
+        if self.cache_control:
+            headers["cache-control"] = self.cache_control
+
+        if etag_matches(request_headers.get("if-none-match"), etag):
+            static_not_modified.inc()
+            await self._send(send, 304, headers)
+            return
+
+        content_type, _ = mimetypes.guess_type(self.full_path)
+        headers["content-type"] = content_type or "application/octet-stream"
+
+        byte_range = None
+        if_range = request_headers.get("if-range")
+        # If-Range: rentang hanya berlaku kalau file masih versi yang sama (strong ETag atau tanggal persis)
+        if if_range is None or if_range == etag or if_range == headers["last-modified"]:
+            byte_range = parse_range(request_headers.get("range"), size)
+
+        if byte_range == "unsatisfiable":
+            headers["content-range"] = f"bytes */{size}"
+            headers["content-length"] = "0"
+            await self._send(send, 416, headers)
+            return
+
+        status_code, start, length = 200, 0, size
+        if byte_range is not None:
+            start, end = byte_range
+            status_code, length = 206, end - start + 1
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            static_partial.inc()
+        headers["content-length"] = str(length)
+
+        send_body = scope["method"].upper() != "HEAD"
+        await self._send(send, status_code, headers, more_body=send_body and length > 0)
+        if send_body and length > 0:
+            await self._send_file(scope, send, start, length)
+
+    async def _send(self, send: Send, status_code: int, headers: dict, more_body: bool = False):
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+        })
+        if not more_body:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _send_file(self, scope: Scope, send: Send, start: int, length: int):
+        """Kirim body; open/read/close berjalan di thread anyio, tidak memblokir event loop.
+
+        Zero-copy butuh server yang mendukung http.response.zerocopysend (uvicorn 0.24 tidak).
+        """
+        async with await anyio.open_file(self.full_path, mode="rb") as file:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                # Server mengirim langsung dari file descriptor (sendfile), tanpa menyalin ke Python
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.wrapped,
+                    "offset": start,
+                    "count": length,
+                    "more_body": False,
+                })
+                return
+
+            await file.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # File terpotong saat dikirim; tutup body supaya klien tidak menunggu
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles dengan StaticFileResponse; path di bawah immutable_prefixes
+    mendapat Cache-Control immutable, path lain tetap direvalidasi lewat ETag."""
+
+    def __init__(self, *args, immutable_prefixes: Sequence[str] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable_prefixes = tuple(immutable_prefixes)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        if status_code != 200 or not stat.S_ISREG(stat_result.st_mode):
+            return super().file_response(full_path, stat_result, scope, status_code)
+        path = self.get_path(scope).replace(os.sep, "/")
+        cache_control = IMMUTABLE_CACHE_CONTROL if path.startswith(self.immutable_prefixes) else None
+        return StaticFileResponse(str(full_path), stat_result, cache_control)
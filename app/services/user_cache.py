@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import event
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.user_schema import CurrentUser
+import threading
+import time
+
+# Cache in-process untuk field user yang dipakai autentikasi, key = claim "sub" dari JWT
+_entries: "OrderedDict[str, tuple]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_cached_user(sub: str) -> Optional[CurrentUser]:
+    if settings.USER_CACHE_TTL_SECONDS <= 0:
+        return None
+    with _lock:
+        entry = _entries.get(sub)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del _entries[sub]
+            return None
+        _entries.move_to_end(sub)
+        return user
+
+
+def cache_user(user: User) -> CurrentUser:
+    snapshot = CurrentUser.model_validate(user)
+    if settings.USER_CACHE_TTL_SECONDS <= 0:
+        return snapshot
+    with _lock:
+        _entries[str(user.id)] = (time.monotonic() + settings.USER_CACHE_TTL_SECONDS, snapshot)
+        _entries.move_to_end(str(user.id))
+        while len(_entries) > settings.USER_CACHE_MAX_SIZE:
+            _entries.popitem(last=False)
+    return snapshot
+
+
+def invalidate_user(user_id) -> None:
+    with _lock:
+        _entries.pop(str(user_id), None)
+
+
+def clear_user_cache() -> None:
+    with _lock:
+        _entries.clear()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    # Jaring pengaman untuk perubahan user di luar update_user/delete_user (mis. deaktivasi)
+    invalidate_user(target.id)
@@ -0,0 +1,91 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from app.steganography import extract_message_lsb, xor_encrypt_decrypt
+import hashlib
+import io
+import time
+import requests
+
+COPYRIGHT_PREFIX = "COPYRIGHT:"
+USER_MESSAGE_SEPARATOR = "<USER_MESSAGE>"
+
+_extract_executor: Optional[ProcessPoolExecutor] = None
+
+
+def parse_watermark(extracted: str, buyer_secret_code: Optional[str] = None) -> Optional[Tuple[str, Optional[str]]]:
+    """Split a raw LSB payload into (copyright_hash, creator_message).
+
+    Returns None when the payload is not one of our COPYRIGHT watermarks.
+    The creator message is only decrypted when a buyer secret code is given.
+    """
+    if not extracted.startswith(COPYRIGHT_PREFIX):
+        return None
+
+    parts = extracted.split(USER_MESSAGE_SEPARATOR)
+    copyright_hash = parts[0].replace(COPYRIGHT_PREFIX, "").strip()
+    creator_message = None
+
+    if len(parts) > 1 and buyer_secret_code:
+        creator_message = xor_encrypt_decrypt(parts[1], buyer_secret_code)
+
+    return copyright_hash, creator_message
+
+
+def compute_copyright_hash(unique_key: str) -> str:
+    return hashlib.sha256(unique_key.encode()).hexdigest()
+
+
+def compute_file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extract_watermark_job(kind: str, value, buyer_secret_code: Optional[str] = None) -> dict:
+    """Decode one batch item inside a pool worker.
+
+    kind is "url" (value is the URL), "path" (a local file path) or
+    "bytes" (the raw uploaded content). Must stay a top-level function so
+    it can be pickled into the process pool.
+    """
+    if kind == "url":
+        response = requests.get(value, timeout=30)
+        if response.status_code != 200:
+            return {"status": "error", "detail": f"Unable to download image (status {response.status_code})"}
+        image_source = io.BytesIO(response.content)
+    elif kind == "bytes":
+        image_source = io.BytesIO(value)
+    else:
+        image_source = value
+
+    start = time.time()
+    extracted = extract_message_lsb(image_source)
+    elapsed = time.time() - start
+
+    parsed = parse_watermark(extracted, buyer_secret_code)
+    if parsed is None:
+        return {"status": "not_found", "extracted_in": f"{elapsed:.4f} seconds"}
+
+    copyright_hash, creator_message = parsed
+    return {
+        "status": "found",
+        "extracted_in": f"{elapsed:.4f} seconds",
+        "copyright_hash": copyright_hash,
+        "creator_message": creator_message or "-"
+    }
+
+
+def get_extract_executor(max_workers: int) -> ProcessPoolExecutor:
+    global _extract_executor
+    if _extract_executor is None:
+        _extract_executor = ProcessPoolExecutor(max_workers=max_workers)
+    return _extract_executor
+
+
+def shutdown_extract_executor():
+    global _extract_executor
+    if _extract_executor is not None:
+        _extract_executor.shutdown(wait=False, cancel_futures=True)
+        _extract_executor = None
@@ -1,38 +1,151 @@
-import requests
+# Simulator + benchmark untuk webhook Midtrans (POST /api/payments/payment-callback).
+#
+# Mengirim notifikasi bertanda tangan valid secara paralel, mengukur waktu ack dari endpoint,
+# lalu (opsional) menunggu worker inbox selesai untuk mengukur throughput pemrosesan end-to-end.
+#
+#   python -m app.simulate_callback --orders 500 --concurrency 50 --duplicates 2 --seed --wait
+#
+# --seed membuat receipt pending baru di DATABASE_URL supaya notifikasi benar-benar mengubah status.
+# Tanpa --seed, gunakan --order-id untuk mengirim ke satu order yang sudah ada.
+import argparse
+import asyncio
 import hashlib
-import hmac
-import json
+import os
+import statistics
+import time
+import uuid
 
-ORDER_ID = "ORDER-30313c7d-11ae-4322-a86b-c4bd72f3a57e"  
+import httpx
+
+CALLBACK_URL = os.getenv("CALLBACK_URL", "http://localhost:8000/api/payments/payment-callback")
+SERVER_KEY = os.getenv("MIDTRANS_SERVER_KEY", "")
 STATUS_CODE = "200"
-GROSS_AMOUNT = "100000"
-SERVER_KEY = "SB-Mid-server-h0ioErmlY553Kp2KMHS_FRGF" 
-
-CALLBACK_URL = "https://b454-114-10-44-160.ngrok-free.app/payments/payment-callback"
-
-input_string = ORDER_ID + STATUS_CODE + GROSS_AMOUNT + SERVER_KEY
-signature_key = hmac.new(
-    SERVER_KEY.encode(), input_string.encode(), hashlib.sha512
-).hexdigest()
-
-payload = {
-    "order_id": ORDER_ID,
-    "status_code": STATUS_CODE,
-    "gross_amount": GROSS_AMOUNT,
-    "signature_key": signature_key,
-    "transaction_status": "settlement",
-    "customer_details": {
-        "email": "rossi@yopmail.com"  
-    },
-    "item_details": [
-        {
-            "id": "e666dd86-b7e1-4976-875c-04448e1caf05" 
-        }
-    ]
-}
-
-headers = {"Content-Type": "application/json"}
-response = requests.post(CALLBACK_URL, headers=headers, json=payload)
-# Tampilkan hasil
-print("Status:", response.status_code)
-print("Response:", response.text)
+GROSS_AMOUNT = "100000.00"
+
+
+def build_notification(order_id: str, transaction_status: str = "settlement", transaction_id: str = None) -> dict:
+    # Signature Midtrans: sha512(order_id + status_code + gross_amount + server_key)
+    input_string = f"{order_id}{STATUS_CODE}{GROSS_AMOUNT}{SERVER_KEY}"
+    return {
+        "order_id": order_id,
+        "status_code": STATUS_CODE,
+        "gross_amount": GROSS_AMOUNT,
+        "signature_key": hashlib.sha512(input_string.encode()).hexdigest(),
+        "transaction_status": transaction_status,
+        "transaction_id": transaction_id or str(uuid.uuid4()),
+        "payment_type": "bank_transfer"
+    }
+
+
+def seed_receipts(count: int) -> list:
+    from app.db.database import SessionLocal
+    from app.models import artwork, like, purchase, receipt  # noqa: F401
+    from app.models.artwork import Artwork
+    from app.models.receipt import Receipt, ReceiptStatusEnum
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        suffix = uuid.uuid4().hex[:8]
+        buyer = User(username=f"sim_{suffix}", name="Sim", email=f"sim_{suffix}@example.com", password_hash="-")
+        db.add(buyer)
+        db.flush()
+        order_ids = []
+        for i in range(count):
+            art = Artwork(
+                title=f"Sim {suffix} {i}", owner_id=buyer.id, image_url=f"/static/uploads/sim_{suffix}_{i}.png",
+                unique_key=f"sim-{suffix}-{i}", hash="-", price=100000
+            )
+            db.add(art)
+            db.flush()
+            order_id = f"SIM-{uuid.uuid4()}"
+            db.add(Receipt(buyer_id=buyer.id, artwork_id=art.id, amount=100000, order_id=order_id, status=ReceiptStatusEnum.pending))
+            order_ids.append(order_id)
+        db.commit()
+        return order_ids
+    finally:
+        db.close()
+
+
+def wait_for_inbox(order_ids: list, timeout: float) -> float:
+    from sqlalchemy import func, select
+    from app.db.database import SessionLocal
+    from app.models.payment_inbox import PaymentInbox
+
+    db = SessionLocal()
+    deadline = time.perf_counter() + timeout
+    try:
+        while time.perf_counter() < deadline:
+            pending = db.scalar(
+                select(func.count()).select_from(PaymentInbox)
+                .where(PaymentInbox.order_id.in_(order_ids), PaymentInbox.processed_at.is_(None))
+            )
+            db.rollback()
+            if pending == 0:
+                return time.perf_counter()
+            time.sleep(0.05)
+        raise TimeoutError(f"{pending} inbox rows still pending after {timeout}s")
+    finally:
+        db.close()
+
+
+async def send_all(notifications: list, concurrency: int) -> tuple:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency), timeout=30) as client:
+        async def send(notification):
+            nonlocal failures
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(CALLBACK_URL, json=notification)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    failures += 1
+                    print("Status:", response.status_code, "Response:", response.text)
+
+        await asyncio.gather(*(send(n) for n in notifications))
+    return latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kirim notifikasi Midtrans simulasi ke payment-callback")
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duplicates", type=int, default=1, help="berapa kali tiap notifikasi dikirim ulang")
+    parser.add_argument("--status", default="settlement")
+    parser.add_argument("--order-id", help="kirim ke order yang sudah ada, bukan hasil --seed")
+    parser.add_argument("--seed", action="store_true", help="buat receipt pending baru di database")
+    parser.add_argument("--wait", action="store_true", help="tunggu worker inbox selesai memproses")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    if args.order_id:
+        order_ids = [args.order_id]
+    elif args.seed:
+        order_ids = seed_receipts(args.orders)
+    else:
+        parser.error("gunakan --seed atau --order-id")
+
+    notifications = []
+    for order_id in order_ids:
+        notification = build_notification(order_id, args.status)
+        notifications.extend([notification] * args.duplicates)
+
+    start = time.perf_counter()
+    latencies, failures = asyncio.run(send_all(notifications, args.concurrency))
+    acked = time.perf_counter()
+
+    latencies.sort()
+    quantile = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"Sent {len(notifications)} notifications for {len(order_ids)} orders, {failures} failed")
+    print(f"Ack throughput: {len(notifications) / (acked - start):.1f} req/s")
+    print(f"Ack latency ms: p50={quantile(0.5):.1f} p95={quantile(0.95):.1f} p99={quantile(0.99):.1f} mean={statistics.mean(latencies) * 1000:.1f}")
+
+    if args.wait:
+        done = wait_for_inbox(order_ids, args.timeout)
+        print(f"Processed by worker in {done - start:.2f}s: {len(notifications) / (done - start):.1f} notifications/s end-to-end")
+
+
+if __name__ == "__main__":
+    main()
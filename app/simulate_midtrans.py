@@ -0,0 +1,71 @@
+# Stand-in lokal untuk Midtrans (Snap + Core API status), untuk load test checkout tanpa internet.
+#
+#   uvicorn app.simulate_midtrans:app --port 8100
+#   MIDTRANS_SNAP_URL=http://localhost:8100/snap/v1/transactions
+#   MIDTRANS_API_BASE_URL=http://localhost:8100
+#
+# Env opsional: SIM_LATENCY_MS (latensi tiap request), SIM_FAILURE_RATE (0..1, balas 503 secara acak).
+import asyncio
+import os
+import random
+import uuid
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="Midtrans stand-in")
+
+LATENCY_MS = float(os.getenv("SIM_LATENCY_MS", "50"))
+FAILURE_RATE = float(os.getenv("SIM_FAILURE_RATE", "0"))
+
+transactions = {}
+
+
+async def _simulate_network():
+    if LATENCY_MS:
+        await asyncio.sleep(LATENCY_MS / 1000)
+    if FAILURE_RATE and random.random() < FAILURE_RATE:
+        raise HTTPException(status_code=503, detail="Simulated gateway failure")
+
+
+@app.post("/snap/v1/transactions", status_code=201)
+async def create_transaction(request: Request):
+    await _simulate_network()
+    payload = await request.json()
+    order_id = payload["transaction_details"]["order_id"]
+    if order_id in transactions:
+        return JSONResponse(status_code=400, content={"error_messages": ["order_id has already been taken"]})
+
+    token = uuid.uuid4().hex
+    transactions[order_id] = {
+        "order_id": order_id,
+        "transaction_id": str(uuid.uuid4()),
+        "gross_amount": f"{payload['transaction_details']['gross_amount']}.00",
+        "transaction_status": "pending",
+        "status_code": "201",
+        "payment_type": "bank_transfer"
+    }
+    return {"token": token, "redirect_url": f"http://localhost:8100/snap/v2/vtweb/{token}"}
+
+
+@app.get("/v2/{order_id}/status")
+async def transaction_status(order_id: str):
+    await _simulate_network()
+    transaction = transactions.get(order_id)
+    if not transaction:
+        return {"status_code": "404", "status_message": "Transaction doesn't exist."}
+    return transaction
+
+
+@app.post("/_sim/transactions/{order_id}/status")
+async def set_transaction_status(order_id: str, request: Request):
+    """Ubah status transaksi (settlement/expire/cancel/deny) untuk skenario test."""
+    body = await request.json()
+    transaction = transactions.setdefault(order_id, {
+        "order_id": order_id,
+        "transaction_id": str(uuid.uuid4()),
+        "gross_amount": body.get("gross_amount", "0.00"),
+        "payment_type": "bank_transfer"
+    })
+    transaction["transaction_status"] = body["transaction_status"]
+    transaction["status_code"] = "200" if body["transaction_status"] in ("settlement", "capture") else "201"
+    return transaction
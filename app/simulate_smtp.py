@@ -0,0 +1,109 @@
+# SMTP sink lokal untuk menguji outbox email tanpa server SMTP sungguhan.
+#
+#   python -m app.simulate_smtp --port 1025 [--out /tmp/mails]
+#   MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_STARTTLS=false
+#
+# Menerima AUTH apa pun, menyimpan tiap email sebagai .eml jika --out diisi, dan mencetak ringkasan.
+# Env opsional: SINK_LATENCY_MS (jeda sebelum membalas DATA), SINK_FAILURE_RATE (0..1, balas 451 secara acak).
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+
+LATENCY_MS = float(os.getenv("SINK_LATENCY_MS", "0"))
+FAILURE_RATE = float(os.getenv("SINK_FAILURE_RATE", "0"))
+
+stats = {"connections": 0, "messages": 0, "rejected": 0}
+
+
+async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, out_dir: str):
+    stats["connections"] += 1
+    print(f"CONNECT {stats['connections']}")
+
+    async def reply(line: str):
+        writer.write(f"{line}\r\n".encode())
+        await writer.drain()
+
+    await reply("220 localhost simulate_smtp ready")
+    mail_from, recipients = None, []
+    try:
+        while True:
+            raw = await reader.readline()
+            if not raw:
+                break
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            command = line.split(" ", 1)[0].upper()
+
+            if command in ("EHLO", "HELO"):
+                writer.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250-8BITMIME\r\n")
+                await reply("250 SMTPUTF8")
+            elif command == "AUTH":
+                if line.upper().startswith("AUTH LOGIN"):
+                    await reply("334 VXNlcm5hbWU6")
+                    await reader.readline()
+                    await reply("334 UGFzc3dvcmQ6")
+                    await reader.readline()
+                await reply("235 2.7.0 Authentication successful")
+            elif command == "MAIL":
+                mail_from, recipients = line[10:].strip(), []
+                await reply("250 OK")
+            elif command == "RCPT":
+                recipients.append(line[8:].strip())
+                await reply("250 OK")
+            elif command == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = await reader.readline()
+                    if data_line in (b".\r\n", b".\n", b""):
+                        break
+                    lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                if LATENCY_MS:
+                    await asyncio.sleep(LATENCY_MS / 1000)
+                if FAILURE_RATE and random.random() < FAILURE_RATE:
+                    stats["rejected"] += 1
+                    await reply("451 4.3.0 Simulated temporary failure")
+                    continue
+                stats["messages"] += 1
+                if out_dir:
+                    with open(os.path.join(out_dir, f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.eml"), "wb") as f:
+                        f.writelines(lines)
+                print(f"MAIL {stats['messages']}: {mail_from} -> {', '.join(recipients)}")
+                await reply("250 OK queued")
+            elif command == "RSET":
+                mail_from, recipients = None, []
+                await reply("250 OK")
+            elif command == "NOOP":
+                await reply("250 OK")
+            elif command == "QUIT":
+                await reply("221 Bye")
+                break
+            else:
+                await reply("502 Command not implemented")
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def main(host: str, port: int, out_dir: str):
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    server = await asyncio.start_server(lambda r, w: handle_client(r, w, out_dir), host, port)
+    print(f"SMTP sink listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--out", default="")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.host, args.port, args.out))
+    except KeyboardInterrupt:
+        print(f"Stopped: {stats}")
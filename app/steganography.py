@@ -1,7 +1,14 @@
 import os
+import re
+import math
 import base64
+from typing import Optional
+import numpy as np
 from PIL import Image
 
+COPYRIGHT_HEADER = "COPYRIGHT:"
+COPYRIGHT_HASH_LENGTH = 64
+
 
 def text_to_binary(text: str) -> str:
     return ''.join(format(ord(char), '08b') for char in text)
@@ -95,4 +102,112 @@ def extract_message_lsb(stego_image_path: str) -> str:
         if ''.join(chars[-5:]) == "<END>":  
             break
 
-    return ''.join(chars).replace("<END>", "")
\ No newline at end of file
+    return ''.join(chars).replace("<END>", "")
+
+def _chi_square_p_value(values: np.ndarray) -> float:
+    # Westfeld & Pfitzmann: LSB replacement equalises the counts of each pair of values (2k, 2k+1)
+    histogram = np.bincount(values.ravel(), minlength=256).astype(np.float64)
+    even, odd = histogram[0::2], histogram[1::2]
+    expected = (even + odd) / 2
+    usable = expected > 4
+    dof = int(usable.sum()) - 1
+    if dof < 1:
+        return 0.0
+    chi_square = float((((even - expected) ** 2)[usable] / expected[usable]).sum())
+    # Wilson-Hilferty: survival function of the chi-square distribution without scipy
+    z = ((chi_square / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _rs_regular_singular(groups: np.ndarray, mask: np.ndarray):
+    smoothness = np.abs(np.diff(groups, axis=1)).sum(axis=1)
+    flipped = groups.copy()
+    positive, negative = mask == 1, mask == -1
+    flipped[:, positive] = groups[:, positive] ^ 1
+    flipped[:, negative] = ((groups[:, negative] + 1) ^ 1) - 1
+    flipped_smoothness = np.abs(np.diff(flipped, axis=1)).sum(axis=1)
+    return (flipped_smoothness > smoothness).mean(), (flipped_smoothness < smoothness).mean()
+
+
+def _rs_embedding_rate(values: np.ndarray) -> float:
+    # Fridrich RS analysis on groups of 4 horizontally adjacent samples per channel
+    usable_width = values.shape[1] - values.shape[1] % 4
+    groups = values[:, :usable_width, :].transpose(0, 2, 1).reshape(-1, 4).astype(np.int16)
+    if len(groups) == 0:
+        return 0.0
+
+    mask = np.array([0, 1, 1, 0])
+    r_m, s_m = _rs_regular_singular(groups, mask)
+    r_nm, s_nm = _rs_regular_singular(groups, -mask)
+    r_m1, s_m1 = _rs_regular_singular(groups ^ 1, mask)
+    r_nm1, s_nm1 = _rs_regular_singular(groups ^ 1, -mask)
+
+    d0, d1 = r_m - s_m, r_m1 - s_m1
+    dn0, dn1 = r_nm - s_nm, r_nm1 - s_nm1
+    a = 2 * (d1 + d0)
+    b = dn0 - dn1 - d1 - 3 * d0
+    c = d0 - dn0
+
+    if abs(a) < 1e-12:
+        if abs(b) < 1e-12:
+            return 0.0
+        root = -c / b
+    else:
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0:
+            return 0.0
+        roots = [(-b + math.sqrt(discriminant)) / (2 * a), (-b - math.sqrt(discriminant)) / (2 * a)]
+        root = min(roots, key=abs)
+
+    if abs(root - 0.5) < 1e-12:
+        return 1.0
+    return float(min(max(root / (root - 0.5), 0.0), 1.0))
+
+
+def analyze_lsb(image_source, sample_rows: int = 64, max_columns: int = 1024,
+                p_threshold: float = 0.95, rate_threshold: float = 0.15) -> dict:
+    """Statistical pre-screen for any LSB-replacement payload (not only ours).
+
+    Only sample_rows evenly spaced rows (always including row 0, where
+    sequential embedders start) and at most max_columns pixels per row are
+    analysed, so the cost per image is bounded regardless of resolution.
+    """
+    img = image_source if isinstance(image_source, Image.Image) else Image.open(image_source)
+    width, height = img.size
+    rows = np.unique(np.linspace(0, height - 1, num=min(sample_rows, height)).astype(int))
+
+    columns = min(width, max_columns)
+    # Crop + convert per baris sampel saja, supaya hanya sample_rows x max_columns piksel yang dikonversi
+    sample = np.stack([np.asarray(img.crop((0, int(r), columns, int(r) + 1)).convert("RGB"))[0] for r in rows])
+
+    chi_square_p = _chi_square_p_value(sample)
+    rs_rate = _rs_embedding_rate(sample)
+
+    return {
+        "sampled_rows": int(len(rows)),
+        "sampled_pixels": int(sample.shape[0] * sample.shape[1]),
+        "chi_square_p": round(chi_square_p, 4),
+        "rs_estimated_rate": round(rs_rate, 4),
+        "suspicious": bool(chi_square_p > p_threshold or rs_rate > rate_threshold)
+    }
+
+
+def probe_copyright_header(image_source) -> Optional[str]:
+    """Read only the pixels holding "COPYRIGHT:<sha256>" and return the hash if present."""
+    img = image_source if isinstance(image_source, Image.Image) else Image.open(image_source)
+    width, height = img.size
+
+    header_bits = (len(COPYRIGHT_HEADER) + COPYRIGHT_HASH_LENGTH) * 8
+    header_pixels = -(-header_bits // 3)
+    header_rows = min(height, -(-header_pixels // width))
+
+    pixels = list(img.crop((0, 0, width, header_rows)).convert("RGB").getdata())[:header_pixels]
+    bits = ''.join(str(channel & 1) for pixel in pixels for channel in pixel)[:header_bits]
+    header = binary_to_text(bits)
+
+    if not header.startswith(COPYRIGHT_HEADER):
+        return None
+    copyright_hash = header[len(COPYRIGHT_HEADER):]
+    if not re.fullmatch(r"[0-9a-f]{64}", copyright_hash):
+        return None
+    return copyright_hash
@@ -1,54 +1,124 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
+import asyncio
+import logging
+from email.message import EmailMessage
+from typing import Optional
+import aiosmtplib
 from pydantic import EmailStr
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from jinja2 import TemplateNotFound
 from app.core.config import settings
-from app.core.mail_config import conf, env
-
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,   
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,     
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True
-)
-
-env = Environment(loader=FileSystemLoader("app/templates"))
+from app.core.mail_config import env
 
-async def send_certificate_email(to_email: EmailStr, context: dict):
-    try:
-        template = env.get_template("certificate_email.html")
-        html_content = template.render(**context)
-    except TemplateNotFound:
-        raise RuntimeError("Template 'certificate_email.html' not found in app/templates")
+logger = logging.getLogger(__name__)
 
-    message = MessageSchema(
-        subject="Sertifikat Kepemilikan Karya Digital",
-        recipients=[to_email],
-        body=html_content,
-        subtype="html"
-    )
+EMAIL_TEMPLATES = {
+    "certificate": ("certificate_email.html", "Sertifikat Kepemilikan Karya Digital"),
+    "purchase": ("purchase_email.html", "Tanda Terima Pembelian Karya Digital"),
+}
 
-    fm = FastMail(conf)
-    await fm.send_message(message)
 
-async def send_purchase_email(to_email: EmailStr, context: dict):
+def render_email(kind: str, to_email: str, context: dict) -> EmailMessage:
+    template_name, subject = EMAIL_TEMPLATES[kind]
     try:
-        template = env.get_template("purchase_email.html")
+        template = env.get_template(template_name)
         html_content = template.render(**context)
     except TemplateNotFound:
-        raise RuntimeError("Template 'purchase_email.html' not found in app/templates")
+        raise RuntimeError(f"Template '{template_name}' not found in app/templates")
+
+    message = EmailMessage()
+    message["From"] = settings.MAIL_FROM
+    message["To"] = to_email
+    message["Subject"] = subject
+    message.set_content(html_content, subtype="html")
+    return message
+
+
+class SMTPPool:
+    """A few long-lived SMTP sessions shared by all senders.
+
+    Connecting, STARTTLS and AUTH happen once per connection instead of once
+    per email. A connection that was dropped by the server (idle timeout,
+    restart) is reopened and the message is tried once more on it.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: Optional[asyncio.Queue] = None
+
+    def _new_client(self) -> aiosmtplib.SMTP:
+        return aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            username=settings.MAIL_USERNAME or None,
+            password=settings.MAIL_PASSWORD or None,
+            use_tls=settings.MAIL_SSL_TLS,
+            start_tls=settings.MAIL_STARTTLS,
+            timeout=settings.EMAIL_SMTP_TIMEOUT
+        )
+
+    def _queue(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(self._new_client())
+        return self._idle
 
-    message = MessageSchema(
-        subject="Tanda Terima Pembelian Karya Digital",
-        recipients=[to_email],
-        body=html_content,
-        subtype="html"
-    )
+    async def send(self, message: EmailMessage):
+        idle = self._queue()
+        client = await idle.get()
+        try:
+            for attempt in range(2):
+                try:
+                    if not client.is_connected:
+                        await client.connect()
+                    await client.send_message(message)
+                    return
+                except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, ConnectionError):
+                    client.close()
+                    if attempt == 1:
+                        raise
+                except aiosmtplib.SMTPException:
+                    # Ditolak server (mis. 4xx/5xx); bersihkan state transaksi SMTP supaya koneksi bisa dipakai lagi
+                    try:
+                        await client.rset()
+                    except aiosmtplib.SMTPException:
+                        client.close()
+                    raise
+        finally:
+            idle.put_nowait(client)
 
-    fm = FastMail(conf)
-    await fm.send_message(message)
+    async def close(self):
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            client = self._idle.get_nowait()
+            if client.is_connected:
+                try:
+                    await client.quit()
+                except aiosmtplib.SMTPException:
+                    client.close()
+        self._idle = None
 
+
+_pool: Optional[SMTPPool] = None
+
+
+def get_smtp_pool() -> SMTPPool:
+    global _pool
+    if _pool is None:
+        _pool = SMTPPool(settings.EMAIL_SMTP_POOL_SIZE)
+    return _pool
+
+
+async def close_smtp_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+async def send_certificate_email(to_email: EmailStr, context: dict):
+    await get_smtp_pool().send(render_email("certificate", to_email, context))
+
+
+async def send_purchase_email(to_email: EmailStr, context: dict):
+    await get_smtp_pool().send(render_email("purchase", to_email, context))
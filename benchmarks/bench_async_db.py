@@ -0,0 +1,107 @@
+"""Async routes: synchronous Session vs. AsyncSession under concurrent load.
+
+Mounts two copies of the get_my_purchases query on one ASGI app and drives
+them with --concurrency in-flight requests through httpx:
+
+  before  async def + sync Session (every query blocks the event loop)
+  after   async def + AsyncSession on asyncpg (event loop free while waiting)
+
+--db-latency-ms adds a pg_sleep to each request to stand in for the network
+round trip to a remote database (RDS); on a local socket the query itself
+is sub-millisecond and both paths look alike.
+
+Keep --concurrency below DB_POOL_SIZE + DB_MAX_OVERFLOW: above it the
+"before" path deadlocks until DB_POOL_TIMEOUT, because the event loop is
+blocked inside pool checkout while the connections that would satisfy it
+can only be returned by that same loop.
+
+    python benchmarks/bench_async_db.py [--requests 200] [--concurrency 10] [--db-latency-ms 5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import SessionLocal, async_engine, get_async_db, get_db  # noqa: E402
+from app.models import artwork, like, purchase, user  # noqa: E402,F401
+from app.models.receipt import Receipt  # noqa: E402
+
+app = FastAPI()
+LATENCY = {"seconds": 0.0}
+
+
+@app.get("/before")
+async def purchases_sync_session(buyer_id: str, db: Session = Depends(get_db)):
+    if LATENCY["seconds"]:
+        db.execute(text("SELECT pg_sleep(:s)"), {"s": LATENCY["seconds"]})
+    receipts = db.scalars(select(Receipt).options(joinedload(Receipt.artwork)).where(Receipt.buyer_id == buyer_id)).all()
+    return len(receipts)
+
+
+@app.get("/after")
+async def purchases_async_session(buyer_id: str, db: AsyncSession = Depends(get_async_db)):
+    if LATENCY["seconds"]:
+        await db.execute(text("SELECT pg_sleep(:s)"), {"s": LATENCY["seconds"]})
+    receipts = (await db.scalars(select(Receipt).options(joinedload(Receipt.artwork)).where(Receipt.buyer_id == buyer_id))).all()
+    return len(receipts)
+
+
+async def drive(path: str, buyer_id: str, requests: int, concurrency: int):
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(path, params={"buyer_id": buyer_id})
+                assert response.status_code == 200, response.text
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return requests / elapsed, statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.99) - 1] * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    LATENCY["seconds"] = args.db_latency_ms / 1000
+
+    db = SessionLocal()
+    # Pembeli dengan struk paling sedikit: yang diukur menunggu DB, bukan serialisasi JSON
+    buyer_id = db.scalar(select(Receipt.buyer_id).group_by(Receipt.buyer_id).order_by(func.count()).limit(1))
+    db.close()
+    if buyer_id is None:
+        sys.exit("Need at least one receipt in DATABASE_URL")
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, +{args.db_latency_ms} ms per request in the database\n")
+    print(f"{'path':<8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for path in ("/before", "/after"):
+        await drive(path, str(buyer_id), min(20, args.requests), args.concurrency)  # warm-up pool
+        rps, p50, p99 = await drive(path, str(buyer_id), args.requests, args.concurrency)
+        print(f"{path:<8} {rps:>8.1f} {p50:>8.1f} {p99:>8.1f}")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
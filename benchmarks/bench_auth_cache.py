@@ -0,0 +1,79 @@
+"""Authenticated request throughput with and without the user cache.
+
+Creates a throwaway user in DATABASE_URL, then drives GET /api/users/me
+through the ASGI app with USER_CACHE_TTL_SECONDS=0 (every request queries
+users) and with the cache enabled.
+
+    python benchmarks/bench_auth_cache.py [--requests 2000]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.models import artwork, like, purchase, receipt  # noqa: E402,F401
+from app.models.user import User  # noqa: E402
+from app.api.routes import users  # noqa: E402
+from app.services.user_cache import clear_user_cache  # noqa: E402
+
+
+def run(client: TestClient, headers: dict, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        response = client.get("/api/users/me", headers=headers)
+        assert response.status_code == 200, response.text
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = FastAPI()
+    app.include_router(users.router, prefix="/api/users")
+    client = TestClient(app)
+
+    db = SessionLocal()
+    suffix = uuid.uuid4().hex[:8]
+    user = User(username=f"bench_{suffix}", name="Bench", email=f"bench_{suffix}@example.com", password_hash="-", is_active=True)
+    db.add(user)
+    db.commit()
+
+    token = jwt.encode(
+        {"sub": str(user.id), "exp": int((datetime.utcnow() + timedelta(minutes=10)).timestamp())},
+        settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+
+    try:
+        ttl = settings.USER_CACHE_TTL_SECONDS
+        settings.USER_CACHE_TTL_SECONDS = 0
+        run(client, headers, 50)
+        uncached = run(client, headers, args.requests)
+
+        settings.USER_CACHE_TTL_SECONDS = ttl or 30
+        clear_user_cache()
+        run(client, headers, 50)
+        cached = run(client, headers, args.requests)
+    finally:
+        db.delete(user)
+        db.commit()
+        db.close()
+
+    print(f"without cache: {uncached:8.1f} req/s")
+    print(f"with cache:    {cached:8.1f} req/s  ({cached / uncached:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Load tool for POST /api/my/purchase/{artwork_id} under contention.
+
+Creates one artwork and --buyers throwaway users in DATABASE_URL, then
+fires one purchase request per buyer at the same moment from a thread
+pool, for --rounds rounds, and prints the outcome and 409 latency. The
+correctness check (one 201, N-1 409, one purchase row, is_sold) runs in
+tests/test_purchase_race.py; use this script for larger N.
+
+    python benchmarks/bench_purchase_race.py [--buyers 50] [--rounds 5]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.models import artwork, like, purchase, receipt  # noqa: E402,F401
+from app.models.artwork import Artwork  # noqa: E402
+from app.models.purchase import Purchase  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.api.routes import purchase as purchase_routes  # noqa: E402
+
+
+def make_token(user_id) -> str:
+    return jwt.encode(
+        {"sub": str(user_id), "exp": int((datetime.utcnow() + timedelta(minutes=10)).timestamp())},
+        settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+
+
+def run_round(client: TestClient, buyers: int) -> None:
+    db = SessionLocal()
+    suffix = uuid.uuid4().hex[:8]
+    users = [
+        User(username=f"race_{suffix}_{i}", name="Race", email=f"race_{suffix}_{i}@example.com", password_hash="-")
+        for i in range(buyers + 1)
+    ]
+    db.add_all(users)
+    db.flush()
+    art = Artwork(
+        title=f"Race {suffix}", owner_id=users[0].id, image_url=f"/static/uploads/race_{suffix}.png",
+        unique_key=f"race-{suffix}", hash="-", price=100000
+    )
+    db.add(art)
+    db.commit()
+    headers = [{"Authorization": f"Bearer {make_token(u.id)}"} for u in users[1:]]
+
+    barrier = threading.Barrier(buyers)
+
+    def attempt(h):
+        barrier.wait()
+        start = time.perf_counter()
+        response = client.post(f"/api/my/purchase/{art.id}", headers=h)
+        return response.status_code, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=buyers) as pool:
+        results = list(pool.map(attempt, headers))
+
+    codes = Counter(code for code, _ in results)
+    loser_ms = sorted(t * 1000 for code, t in results if code == 409)
+    purchases = db.query(Purchase).filter_by(artwork_id=art.id).count()
+    db.refresh(art)
+    db.close()
+
+    p50 = loser_ms[len(loser_ms) // 2] if loser_ms else 0
+    print(f"{dict(codes)}  purchases={purchases}  is_sold={art.is_sold}  409 p50={p50:.1f}ms")
+    assert codes[201] == 1 and codes[409] == buyers - 1, codes
+    assert purchases == 1 and art.is_sold
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--buyers", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    app = FastAPI()
+    app.include_router(purchase_routes.router, prefix="/api/my")
+    client = TestClient(app)
+
+    for _ in range(args.rounds):
+        run_round(client, args.buyers)
+    print("OK: exactly one winner per round")
+
+
+if __name__ == "__main__":
+    main()
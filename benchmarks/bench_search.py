@@ -0,0 +1,123 @@
+"""Artwork search: ILIKE sequential scan vs. full-text GIN and pg_trgm indexes.
+
+Seeds --rows synthetic artworks (default 1,000,000) owned by a throwaway
+user in DATABASE_URL, ANALYZEs, then times each search shape a few times:
+
+  ilike_seqscan   title ILIKE '%term%' with index scans disabled (pre-migration plan)
+  fulltext        search_vector @@ websearch_to_tsquery (ix_artworks_search_vector)
+  trigram         title ILIKE '%term%' (ix_artworks_title_trgm, needs pg_trgm)
+  explore         full explore search: both matches OR-ed, ranked, top 24
+
+    python benchmarks/bench_search.py --seed [--rows 1000000]
+    python benchmarks/bench_search.py            # reuse seeded rows
+    python benchmarks/bench_search.py --cleanup
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import create_app_engine  # noqa: E402
+
+# Seed 1M baris dan seq scan jauh melewati DB_STATEMENT_TIMEOUT_MS aplikasi
+engine = create_app_engine(application_name="bench-search", statement_timeout_ms=0)
+
+WORDS = [
+    "sepeda", "gunung", "pantai", "senja", "kucing", "batik", "wayang", "kopi", "hujan", "kota",
+    "portrait", "abstract", "sunset", "forest", "ocean", "neon", "pixel", "garden", "street", "dream",
+]
+TERMS = ["sepeda", "senja pantai", "neon", "batik wayang", "zzzz"]
+
+
+def seed(rows: int):
+    with engine.begin() as conn:
+        owner_id = conn.execute(text(
+            "INSERT INTO users (id, username, name, email, password_hash, is_active) "
+            "VALUES (gen_random_uuid(), 'bench_search', 'Bench', 'bench_search@example.com', '-', true) "
+            "ON CONFLICT (username) DO UPDATE SET name = EXCLUDED.name RETURNING id"
+        )).scalar()
+        words = "ARRAY[" + ",".join(f"'{w}'" for w in WORDS) + "]"
+        start = time.perf_counter()
+        conn.execute(text(f"""
+            INSERT INTO artworks (id, title, description, price, owner_id, created_at, image_url, unique_key, hash, is_sold)
+            SELECT gen_random_uuid(),
+                   initcap(w[1 + (g * 7) % 20] || ' ' || w[1 + (g * 13) % 20]) || ' #' || g,
+                   'Karya ' || w[1 + (g * 3) % 20] || ' dengan nuansa ' || w[1 + (g * 11) % 20],
+                   (g % 50) * 10000, :owner, now() - (g || ' seconds')::interval,
+                   '/static/watermarked/bench-' || g || '.png', 'bench-' || g, '-', false
+            FROM generate_series(1, :rows) AS g, (SELECT {words} AS w) AS vocab
+        """), {"owner": owner_id, "rows": rows})
+        print(f"Seeded {rows} artworks in {time.perf_counter() - start:.1f}s")
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE artworks"))
+
+
+def cleanup():
+    with engine.begin() as conn:
+        deleted = conn.execute(text("DELETE FROM artworks WHERE unique_key LIKE 'bench-%'")).rowcount
+        conn.execute(text("DELETE FROM users WHERE username = 'bench_search'"))
+    print(f"Deleted {deleted} seeded artworks")
+
+
+def timed(conn, sql: str, params: dict, repeat: int):
+    plan = conn.execute(text(f"EXPLAIN {sql}"), params).scalars().all()
+    samples, rows = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(conn.execute(text(sql), params).all())
+        samples.append((time.perf_counter() - start) * 1000)
+    scan = next((line.strip() for line in plan if "Scan" in line), plan[0].strip())
+    return statistics.median(samples), rows, scan
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", action="store_true")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+    if args.seed:
+        seed(args.rows)
+
+    with engine.connect() as conn:
+        has_trgm = conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).scalar() is not None
+        total = conn.execute(text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'artworks'::regclass")).scalar()
+        print(f"artworks ~{total} rows, pg_trgm {'installed' if has_trgm else 'NOT installed (trigram cases skipped)'}\n")
+
+        rank = "ts_rank_cd(search_vector, q)" + (" + similarity(title, :term)" if has_trgm else "")
+        cases = {
+            "ilike_seqscan": "SELECT id FROM artworks WHERE title ILIKE :like",
+            "fulltext": "SELECT id FROM artworks WHERE search_vector @@ websearch_to_tsquery('simple', :term)",
+            "explore": (
+                f"SELECT id, {rank} AS rank FROM artworks, websearch_to_tsquery('simple', :term) AS q "
+                "WHERE search_vector @@ q" + (" OR title ILIKE :like" if has_trgm else "") + " "
+                "ORDER BY rank DESC, created_at DESC, id DESC LIMIT 24"
+            ),
+        }
+        if has_trgm:
+            cases["trigram"] = "SELECT id FROM artworks WHERE title ILIKE :like"
+
+        print(f"{'case':<15} {'term':<14} {'median ms':>10} {'rows':>8}  plan")
+        for term in TERMS:
+            params = {"term": term, "like": f"%{term}%"}
+            for name, sql in cases.items():
+                if name == "ilike_seqscan":
+                    conn.execute(text("SET enable_indexscan = off; SET enable_bitmapscan = off"))
+                ms, rows, scan = timed(conn, sql, params, args.repeat)
+                conn.execute(text("RESET enable_indexscan; RESET enable_bitmapscan"))
+                print(f"{name:<15} {term:<14} {ms:>10.2f} {rows:>8}  {scan}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Explore page serialization: ORM + pydantic vs. column projection + orjson.
+
+For --limit rows of the explore feed (newest first) in DATABASE_URL:
+
+  serialize   rows already loaded; ArtworkListResponse.model_validate(...)
+              .model_dump_json() on ORM objects vs. artwork_response_dict + dumps
+  query+ser   the same including the SELECT: db.query(Artwork) vs.
+              db.query(*ARTWORK_RESPONSE_COLUMNS, Artwork.created_at)
+  overlay     liked_by_me overlay on a cached body: json.loads/dumps vs. orjson
+
+Also checks that both paths produce byte-identical bodies (same ETag).
+
+    python benchmarks/bench_serialization.py [--limit 24 100] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.serialization import dumps, loads  # noqa: E402
+from app.crud.artwork_crud import ARTWORK_RESPONSE_COLUMNS, artwork_response_dict  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.models import like, purchase, receipt, user  # noqa: E402,F401
+from app.models.artwork import Artwork  # noqa: E402
+from app.schemas.artwork_schema import ArtworkListResponse  # noqa: E402
+
+
+def page(result, total):
+    return {
+        "status": "success",
+        "message": "Artworks found.",
+        "result": result,
+        "total": total,
+        "total_is_estimate": False,
+        "next_cursor": None,
+    }
+
+
+def old_body(artworks):
+    return ArtworkListResponse.model_validate(page(artworks, len(artworks))).model_dump_json().encode()
+
+
+def new_body(rows):
+    return dumps(page([artwork_response_dict(row) for row in rows], len(rows)))
+
+
+def old_query(db, limit):
+    db.expunge_all()
+    return db.query(Artwork).order_by(Artwork.created_at.desc(), Artwork.id.desc()).limit(limit).all()
+
+
+def new_query(db, limit):
+    return db.query(*ARTWORK_RESPONSE_COLUMNS, Artwork.created_at).order_by(
+        Artwork.created_at.desc(), Artwork.id.desc()
+    ).limit(limit).all()
+
+
+def old_overlay(body):
+    data = json.loads(body)
+    data["result"][0]["liked_by_me"] = True
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def new_overlay(body):
+    data = loads(body)
+    data["result"][0]["liked_by_me"] = True
+    return dumps(data)
+
+
+def timed(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, nargs="+", default=[24, 100])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    print(f"{'rows':>5} {'case':<10} {'before us':>10} {'after us':>10} {'speedup':>8}")
+    for limit in args.limit:
+        artworks = old_query(db, limit)
+        rows = new_query(db, limit)
+        if old_body(artworks) != new_body(rows):
+            sys.exit("Bodies differ between the pydantic and orjson paths")
+        body = new_body(rows)
+        if old_overlay(body) != new_overlay(body):
+            sys.exit("Overlay bodies differ between json and orjson")
+
+        cases = [
+            ("serialize", lambda: old_body(artworks), lambda: new_body(rows)),
+            ("query+ser", lambda: old_body(old_query(db, limit)), lambda: new_body(new_query(db, limit))),
+            ("overlay", lambda: old_overlay(body), lambda: new_overlay(body)),
+        ]
+        for name, before, after in cases:
+            before_us, after_us = timed(before, args.repeat), timed(after, args.repeat)
+            print(f"{len(rows):>5} {name:<10} {before_us:>10.0f} {after_us:>10.0f} {before_us / after_us:>7.1f}x")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
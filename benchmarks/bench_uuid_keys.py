@@ -0,0 +1,105 @@
+"""Insert throughput and index size: uuid4 vs. UUIDv7 primary keys.
+
+Creates two scratch tables shaped like `likes` (uuid primary key, user/artwork
+uuids, unique (user_id, artwork_id), created_at) in DATABASE_URL and inserts
+--rows rows into each in --batch sized transactions, ids generated in Python
+the way the app does (uuid.uuid4 vs. app.core.ids.uuid7). Reports rows/s per
+segment and the final primary-key index size; random keys split pages all
+over the B-tree, so the gap grows once the index no longer fits in
+shared_buffers.
+
+    python benchmarks/bench_uuid_keys.py [--rows 1000000] [--batch 1000] [--keep]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.ids import uuid7  # noqa: E402
+from app.db.database import create_app_engine  # noqa: E402
+
+engine = create_app_engine(application_name="bench-uuid-keys", statement_timeout_ms=0)
+
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+SEGMENTS = 4
+
+
+def create_table(conn, name: str):
+    conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    conn.execute(text(f"""
+        CREATE TABLE {name} (
+            id uuid PRIMARY KEY,
+            user_id uuid NOT NULL,
+            artwork_id uuid NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now()
+        )
+    """))
+    conn.execute(text(f"CREATE UNIQUE INDEX {name}_user_artwork ON {name} (user_id, artwork_id)"))
+
+
+def run(name: str, generate, rows: int, batch: int):
+    table = f"bench_keys_{name}"
+    with engine.begin() as conn:
+        create_table(conn, table)
+
+    # Sedikit user dan artwork supaya index (user_id, artwork_id) sama untuk kedua varian
+    users = [uuid.uuid4() for _ in range(1000)]
+    insert = text(f"""
+        INSERT INTO {table} (id, user_id, artwork_id)
+        SELECT * FROM unnest(CAST(:ids AS uuid[]), CAST(:users AS uuid[]), CAST(:artworks AS uuid[]))
+    """)
+
+    rates = []
+    segment_rows = max(rows // SEGMENTS, 1)
+    next_segment = segment_rows
+    start = segment_start = time.perf_counter()
+    for done in range(0, rows, batch):
+        n = min(batch, rows - done)
+        params = {
+            "ids": [str(generate()) for _ in range(n)],
+            "users": [str(users[(done + i) % len(users)]) for i in range(n)],
+            "artworks": [str(uuid.uuid4()) for _ in range(n)],
+        }
+        with engine.begin() as conn:
+            conn.execute(insert, params)
+        if done + n >= next_segment and len(rates) < SEGMENTS:
+            now = time.perf_counter()
+            rates.append((done + n - next_segment + segment_rows) / (now - segment_start))
+            segment_start, next_segment = now, done + n + segment_rows
+    elapsed = time.perf_counter() - start
+
+    with engine.connect() as conn:
+        pkey_bytes = conn.scalar(text(f"SELECT pg_relation_size('{table}_pkey')"))
+        heap_bytes = conn.scalar(text(f"SELECT pg_relation_size('{table}')"))
+    return rows / elapsed, rates, pkey_bytes, heap_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--keep", action="store_true", help="jangan drop tabel bench_keys_* setelah selesai")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        print(f"shared_buffers {conn.scalar(text('SHOW shared_buffers'))}, {args.rows} rows, batch {args.batch}\n")
+
+    print(f"{'key':<6} {'rows/s':>9}   {'rows/s per quarter':<36} {'pkey MB':>8} {'heap MB':>8}")
+    for name, generate in GENERATORS.items():
+        rate, rates, pkey_bytes, heap_bytes = run(name, generate, args.rows, args.batch)
+        quarters = " ".join(f"{r:>8.0f}" for r in rates)
+        print(f"{name:<6} {rate:>9.0f}   {quarters:<36} {pkey_bytes / 2**20:>8.1f} {heap_bytes / 2**20:>8.1f}")
+
+    if not args.keep:
+        with engine.begin() as conn:
+            for name in GENERATORS:
+                conn.execute(text(f"DROP TABLE IF EXISTS bench_keys_{name}"))
+
+
+if __name__ == "__main__":
+    main()
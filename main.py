@@ -1,13 +1,13 @@
 import os
+import asyncio
 import logging
 import sys
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 
 # Load environment variables first
@@ -67,31 +67,14 @@ def verify_ml_dependencies():
         return False
 
 def create_database_engine():
-    """Create database engine optimized for AWS RDS on App Runner"""
+    """Verify the shared engine from app.db.database (the one request sessions use)"""
     if not DATABASE_URL:
         logger.error("DATABASE_URL not found in environment variables")
         return None
     
     try:
-        # AWS RDS optimized connection parameters for App Runner
-        connect_args = {}
-        
-        # Add SSL configuration for AWS RDS if not in URL
-        if "amazonaws.com" in DATABASE_URL and "sslmode" not in DATABASE_URL:
-            connect_args["sslmode"] = "require"
-            logger.info("AWS RDS detected - enabling SSL")
-        
-        # Optimized for App Runner with ML workloads
-        db_engine = create_engine(
-            DATABASE_URL,
-            pool_pre_ping=True,           # Verify connections before use
-            pool_recycle=1800,            # Shorter recycle for App Runner (30 min)
-            pool_timeout=30,              # Shorter timeout for App Runner
-            max_overflow=10,              # Reasonable overflow for App Runner
-            pool_size=3,                  # Smaller pool for App Runner with ML workloads
-            echo=False,                   # Set to True for SQL debugging
-            connect_args=connect_args
-        )
+        # Pool, SSL untuk RDS, statement_timeout dan application_name diatur di create_app_engine (DB_* settings)
+        from app.db.database import engine as db_engine
         
         # Test the connection
         logger.info("Testing AWS RDS connection...")
@@ -137,7 +120,7 @@ async def lifespan(app: FastAPI):
         logger.error("CRITICAL: Failed to connect to database. Server will exit.")
         sys.exit(1)
     else:
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        from app.db.database import SessionLocal
         
         # Import here to avoid circular imports
         try:
@@ -149,18 +132,51 @@ async def lifespan(app: FastAPI):
             logger.error(f"FAILED: Could not create database tables: {e}")
             sys.exit(1)
     
+    inbox_task = None
+    from app.core.config import settings
+    if settings.PAYMENT_INBOX_WORKER_ENABLED:
+        from app.services.payment_inbox import run_inbox_worker
+        inbox_task = asyncio.create_task(run_inbox_worker())
+    email_task = None
+    if settings.EMAIL_WORKER_ENABLED:
+        from app.services.email_service import run_email_worker
+        email_task = asyncio.create_task(run_email_worker())
+    reconcile_task = None
+    if settings.RECONCILE_ENABLED and not settings.MIDTRANS_SERVER_KEY:
+        # Tanpa server key setiap putaran hanya gagal di get_midtrans_client
+        logger.warning("RECONCILE: MIDTRANS_SERVER_KEY is not set, reconciler not started")
+    elif settings.RECONCILE_ENABLED:
+        from app.services.reconciler import run_reconciler
+        reconcile_task = asyncio.create_task(run_reconciler())
+
     logger.info("SUCCESS: Steganography API startup complete - Ready for requests!")
     yield
     
     # Shutdown
     logger.info("Shutting down Steganography API...")
+    from app.services.watermark import shutdown_extract_executor
+    from app.services.midtrans import close_midtrans_client
+    from app.utils.send_email import close_smtp_pool
+    from app.db.database import async_engine, async_replica_engine
+    for task in (reconcile_task, inbox_task, email_task):
+        if task is not None:
+            task.cancel()
+    shutdown_extract_executor()
+    await close_midtrans_client()
+    await close_smtp_pool()
+    await async_engine.dispose()
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
 
 # Create FastAPI app with lifespan
+from app.core.serialization import FastJSONResponse
 app = FastAPI(
     title="Steganography API",
     description="Advanced steganography API with ML capabilities on AWS App Runner",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson untuk semua response JSON (dict/list dari route dan response_model)
+    default_response_class=FastJSONResponse
 )
 
 # CORS configuration optimized for App Runner
@@ -175,6 +191,14 @@ app = FastAPI(
 
 origins = ["*"] # Allow all origins for App Runner
 
+# Hitung statement SQL per request (header X-Query-Count, budget per route lewat query_budget)
+from app.core.query_budget import QueryCounterMiddleware
+app.add_middleware(QueryCounterMiddleware)
+
+# Jendela read-your-writes replica dibawa klien lewat cookie, supaya berlaku di semua worker/instance
+from app.db.routing import ReadYourWritesMiddleware
+app.add_middleware(ReadYourWritesMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -219,6 +243,11 @@ async def health_check():
         logger.error(f"Health check failed: {e}")
         raise HTTPException(status_code=503, detail=f"Health check failed: {str(e)}")
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    from app.core.metrics import render_prometheus
+    return render_prometheus()
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -235,6 +264,11 @@ try:
     from app.api.routes import users, auth, uploads, explore, payments, extract, likes, artwork_me
     from app.api.routes.artworks import router as artworks_router
     from app.api.routes import purchase
+    from app.services.hashing import PasswordHashingBusy
+
+    @app.exception_handler(PasswordHashingBusy)
+    async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+        return JSONResponse(status_code=503, content={"detail": "Server sedang sibuk, coba lagi."}, headers={"Retry-After": "1"})
     
     app.include_router(users.router, prefix="/api/users", tags=["Users"])
     app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
@@ -259,7 +293,10 @@ if not os.path.exists(static_dir):
     os.makedirs(static_dir)
     logger.info(f"Created static directory: {static_dir}")
 
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+from app.services.static_files import ImmutableStaticFiles
+
+# watermarked/<unique_key>.png tidak pernah ditimpa -> Cache-Control immutable
+app.mount("/static", ImmutableStaticFiles(directory=static_dir, immutable_prefixes=("watermarked/",)), name="static")
 
 if __name__ == "__main__":
     import uvicorn
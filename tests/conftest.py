@@ -0,0 +1,138 @@
+"""Fixture bersama untuk test yang butuh PostgreSQL.
+
+Test ini berjalan terhadap database yang sudah dimigrasi (alembic upgrade
+head) di DATABASE_URL dan di-skip kalau variabel itu tidak diset. Semua
+user/artwork yang dibuat lewat fixture dihapus lagi setelah test.
+"""
+import os
+import sys
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+requires_db = pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL is not set")
+
+
+@pytest.fixture
+def make_client():
+    """TestClient untuk app kecil berisi router yang diuji (tanpa import main/torch).
+
+    Pool asyncpg terikat ke event loop; seperti lifespan di main.py, engine async
+    di-dispose saat client ditutup supaya test berikutnya (loop baru) membuka koneksi baru.
+    Saat startup satu koneksi dibuka dulu: setelah dispose(), first-connect SQLAlchemy
+    2.0.23 yang dijalankan beberapa task sekaligus membuat event loop deadlock.
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.core.query_budget import QueryCounterMiddleware
+    from app.core.serialization import FastJSONResponse
+    from app.db.database import async_engine, async_replica_engine
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with async_engine.connect():
+            pass
+        yield
+        await async_engine.dispose()
+        if async_replica_engine is not None:
+            await async_replica_engine.dispose()
+
+    clients = []
+
+    def factory(*routers) -> TestClient:
+        app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+        app.add_middleware(QueryCounterMiddleware)
+        for router, prefix in routers:
+            app.include_router(router, prefix=prefix)
+        client = TestClient(app)
+        client.__enter__()
+        clients.append(client)
+        return client
+
+    yield factory
+
+    for client in clients:
+        client.__exit__(None, None, None)
+
+
+@pytest.fixture
+def db():
+    from app.db.database import SessionLocal
+    from app.models import artwork, like, purchase, receipt, user  # noqa: F401
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    from sqlalchemy import text
+    from app.models.user import User
+
+    created = []
+
+    def factory(**fields):
+        suffix = uuid.uuid4().hex[:10]
+        values = {"username": f"test_{suffix}", "name": "Test", "email": f"test_{suffix}@example.com", "password_hash": "-"}
+        values.update(fields)
+        user = User(**values)
+        db.add(user)
+        db.commit()
+        created.append(user.id)
+        return user
+
+    yield factory
+
+    if created:
+        db.rollback()
+        ids = {"ids": created}
+        for statement in (
+            "DELETE FROM likes WHERE user_id = ANY(:ids) OR artwork_id IN (SELECT id FROM artworks WHERE owner_id = ANY(:ids))",
+            "DELETE FROM receipts WHERE buyer_id = ANY(:ids) OR artwork_id IN (SELECT id FROM artworks WHERE owner_id = ANY(:ids))",
+            "DELETE FROM purchases WHERE user_id = ANY(:ids) OR artwork_id IN (SELECT id FROM artworks WHERE owner_id = ANY(:ids))",
+            "DELETE FROM artworks WHERE owner_id = ANY(:ids)",
+            "DELETE FROM users WHERE id = ANY(:ids)",
+        ):
+            db.execute(text(statement), ids)
+        db.commit()
+
+
+@pytest.fixture
+def make_artwork(db):
+    from app.models.artwork import Artwork
+
+    def factory(owner, **fields):
+        suffix = uuid.uuid4().hex[:10]
+        values = {
+            "title": f"Test {suffix}", "owner_id": owner.id, "image_url": f"/static/watermarked/test-{suffix}.png",
+            "unique_key": f"test-{suffix}", "hash": "-", "price": 100000, "category": "ilustrasi",
+        }
+        values.update(fields)
+        art = Artwork(**values)
+        db.add(art)
+        db.commit()
+        return art
+
+    return factory
+
+
+@pytest.fixture
+def auth_headers():
+    from jose import jwt
+    from app.core.config import settings
+
+    def headers(user) -> dict:
+        token = jwt.encode(
+            {"sub": str(user.id), "exp": int((datetime.utcnow() + timedelta(minutes=10)).timestamp())},
+            settings.SECRET_KEY, algorithm=settings.ALGORITHM
+        )
+        return {"Authorization": f"Bearer {token}"}
+
+    return headers
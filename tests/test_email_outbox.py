@@ -0,0 +1,135 @@
+"""Outbox email dikuras lewat SMTPPool ke SMTP sink (app/simulate_smtp.py) di proses yang sama.
+
+Sink didengarkan di port acak; SINK_FAILURE_RATE dipaksa 1 untuk menguji
+kegagalan sementara (451). Email lain yang kebetulan jatuh tempo di database
+ikut terkirim ke sink, jadi assertion hanya melihat baris milik test ini.
+"""
+import asyncio
+import uuid
+from datetime import timedelta
+
+import pytest
+
+from conftest import requires_db
+
+pytestmark = requires_db
+
+CONTEXT = {"title": "Sepeda", "category": "ilustrasi", "description": "-", "image_url": "/static/x.png",
+           "unique_key": "test-outbox", "buyer_code": "SECRET01"}
+
+
+@pytest.fixture
+def outbox(db):
+    from sqlalchemy import text
+    from app.models.email_outbox import EmailOutbox
+    from app.services.email_service import queue_email
+
+    recipients = []
+
+    def enqueue(count: int):
+        batch = [f"outbox-{uuid.uuid4().hex[:10]}@example.com" for _ in range(count)]
+        for to_email in batch:
+            queue_email(db, to_email, "certificate", CONTEXT)
+        db.commit()
+        recipients.extend(batch)
+        return db.query(EmailOutbox).filter(EmailOutbox.to_email.in_(batch)).order_by(EmailOutbox.id).all()
+
+    yield enqueue
+
+    db.rollback()
+    db.execute(text("DELETE FROM email_outbox WHERE to_email = ANY(:to)"), {"to": recipients})
+    db.commit()
+
+
+@pytest.fixture
+def drain(db, tmp_path, monkeypatch):
+    """Jalankan sink dan satu putaran deliver_batch di event loop baru; kembalikan stats sink."""
+    from app import simulate_smtp
+    from app.core.config import settings
+    from app.utils import send_email
+
+    monkeypatch.setattr(settings, "MAIL_SERVER", "127.0.0.1")
+    monkeypatch.setattr(settings, "MAIL_STARTTLS", False)
+    monkeypatch.setattr(settings, "MAIL_SSL_TLS", False)
+    monkeypatch.setattr(send_email, "_pool", None)
+    monkeypatch.setattr(simulate_smtp, "stats", {"connections": 0, "messages": 0, "rejected": 0})
+
+    def run(failure_rate: float = 0.0) -> dict:
+        from app.services.email_service import deliver_batch
+
+        monkeypatch.setattr(simulate_smtp, "FAILURE_RATE", failure_rate)
+
+        async def scenario():
+            server = await asyncio.start_server(
+                lambda r, w: simulate_smtp.handle_client(r, w, str(tmp_path)), "127.0.0.1", 0
+            )
+            monkeypatch.setattr(settings, "MAIL_PORT", server.sockets[0].getsockname()[1])
+            try:
+                async with server:
+                    await deliver_batch(db)
+            finally:
+                await send_email.close_smtp_pool()
+
+        asyncio.run(scenario())
+        return dict(simulate_smtp.stats)
+
+    return run
+
+
+def db_now(db):
+    from sqlalchemy import func, select
+
+    return db.scalar(select(func.localtimestamp()))
+
+
+def test_outbox_is_delivered_through_pool(db, outbox, drain, tmp_path):
+    from app.core.config import settings
+
+    rows = outbox(3)
+    stats = drain()
+
+    delivered = "".join(path.read_text() for path in tmp_path.glob("*.eml"))
+    for row in rows:
+        db.refresh(row)
+        assert row.sent_at is not None and row.attempts == 1 and row.last_error is None
+        assert f"To: {row.to_email}" in delivered
+    assert stats["messages"] >= 3
+    # Koneksi dipakai ulang: paling banyak satu per slot pool, bukan satu per email
+    assert stats["connections"] <= settings.EMAIL_SMTP_POOL_SIZE
+
+
+def test_smtp_failure_backs_off(db, outbox, drain):
+    from app.core.config import settings
+
+    row, = outbox(1)
+    base = settings.EMAIL_RETRY_BASE_SECONDS
+
+    for attempt, backoff in ((1, base), (2, base * 2)):
+        before = db_now(db)
+        stats = drain(failure_rate=1.0)
+        after = db_now(db)
+        db.refresh(row)
+
+        assert stats["rejected"] >= 1
+        assert row.sent_at is None and row.attempts == attempt
+        assert "Simulated temporary failure" in row.last_error
+        # retry_delay: uniform(backoff / 2, backoff)
+        assert before + timedelta(seconds=backoff / 2) <= row.next_attempt_at <= after + timedelta(seconds=backoff)
+
+        row.next_attempt_at = after - timedelta(seconds=1)
+        db.commit()
+
+    drain()
+    db.refresh(row)
+    assert row.sent_at is not None and row.attempts == 3
+
+
+def test_retry_delay_is_capped(monkeypatch):
+    from app.core.config import settings
+    from app.services.email_service import retry_delay
+
+    monkeypatch.setattr(settings, "EMAIL_RETRY_BASE_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "EMAIL_RETRY_MAX_SECONDS", 3600.0)
+    for attempts, backoff in ((1, 30), (2, 60), (7, 1920), (8, 3600), (20, 3600)):
+        for _ in range(20):
+            assert backoff / 2 <= retry_delay(attempts) <= backoff
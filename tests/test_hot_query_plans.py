@@ -0,0 +1,131 @@
+"""Lookup panas memakai index-nya, bukan Seq Scan.
+
+Users/artworks/receipts/likes di-seed (generate_series) dalam satu transaksi,
+di-ANALYZE, lalu statement SQLAlchemy yang sama dengan di route di-EXPLAIN;
+transaksi di-rollback di akhir modul, jadi tidak ada data yang tertinggal.
+Ukuran seed cukup besar supaya planner memilih index seperti di produksi.
+"""
+import json
+
+import pytest
+
+from conftest import requires_db
+
+pytestmark = requires_db
+
+USERS, ARTWORKS, RECEIPTS, LIKES = 500, 10_000, 30_000, 20_000
+CATEGORIES = ["ilustrasi", "fotografi", "lukisan", "pixel", "3d", "kaligrafi", "batik", "komik", "poster", "abstrak", "anime", "sketsa"]
+
+
+def seed(conn):
+    from sqlalchemy import text
+
+    conn.execute(text("""
+        INSERT INTO users (id, username, name, email, password_hash, is_active)
+        SELECT gen_random_uuid(), 'plan_u' || g, 'Plan', 'plan_u' || g || '@example.com', '-', true
+        FROM generate_series(1, :n) AS g
+    """), {"n": USERS})
+    categories = "ARRAY[" + ",".join(f"'{c}'" for c in CATEGORIES) + "]"
+    conn.execute(text(f"""
+        INSERT INTO artworks (id, title, price, owner_id, created_at, category, image_url, unique_key, hash, is_sold)
+        SELECT gen_random_uuid(), 'Plan #' || g, (g % 50) * 10000, u.ids[1 + g % array_length(u.ids, 1)],
+               now() - (g || ' seconds')::interval, c.names[1 + g % {len(CATEGORIES)}],
+               '/static/watermarked/plan-' || g || '.png', 'plan-' || g, '-', false
+        FROM generate_series(1, :n) AS g,
+             (SELECT array_agg(id) AS ids FROM users WHERE username LIKE 'plan_u%') AS u,
+             (SELECT {categories} AS names) AS c
+    """), {"n": ARTWORKS})
+    # Kebanyakan struk sudah selesai (paid/failed/expired); pending hanya sedikit, seperti di produksi
+    conn.execute(text("""
+        INSERT INTO receipts (id, buyer_id, artwork_id, amount, order_id, status)
+        SELECT gen_random_uuid(), u.ids[1 + (g * 7) % array_length(u.ids, 1)], a.ids[1 + (g * 13) % array_length(a.ids, 1)],
+               100000, 'PLAN-' || g,
+               (ARRAY['paid', 'paid', 'paid', 'paid', 'paid', 'paid', 'failed', 'failed', 'expired', 'pending'])[1 + g % 10]::receipt_status_enum
+        FROM generate_series(1, :n) AS g,
+             (SELECT array_agg(id) AS ids FROM users WHERE username LIKE 'plan_u%') AS u,
+             (SELECT array_agg(id) AS ids FROM artworks WHERE unique_key LIKE 'plan-%') AS a
+    """), {"n": RECEIPTS})
+    conn.execute(text("""
+        INSERT INTO likes (id, user_id, artwork_id)
+        SELECT gen_random_uuid(), u.ids[1 + g % array_length(u.ids, 1)], a.ids[1 + (g * 31) % array_length(a.ids, 1)]
+        FROM generate_series(1, :n) AS g,
+             (SELECT array_agg(id) AS ids FROM users WHERE username LIKE 'plan_u%') AS u,
+             (SELECT array_agg(id) AS ids FROM artworks WHERE unique_key LIKE 'plan-%') AS a
+        ON CONFLICT (user_id, artwork_id) DO NOTHING
+    """), {"n": LIKES})
+    for table in ("users", "artworks", "receipts", "likes"):
+        conn.execute(text(f"ANALYZE {table}"))
+
+
+def hot_queries(conn) -> dict:
+    from sqlalchemy import delete, select, text
+    from app.models.artwork import Artwork
+    from app.models.like import Like
+    from app.models.receipt import Receipt, ReceiptStatusEnum
+
+    receipt = conn.execute(text(
+        "SELECT buyer_id, artwork_id, order_id FROM receipts WHERE order_id LIKE 'PLAN-%' LIMIT 1"
+    )).one()
+    liker = conn.execute(text(
+        "SELECT l.user_id, l.artwork_id FROM likes l JOIN users u ON u.id = l.user_id WHERE u.username LIKE 'plan_u%' LIMIT 1"
+    )).one()
+
+    return {
+        "initiate_payment": select(Receipt.id).where(
+            Receipt.buyer_id == receipt.buyer_id,
+            Receipt.artwork_id == receipt.artwork_id,
+            Receipt.status.in_([ReceiptStatusEnum.pending, ReceiptStatusEnum.paid])
+        ).limit(1),
+        "payment_callback": select(Receipt).where(Receipt.order_id == receipt.order_id).with_for_update(),
+        "toggle_like": delete(Like).where(
+            Like.user_id == liker.user_id, Like.artwork_id == liker.artwork_id
+        ).returning(Like.artwork_id),
+        "my_artworks": select(Artwork).where(Artwork.owner_id == receipt.buyer_id),
+        "explore_category": select(Artwork).where(Artwork.category == CATEGORIES[0]).order_by(
+            Artwork.created_at.desc(), Artwork.id.desc()
+        ).limit(25),
+    }
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+@pytest.fixture(scope="module")
+def plans():
+    """name -> (relasi yang di-Seq Scan, index yang dipakai), dari satu seed yang di-rollback."""
+    from sqlalchemy import text
+    from app.db.database import engine
+    from app.models import purchase, user  # noqa: F401
+
+    result = {}
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            seed(conn)
+            for name, statement in hot_queries(conn).items():
+                sql = statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+                plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                nodes = list(plan_nodes(plan[0]["Plan"]))
+                result[name] = (
+                    [n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan"],
+                    sorted({n["Index Name"] for n in nodes if "Index Name" in n}),
+                )
+        finally:
+            trans.rollback()
+    return result
+
+
+@pytest.mark.parametrize("name, index", [
+    ("initiate_payment", "ix_receipts_buyer_artwork_active"),  # buyer + artwork + status pending/paid
+    ("payment_callback", "ix_receipts_order_id"),  # receipt by order_id FOR UPDATE
+    ("toggle_like", "uq_likes_user_artwork"),  # DELETE like by (user_id, artwork_id)
+    ("my_artworks", "ix_artworks_owner_id"),  # get_my_artworks, artworks by owner_id
+    ("explore_category", "ix_artworks_category_created_at_id"),  # explore by category, terbaru dulu
+])
+def test_hot_query_uses_index(plans, name, index):
+    assert plans[name] == ([], [index])
@@ -0,0 +1,123 @@
+"""Notifikasi di inbox diulang dengan backoff lalu di-dead-letter, tidak hilang diam-diam.
+
+Notifikasi yang datang sebelum receipt-nya ada ("not_found") dipakai sebagai
+kegagalan yang bisa diulang. "Waktu berlalu" disimulasikan dengan memundurkan
+next_attempt_at, bukan dengan sleep.
+"""
+import uuid
+from datetime import timedelta
+
+import pytest
+
+from conftest import requires_db
+
+pytestmark = requires_db
+
+
+@pytest.fixture
+def inbox(db, make_user):
+    # Bergantung pada make_user supaya dibersihkan sebelum receipt-nya dihapus
+    from sqlalchemy import text
+    from app.models.payment_inbox import PaymentInbox
+
+    order_ids = []
+
+    def enqueue(transaction_status: str = "settlement") -> PaymentInbox:
+        from app.services.payment_inbox import enqueue_notifications
+
+        order_id = f"INBOX-{uuid.uuid4().hex[:10]}"
+        order_ids.append(order_id)
+        enqueue_notifications(db, [{
+            "order_id": order_id, "transaction_status": transaction_status,
+            "transaction_id": f"trx-{order_id}", "payment_type": "qris",
+        }])
+        return db.query(PaymentInbox).filter_by(order_id=order_id).one()
+
+    yield enqueue
+
+    db.rollback()
+    for statement in (
+        "DELETE FROM email_outbox WHERE context->>'receipt_id' IN (SELECT id::text FROM receipts WHERE order_id = ANY(:ids))",
+        "DELETE FROM payment_inbox WHERE order_id = ANY(:ids)",
+        "DELETE FROM processed_notifications WHERE order_id = ANY(:ids)",
+    ):
+        db.execute(text(statement), {"ids": order_ids})
+    db.commit()
+
+
+def process(db, row):
+    from app.services.payment_inbox import process_inbox_batch
+
+    process_inbox_batch(db, 100)
+    db.refresh(row)
+
+
+def make_due(db, row):
+    from sqlalchemy import func, select
+
+    row.next_attempt_at = db.scalar(select(func.localtimestamp())) - timedelta(seconds=1)
+    db.commit()
+
+
+def test_missing_receipt_backs_off_then_applies(db, inbox, make_user, make_artwork):
+    from app.core.config import settings
+    from app.models.receipt import Receipt, ReceiptStatusEnum
+
+    row = inbox()
+    process(db, row)
+
+    assert row.processed_at is None and row.dead_lettered_at is None
+    assert row.attempts == 1 and row.last_error == "receipt not found"
+    delay = (row.next_attempt_at - row.received_at).total_seconds()
+    assert settings.PAYMENT_INBOX_RETRY_BASE_SECONDS / 2 - 1 <= delay <= settings.PAYMENT_INBOX_RETRY_BASE_SECONDS + 1
+
+    # Belum jatuh tempo: batch berikutnya tidak mengklaimnya lagi
+    process(db, row)
+    assert row.attempts == 1
+
+    buyer = make_user()
+    art = make_artwork(make_user())
+    receipt = Receipt(buyer_id=buyer.id, artwork_id=art.id, amount=art.price, order_id=row.order_id,
+                      status=ReceiptStatusEnum.pending, buyer_secret_code="SECRET01")
+    db.add(receipt)
+    db.commit()
+
+    make_due(db, row)
+    process(db, row)
+    db.refresh(receipt)
+    assert row.processed_at is not None and row.attempts == 2
+    assert receipt.status == ReceiptStatusEnum.paid
+
+
+def test_exhausted_row_is_dead_lettered(db, inbox, monkeypatch, caplog):
+    from app.core.config import settings
+    from app.services.payment_inbox import inbox_dead_lettered
+
+    monkeypatch.setattr(settings, "PAYMENT_INBOX_MAX_ATTEMPTS", 3)
+    dead_before = inbox_dead_lettered.value
+    row = inbox()
+
+    for attempt in range(1, 4):
+        process(db, row)
+        assert row.attempts == attempt
+        make_due(db, row)
+
+    assert row.dead_lettered_at is not None and row.processed_at is None
+    assert inbox_dead_lettered.value == dead_before + 1
+    assert any(r.levelname == "ERROR" and "dead-lettered" in r.getMessage() and row.order_id in r.getMessage()
+               for r in caplog.records)
+
+    # Sudah jatuh tempo tapi dead-lettered: tidak diklaim lagi
+    process(db, row)
+    assert row.attempts == 3
+
+
+def test_retry_delay_doubles_up_to_max(monkeypatch):
+    from app.core.config import settings
+    from app.services.payment_inbox import retry_delay
+
+    monkeypatch.setattr(settings, "PAYMENT_INBOX_RETRY_BASE_SECONDS", 5.0)
+    monkeypatch.setattr(settings, "PAYMENT_INBOX_RETRY_MAX_SECONDS", 30.0)
+    for attempts, backoff in ((1, 5.0), (2, 10.0), (3, 20.0), (4, 30.0), (10, 30.0)):
+        for _ in range(20):
+            assert backoff / 2 <= retry_delay(attempts) <= backoff
@@ -0,0 +1,41 @@
+"""N pembeli membeli artwork yang sama pada saat bersamaan: tepat satu yang menang."""
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import requires_db
+
+pytestmark = requires_db
+
+BUYERS = 20
+
+
+@pytest.fixture
+def client(make_client):
+    from app.api.routes import purchase as purchase_routes
+
+    return make_client((purchase_routes.router, "/api/my"))
+
+
+@pytest.mark.parametrize("round_", range(3))
+def test_exactly_one_buyer_wins(round_, client, db, make_user, make_artwork, auth_headers):
+    from app.models.purchase import Purchase
+
+    owner = make_user()
+    art = make_artwork(owner)
+    headers = [auth_headers(make_user()) for _ in range(BUYERS)]
+    barrier = threading.Barrier(BUYERS)
+
+    def attempt(h):
+        barrier.wait()
+        return client.post(f"/api/my/purchase/{art.id}", headers=h).status_code
+
+    with ThreadPoolExecutor(max_workers=BUYERS) as pool:
+        codes = Counter(pool.map(attempt, headers))
+
+    assert codes == {201: 1, 409: BUYERS - 1}
+    assert db.query(Purchase).filter_by(artwork_id=art.id).count() == 1
+    db.refresh(art)
+    assert art.is_sold is True
@@ -0,0 +1,75 @@
+"""Route dengan query_budget tetap di bawah budget-nya dalam QUERY_BUDGET_STRICT.
+
+Cache user dan cache explore dikosongkan sebelum setiap request, jadi lookup
+user dan build halaman explore ikut terhitung (kasus terburuk). Beberapa
+baris per relasi supaya lazy load per baris (N+1) langsung melewati budget.
+"""
+import pytest
+
+from conftest import requires_db
+
+pytestmark = requires_db
+
+ROWS = 3
+
+
+@pytest.fixture
+def client(make_client, monkeypatch):
+    from app.api.routes import artwork_me, explore, likes, payments
+    from app.api.routes.artworks import router as artworks_router
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "QUERY_BUDGET_STRICT", True)
+    return make_client(
+        (explore.router, "/api/explores"),
+        (artworks_router, "/api/artworks"),
+        (artwork_me.router, "/api"),
+        (payments.router, "/api/payments"),
+        (likes.router, "/api/likes"),
+    )
+
+
+@pytest.fixture
+def seeded(db, make_user, make_artwork):
+    from app.models.like import Like
+    from app.models.receipt import Receipt, ReceiptStatusEnum
+
+    creator, buyer = make_user(), make_user()
+    artworks = [make_artwork(creator) for _ in range(ROWS)] + [make_artwork(buyer) for _ in range(ROWS)]
+    receipts = [
+        Receipt(buyer_id=buyer.id, artwork_id=art.id, amount=art.price, order_id=f"BUDGET-{art.unique_key}",
+                status=ReceiptStatusEnum.paid, buyer_secret_code="SECRET01")
+        for art in artworks[:ROWS]
+    ]
+    db.add_all(receipts + [Like(user_id=buyer.id, artwork_id=art.id) for art in artworks[:ROWS]])
+    db.commit()
+    return buyer, artworks, receipts
+
+
+def cold_get(client, url, headers):
+    from app.services.explore_cache import invalidate_explore_cache
+    from app.services.user_cache import clear_user_cache
+
+    clear_user_cache()
+    invalidate_explore_cache()
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    return response
+
+
+@pytest.mark.parametrize("params", ["", "?category=ilustrasi", "?query=Test", "?include_total=false"])
+def test_explore_within_budget(params, client, seeded, auth_headers):
+    buyer, _, _ = seeded
+    cold_get(client, f"/api/explores/explore{params}", auth_headers(buyer))
+
+
+def test_budgeted_routes_within_budget(client, seeded, auth_headers):
+    buyer, artworks, receipts = seeded
+    headers = auth_headers(buyer)
+
+    assert len(cold_get(client, "/api/payments/my-purchases", headers).json()) == ROWS
+    assert len(cold_get(client, "/api/likes/me", headers).json()) == ROWS
+    assert len(cold_get(client, "/api/users/me/artworks", headers).json()["result"]) == ROWS
+    cold_get(client, f"/api/payments/receipt/{receipts[0].id}", headers)
+    detail = cold_get(client, f"/api/artworks/{artworks[0].id}", headers)
+    assert detail.json()["liked_by_me"] is True
@@ -0,0 +1,75 @@
+"""analyze_lsb memisahkan gambar bersih dari gambar ber-payload LSB.
+
+Set berlabel dibuat dari sample PNG repo: versi bersih dan versi yang
+di-embed dengan embed_message_lsb pada beberapa rate payload (fraksi
+kapasitas LSB, diisi berurutan dari piksel pertama). Tidak butuh database.
+"""
+import hashlib
+import os
+import random
+import shutil
+
+import pytest
+from PIL import Image
+
+from app.steganography import analyze_lsb, embed_message_lsb, probe_copyright_header
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_IMAGES = ["karya_sepeda.png", "static/uploads/UniqueKey_SenjaRupa_messiaaaaah_82e5cb.png"]
+PAYLOAD_RATES = [0.25, 0.5, 1.0]
+# Di bawah ~25% payload deteksi tergantung isi gambar; verdict hanya diuji mulai 50%
+FLAGGED_RATES = [0.5, 1.0]
+
+
+def random_payload(rng: random.Random, bits: int) -> str:
+    # Karakter 0-255 -> 8 bit acak per karakter lewat text_to_binary; "<END>" (40 bit) ikut dihitung
+    return "".join(chr(rng.randrange(256)) for _ in range(bits // 8 - 5))
+
+
+@pytest.fixture(scope="module", params=SAMPLE_IMAGES, ids=os.path.basename)
+def labelled(request, tmp_path_factory):
+    # embed_message_lsb menulis <nama>_stego<ext> di sebelah file sumber, jadi salin dulu
+    source = tmp_path_factory.mktemp("steganalysis") / os.path.basename(request.param)
+    shutil.copy(os.path.join(ROOT, request.param), source)
+    width, height = Image.open(source).size
+
+    rng = random.Random(1234)
+    results = {"clean": analyze_lsb(str(source))}
+    for rate in PAYLOAD_RATES:
+        stego_path = embed_message_lsb(str(source), random_payload(rng, int(width * height * 3 * rate)))
+        results[rate] = analyze_lsb(stego_path)
+    return str(source), results
+
+
+def test_clean_image_is_not_flagged(labelled):
+    _, results = labelled
+    assert results["clean"]["suspicious"] is False
+
+
+@pytest.mark.parametrize("rate", FLAGGED_RATES)
+def test_payload_is_flagged(labelled, rate):
+    _, results = labelled
+    assert results[rate]["suspicious"] is True
+
+
+def test_scores_grow_with_payload(labelled):
+    _, results = labelled
+    ordered = [results["clean"]] + [results[rate] for rate in PAYLOAD_RATES]
+
+    # Estimasi RS runtuh mendekati payload penuh (persamaan kuadratnya degenerate);
+    # di situ chi-square yang menangkap, jadi urutan RS dicek sampai 50%
+    rs_rates = [r["rs_estimated_rate"] for r in ordered if r is not results[1.0]]
+    assert rs_rates == sorted(rs_rates) and len(set(rs_rates)) == len(rs_rates)
+    chi_square = [r["chi_square_p"] for r in ordered]
+    assert chi_square == sorted(chi_square)
+    # Payload penuh: pasangan nilai (2k, 2k+1) rata, chi-square hampir pasti
+    assert results[1.0]["chi_square_p"] > 0.95
+
+
+def test_probe_finds_our_copyright_header(labelled):
+    source, _ = labelled
+    copyright_hash = hashlib.sha256(os.path.basename(source).encode()).hexdigest()
+    watermarked = embed_message_lsb(source, f"COPYRIGHT:{copyright_hash}<USER_MESSAGE>pesan kreator")
+
+    assert probe_copyright_header(watermarked) == copyright_hash
+    assert probe_copyright_header(source) is None